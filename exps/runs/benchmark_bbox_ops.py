@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Microbenchmark of the batched box-ops (`convert_boxes()`) against the
+dispatch-based functions of `bbox.py` on the label-loading path:
+`cxcywh_norm` -> `xyxy` -> shift (padding).
+"""
+
+from __future__ import annotations
+
+import logging
+import timeit
+
+import numpy as np
+import torch
+
+from torchkit.core.image import bbox_cxcywh_norm_xyxy
+from torchkit.core.image import bbox_xyxy_cxcywh_norm
+from torchkit.core.image import convert_boxes
+from torchkit.core.image import shift_bbox
+
+logger = logging.getLogger()
+
+
+# MARK: - Benchmark
+
+def benchmark(num_boxes: int, number: int = 2000) -> dict:
+    """Return the time per call (us) of the old and the fused paths."""
+    h, w, pad = 640.0, 480.0, (16.0, 8.0)
+    labels    = np.random.rand(num_boxes, 6).astype(np.float32)
+    tensor    = torch.from_numpy(labels.copy())
+
+    def old_numpy():
+        l = labels.copy()
+        l[:, 2:6] = bbox_cxcywh_norm_xyxy(l[:, 2:6], h, w)
+        l[:, 2:6] = shift_bbox(l[:, 2:6], pad[1], pad[0])
+        l[:, 2:6] = bbox_xyxy_cxcywh_norm(l[:, 2:6], h, w)
+
+    def new_numpy():
+        l = labels.copy()
+        convert_boxes(l[:, 2:6], "cxcywh_norm", "xyxy", h, w, shift=pad,
+                      out=l[:, 2:6])
+        convert_boxes(l[:, 2:6], "xyxy", "cxcywh_norm", h, w, out=l[:, 2:6])
+
+    def old_torch():
+        l = tensor.clone()
+        l[:, 2:6] = bbox_cxcywh_norm_xyxy(l[:, 2:6], h, w)
+        l[:, 2:6] = shift_bbox(l[:, 2:6], pad[1], pad[0])
+        l[:, 2:6] = bbox_xyxy_cxcywh_norm(l[:, 2:6], h, w)
+
+    def new_torch():
+        l = tensor.clone()
+        convert_boxes(l[:, 2:6], "cxcywh_norm", "xyxy", h, w, shift=pad,
+                      out=l[:, 2:6])
+        convert_boxes(l[:, 2:6], "xyxy", "cxcywh_norm", h, w, out=l[:, 2:6])
+
+    # NOTE: Check both paths agree
+    a = labels.copy()
+    a[:, 2:6] = shift_bbox(bbox_cxcywh_norm_xyxy(a[:, 2:6], h, w), pad[1], pad[0])
+    b = labels.copy()
+    convert_boxes(b[:, 2:6], "cxcywh_norm", "xyxy", h, w, shift=pad,
+                  out=b[:, 2:6])
+    assert np.allclose(a, b, atol=1e-3), "The fused path does not match."
+
+    results = {}
+    for name, fn in [("old_numpy", old_numpy), ("new_numpy", new_numpy),
+                     ("old_torch", old_torch), ("new_torch", new_torch)]:
+        results[name] = min(timeit.repeat(fn, number=number, repeat=3)) \
+                        / number * 1e6
+    return results
+
+
+# MARK: - Main
+
+def main():
+    """Main function."""
+    print(f"{'Boxes':>6} {'old np (us)':>12} {'new np (us)':>12} {'x':>6} "
+          f"{'old pt (us)':>12} {'new pt (us)':>12} {'x':>6}")
+    for num_boxes in [1, 8, 64, 512, 4096]:
+        r = benchmark(num_boxes=num_boxes)
+        print(f"{num_boxes:>6} "
+              f"{r['old_numpy']:>12.2f} {r['new_numpy']:>12.2f} "
+              f"{r['old_numpy'] / r['new_numpy']:>6.1f} "
+              f"{r['old_torch']:>12.2f} {r['new_torch']:>12.2f} "
+              f"{r['old_torch'] / r['new_torch']:>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Find the largest batch size and resolution of a model config on this box,
+for training and for inference, and print the config values to use.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from munch import Munch
+
+from exps import configs
+from exps.utils import load_config
+from torchkit.core.runner import CapacityFinder
+from torchkit.models.builder import ENHANCERS
+
+logger = logging.getLogger()
+
+
+# MARK: - Hosts
+
+hosts = {
+    "default":
+        Munch(
+            device = "cuda:0",
+            budget = 0.9,
+            # The memory budget. If <= 1.0, a fraction of the GPU memory,
+            # else MB.
+            config = configs.mprnet_rain
+        ),
+}
+
+
+# MARK: - Main
+
+def main():
+    """Main function."""
+    host   = hosts["default"]
+    config = load_config(config=host.config.config)
+    model  = ENHANCERS.build_from_dict(cfg=config.model)
+
+    finder = CapacityFinder(
+        model  = model,
+        device = host.device,
+        budget = host.budget,
+        stride = config.data.augment.get("stride", 32),
+    )
+    report = finder.run(shape=tuple(config.data.shape))
+
+    # NOTE: Recommended values with their measured throughput
+    train = report["training"]["batch_result"]
+    infer = report["inference"]["batch_result"]
+    for key, value in CapacityFinder.recommend(report).items():
+        print(f"{key:<22} = {value}")
+    if train:
+        print(f"Training : {train['throughput']:.1f} images/s")
+    if infer:
+        print(f"Inference: {infer['throughput']:.1f} images/s")
+
+    # NOTE: For information only: the largest shapes fit with a batch size
+    # of 1, not with the batch sizes above
+    for phase in ["training", "inference"]:
+        print(f"Largest {phase} shape (batch 1): {report[phase]['shape']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,7 @@ from exps.utils import data_dir
 from exps.utils import load_config
 from exps.utils import models_zoo_dir
 from exps.utils import results_dir
+from torchkit.core.runner import ckpt_to_weights
 from torchkit.core.runner import Inference
 from torchkit.models import MODELS
 
@@ -35,13 +36,18 @@ def main():
     )
     infer_data = os.path.join(data_dir, "cam_1_rain.mp4")
     
-    # NOTE: Model
-    model      = MODELS.build_from_dict(cfg=config.model)
-    post_model = MODELS.build_from_dict(cfg=config.model)
+    # NOTE: Export the checkpoint once to the memory-mapped weights-only
+    # format. It skips the optimizer state and loads lazily and zero-copy.
+    weights = os.path.splitext(ckpt)[0] + ".tkw"
+    if not os.path.isfile(weights):
+        ckpt_to_weights(
+            ckpt=ckpt, mmap=True, name=config.model.name, config=config.model
+        )
     
-    # NOTE: Get weights
-    model      = model.load_from_checkpoint(checkpoint_path=ckpt, **config.model)
-    post_model = post_model.load_from_checkpoint(checkpoint_path=ckpt, **config.model)
+    # NOTE: Model with weights
+    model_cls  = MODELS.get(config.model.name)
+    model      = model_cls.load_from_mmap_weights(path=weights, **config.model)
+    post_model = model_cls.load_from_mmap_weights(path=weights, **config.model)
     
     # NOTE: Inference
     inference_cfg                  = config.inference
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Quality/latency table of MPRNet's early exits on the Rain test split, to
+choose `exit_stage` or `latency_budget`.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from munch import Munch
+
+from exps import configs
+from exps.utils import load_config
+from torchkit.core.runner import get_latest_checkpoint
+from torchkit.core.runner import Phase
+from torchkit.datasets.builder import DATAMODULES
+from torchkit.models.builder import ENHANCERS
+
+logger = logging.getLogger()
+
+
+# MARK: - Hosts
+
+hosts = {
+    "default":
+        Munch(
+            device      = "cuda:0",
+            max_batches = None,
+            config      = configs.mprnet_rain
+        ),
+}
+
+
+# MARK: - Main
+
+def main():
+    """Main function."""
+    host   = hosts["default"]
+    config = load_config(config=host.config.config)
+
+    # NOTE: Data
+    dm = DATAMODULES.build_from_dict(cfg=config.data)
+    dm.prepare_data()
+    dm.setup(phase=Phase.TESTING)
+
+    # NOTE: Model
+    config.model.classlabels = dm.classlabels
+    model = ENHANCERS.build_from_dict(cfg=config.model)
+    ckpt  = get_latest_checkpoint(dirpath=model.weights_dir, name="*best*.ckpt")
+    if ckpt:
+        model = model.load_from_checkpoint(checkpoint_path=ckpt, **config.model)
+
+    # NOTE: Profile
+    report = model.profile_exit_stages(
+        data_loader = dm.test_dataloader,
+        device      = host.device,
+        max_batches = host.max_batches,
+    )
+    for row in report:
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+
+from exps import configs
+from exps.utils import data_dir
+from exps.utils import load_config
+from exps.utils import models_zoo_dir
+from exps.utils import results_dir
+from torchkit.core.runner import InferenceServer
+from torchkit.models import MODELS
+
+logger = logging.getLogger()
+
+
+# MARK: - Main
+
+def main():
+    """Main function."""
+    # NOTE: Configs
+    config = load_config(config=configs.mprnet_rain.config)
+    ckpt   = os.path.join(
+        models_zoo_dir, "mprnet_rain_version_0.ckpt"
+    )
+    serve_data = {
+        "cam_1": os.path.join(data_dir, "cam_1_rain.mp4"),
+        "cam_2": os.path.join(data_dir, "cam_2_rain.mp4"),
+    }
+    
+    # NOTE: Model
+    model = MODELS.build_from_dict(cfg=config.model)
+    model = model.load_from_checkpoint(checkpoint_path=ckpt, **config.model)
+    
+    # NOTE: Server
+    server_cfg                  = config.inference
+    server_cfg.default_root_dir = results_dir
+    server                      = InferenceServer(
+        max_batch_size = 8,
+        max_latency    = 0.02,
+        port           = None,  # Set a port to enable the submit endpoint
+        **server_cfg
+    )
+    
+    # NOTE: Serve
+    server.run(model=model, data=serve_data)
+   
+
+if __name__ == "__main__":
+    main()
@@ -21,12 +21,15 @@ from exps.utils import datasets_dir
 from exps.utils import load_config
 from torchkit.core.dataset import DataModule
 from torchkit.core.runner import CheckpointCallback
+from torchkit.core.runner import DataStarvationCallback
+from torchkit.core.runner import ImageCacheCallback
 from torchkit.core.runner import get_epoch
 from torchkit.core.runner import get_global_step
 from torchkit.core.runner import get_latest_checkpoint
 from torchkit.core.runner import Inference
 from torchkit.core.runner import Phase
 from torchkit.core.runner import Trainer
+from torchkit.core.utils import init_distributed
 from torchkit.datasets.builder import DATAMODULES
 from torchkit.models.builder import ENHANCERS
 from torchkit.models.enhancers import End2EndEnhancer
@@ -36,11 +39,15 @@ logger = logging.getLogger()
 
 # MARK: - Hosts
 
+# NOTE: With `ddp`, launch with `torchrun --nproc_per_node=<gpus> train.py`
+# (add `--nnodes`, `--node_rank` and `--master_addr` for multi-node) so the
+# datasets are set up on all ranks at the same time: rank 0 caches the labels
+# while the other ranks wait, then each rank caches its shard of the images.
 hosts = {
     "default":
         Munch(
             phase      = Phase.TRAINING,
-            strategy   = "dp",
+            strategy   = "ddp",
             gpus       = [0],
             infer_data = os.path.join(data_dir, "cam_1_rain.mp4"),
             config     = configs.mprnet_rain
@@ -61,6 +68,12 @@ def main():
     config.trainer.strategy = host.strategy
     config.trainer.gpus     = host.gpus
     
+    # NOTE: Distributed. Initialize the process group before setting up the
+    # data when launched by `torchrun`. Lightning reuses it. With Lightning's
+    # own launcher, this is a no-op and Lightning sets the group up later
+    if host.strategy == "ddp":
+        init_distributed()
+    
     # NOTE: Data
     dm = DATAMODULES.build_from_dict(cfg=config.data)
     dm.prepare_data()
@@ -115,6 +128,11 @@ def train(
     
     # NOTE: Checkpoint Callback
     ckpt_callback = CheckpointCallback(**_cfg.checkpoint)
+    callbacks     = [ckpt_callback, ImageCacheCallback()]
+    
+    # NOTE: Data starvation profiling
+    if _cfg.get("starvation", None):
+        callbacks.append(DataStarvationCallback(**_cfg.starvation))
     
     # NOTE: Logger
     tb_logger     = TensorBoardLogger(**_cfg.tb_logger)
@@ -122,7 +140,7 @@ def train(
     # NOTE: Trainer
     trainer_cfg                      = _cfg.trainer
     trainer_cfg.default_root_dir     = model.version_dir
-    trainer_cfg.callbacks            = [ckpt_callback]
+    trainer_cfg.callbacks            = callbacks
     trainer_cfg.enable_checkpointing = True
     trainer_cfg.logger               = tb_logger
     
@@ -57,6 +57,9 @@ class ClassLabels:
 
     def __init__(self, classlabels: list):
         self._classlabels = classlabels
+        self._id2label    = None
+        self._name2label  = None
+        self._luts        = {}
 
     # MARK: Configure
 
@@ -162,7 +165,9 @@ class ClassLabels:
     @property
     def id2label(self) -> dict[int, dict]:
         """Return a dictionary of id to label object."""
-        return {label["id"]: label for label in self.classlabels}
+        if self._id2label is None:
+            self._id2label = {label["id"]: label for label in self.classlabels}
+        return self._id2label
 
     def ids(
         self,
@@ -198,7 +203,44 @@ class ClassLabels:
     @property
     def name2label(self) -> dict[str, dict]:
         """Return a dictionary of {`name`: `label object`}."""
-        return {label["name"]: label for label in self.classlabels}
+        if self._name2label is None:
+            self._name2label = {
+                label["name"]: label for label in self.classlabels
+            }
+        return self._name2label
+    
+    def lut(self, encoding: str = "color", key: str = "id") -> np.ndarray:
+        """Return the lookup table mapping a label's `key` (for example: the
+        class ID of a polygon) to its `encoding` value, computed once. Use it
+        as `lut[mask]` to encode a whole mask of class IDs at once.
+
+        Args:
+            encoding (str):
+                The label's value to look up. One of: [`id`, `trainId`,
+                `catId`, `color`, ...]. Default: `color`.
+            key (str):
+                The label's key used as index. Labels with a negative key are
+                skipped. Default: `id`.
+
+        Returns:
+            lut (np.ndarray):
+                The table of shape [max(key) + 1, 3] and dtype uint8. Scalar
+                encodings are repeated on the 3 channels, like a grayscale
+                image read by `cv2.imread()`.
+        """
+        if (encoding, key) not in self._luts:
+            labels = [label for label in self.classlabels
+                      if label.get(key) is not None and label[key] >= 0]
+            lut    = np.zeros((max(l[key] for l in labels) + 1, 3), np.uint8)
+            for label in labels:
+                value = label.get(encoding)
+                if value is None:
+                    continue
+                # NOTE: Saturate like OpenCV drawing functions
+                lut[label[key]] = np.clip(value, 0, 255)
+            lut.flags.writeable = False
+            self._luts[(encoding, key)] = lut
+        return self._luts[(encoding, key)]
     
     def num_classes(
         self,
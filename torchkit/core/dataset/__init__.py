@@ -9,4 +9,7 @@ from .detection2d_dataset import *
 from .enhancement_dataset import *
 from .formatter import *
 from .handler import *
+from .image_cache import *
+from .label_store import *
+from .sampler import *
 from .semantic_dataset import *
@@ -12,10 +12,14 @@ from typing import Optional
 
 import pytorch_lightning as pl
 from torch.utils.data import DataLoader
+from torch.utils.data import DistributedSampler
 
 from torchkit.core.runner import Phase
 from torchkit.core.utils import EvalDataLoaders
+from torchkit.core.utils import get_rank
+from torchkit.core.utils import get_world_size
 from torchkit.core.utils import TrainDataLoaders
+from .sampler import ShardedSampler
 
 logger = logging.getLogger()
 
@@ -37,6 +41,9 @@ class DataModule(pl.LightningDataModule):
             Number of training samples in one forward & backward pass.
         shuffle (bool):
              If `True`, reshuffle the data at every training epoch.
+        seed (int):
+            The seed of the distributed samplers. The data is reshuffled with
+            `seed + epoch` at every epoch. Default: `0`.
         train (Dataset):
             The train dataset.
         val (Dataset):
@@ -70,6 +77,7 @@ class DataModule(pl.LightningDataModule):
         shape           : tuple,
         batch_size      : int                = 1,
         shuffle         : bool               = True,
+        seed            : int                = 0,
         collate_fn      : Optional[Callable] = None,
         transforms      : Optional[Callable] = None,
         transform       : Optional[Callable] = None,
@@ -82,6 +90,7 @@ class DataModule(pl.LightningDataModule):
         self.shape            = shape
         self.batch_size       = batch_size
         self.shuffle          = shuffle
+        self.seed             = seed
         self.train            = None
         self.val              = None
         self.test             = None
@@ -108,14 +117,36 @@ class DataModule(pl.LightningDataModule):
         # to avoid bottleneck
         return 0  # os.cpu_count() - 1
 
+    @property
+    def train_sampler(self) -> Optional[DistributedSampler]:
+        """Return the sampler of the train data when running with more than 1
+        process. Each rank draws a different part of the data. When the
+        dataset caches only its shard of the images (`caching_images`), use
+        `ShardedSampler` so each rank draws the images it has in memory.
+        """
+        if not self.train or get_world_size() <= 1:
+            return None
+        sampler = (ShardedSampler if getattr(self.train, "sharded", False)
+                   else DistributedSampler)
+        return sampler(
+            dataset      = self.train,
+            num_replicas = get_world_size(),
+            rank         = get_rank(),
+            shuffle      = self.shuffle,
+            seed         = self.seed,
+            drop_last    = True,
+        )
+    
     @property
     def train_dataloader(self) -> Optional[TrainDataLoaders]:
         """Implement one or more PyTorch DataLoaders for training."""
         if self.train:
+            sampler = self.train_sampler
             return DataLoader(
                 dataset     = self.train,
                 batch_size  = self.batch_size,
-                shuffle     = self.shuffle,
+                shuffle     = self.shuffle if sampler is None else False,
+                sampler     = sampler,
                 num_workers = self.num_workers,
                 pin_memory  = True,
                 drop_last   = True,
@@ -29,14 +29,21 @@ from ..data.image_info import ImageInfo
 from torchkit.core.data import ImageAugment
 from torchkit.core.data import VisionData
 from torchkit.core.fileio import create_dirs
+from torchkit.core.fileio import FileIndex
 from torchkit.core.fileio import get_hash
-from torchkit.core.image import bbox_cxcywh_norm_xyxy
+from torchkit.core.image import convert_boxes
 from torchkit.core.image import random_perspective_bbox
 from torchkit.core.image import resize_image
-from torchkit.core.image import shift_bbox
 from torchkit.core.utils import Dim3
+from torchkit.core.utils import get_rank
+from torchkit.core.utils import get_world_size
+from torchkit.core.utils import is_main_process
+from torchkit.core.utils import main_process_first
 from .formatter import LABEL_FORMATTERS
 from .handler import VisualDataHandler
+from .image_cache import SharedImageCache
+from .label_store import LabelStore
+from .label_store import VisionDataList
 
 logger = logging.getLogger()
 
@@ -57,8 +64,9 @@ class Detection2DDataset(VisionDataset, metaclass=ABCMeta):
 			A list of all image filepaths.
 		label_paths (list):
 			A list of all label filepaths.
-		data (list[VisionData]):
-			The list of all `VisionData` objects.
+		data (Sequence[VisionData]):
+			The list of all `VisionData` objects. After loading, it is a
+			`VisionDataList` view of `label_store`, unless `caching_images`.
 		classlabels (ClassLabels, optional):
 			The `ClassLabels` object contains all class-labels defined in the
 			dataset.
@@ -89,7 +97,19 @@ class Detection2DDataset(VisionDataset, metaclass=ABCMeta):
 		caching_labels (bool):
 			Should overwrite the existing cached labels?
 		caching_images (bool):
-			Cache images into memory for faster training.
+			Cache images into memory for faster training. With more than 1
+			process, each rank caches only its shard of the images (see
+			`ShardedSampler`).
+		cache_budget (int, optional):
+			The byte budget of the shared decoded-image cache used when
+			`caching_images` is `False`. All DataLoader workers share the
+			cache. If `None`, images are decoded from disk each time.
+			Default: `None`.
+		image_cache (SharedImageCache, optional):
+			The shared decoded-image cache.
+		label_store (LabelStore, optional):
+			The columnar labels of the split, saved to `<split>_labels.npz`.
+			The bounding box labels are read from it by slice.
 		write_labels (bool):
 			After loading images and labels for the first time, we will convert
 			it to our custom data format and write to files. If `True`, we will
@@ -140,6 +160,7 @@ class Detection2DDataset(VisionDataset, metaclass=ABCMeta):
 		label_format    : str                    = "yolo",
 		caching_labels  : bool                   = False,
 		caching_images  : bool                   = False,
+		cache_budget    : Optional[int]          = None,
 		write_labels    : bool                   = False,
 		fast_dev_run    : bool                   = False,
 		augment         : Union[str, dict, None] = None,
@@ -170,6 +191,9 @@ class Detection2DDataset(VisionDataset, metaclass=ABCMeta):
 		self.has_custom_labels = False
 		self.caching_labels    = caching_labels
 		self.caching_images    = caching_images
+		self.cache_budget      = cache_budget
+		self.image_cache       = None
+		self.label_store       = None
 		self.write_labels      = write_labels
 		self.fast_dev_run      = fast_dev_run
 		
@@ -232,6 +256,22 @@ class Detection2DDataset(VisionDataset, metaclass=ABCMeta):
 		"""Return image size."""
 		return max(self.shape)
 	
+	@property
+	def file_index(self) -> FileIndex:
+		"""Return the persisted index of the files under `root`."""
+		return FileIndex.from_root(root=self.root)
+	
+	@property
+	def sharded(self) -> bool:
+		"""Return `True` if each rank caches only its shard of the images."""
+		return self.caching_images and get_world_size() > 1
+	
+	def shard_indices(self) -> list[int]:
+		"""Return the indices of the images cached by the current rank: the
+		ones `ShardedSampler` draws on it.
+		"""
+		return list(range(get_rank(), len(self.image_paths), get_world_size()))
+	
 	# MARK: Pre-Load Data
 	
 	@abstractmethod
@@ -257,22 +297,55 @@ class Detection2DDataset(VisionDataset, metaclass=ABCMeta):
 		file              = self.label_paths[0]
 		split_prefix      = file[: file.find(self.split)]
 		cached_label_path = f"{split_prefix}{self.split}.cache"
-
-		if os.path.isfile(cached_label_path):
-			cache = torch.load(cached_label_path)  # Load
-			if self.caching_labels:  # Force re-cache
-				cache = self.cache_labels(path=cached_label_path)  # Re-cache
-			elif cache["hash"] != get_hash(self.label_paths + self.image_paths):
-				cache = self.cache_labels(path=cached_label_path)  # Re-cache
-		else:
-			cache = self.cache_labels(path=cached_label_path)  # Cache
+		label_store_path  = f"{split_prefix}{self.split}_labels.npz"
+		hash              = get_hash(self.label_paths + self.image_paths)
 		
-		# NOTE: Get labels
-		self.data = [cache[x] for x in self.image_paths]
+		# NOTE: Read the columnar label store if it is up-to-date. It does not
+		# keep the segmentations, so do not use it to write custom labels
+		use_store = (self.has_custom_labels and not self.caching_labels and
+					 not self.write_labels)
+		
+		# NOTE: Rank 0 (re-)caches the labels, the other ranks load its files
+		with main_process_first():
+			store = (LabelStore.load_from_file(path=label_store_path)
+					 if use_store else None)
+			rows  = None
+			if store is not None and store.hash == hash:
+				rows = store.rows_of(self.image_paths)
+			
+			if rows is not None:
+				self.label_store = store.select(rows)
+				self.data        = self.label_store.views()
+				if self.caching_images:
+					self.data = list(self.data)
+			else:
+				if os.path.isfile(cached_label_path):
+					cache = torch.load(cached_label_path)  # Load
+					if self.caching_labels and is_main_process():  # Re-cache
+						cache = self.cache_labels(path=cached_label_path)
+					elif cache["hash"] != hash:
+						cache = self.cache_labels(path=cached_label_path)
+				else:
+					cache = self.cache_labels(path=cached_label_path)  # Cache
+				
+				# NOTE: Get labels
+				self.data        = [cache[x] for x in self.image_paths]
+				self.label_store = LabelStore.from_vision_data(
+					data=self.data, image_paths=self.image_paths, hash=hash
+				)
+				if is_main_process():
+					self.label_store.dump_to_file(path=label_store_path)
 
 		# NOTE: Cache images
 		if self.caching_images:
 			self.cache_images()
+		elif self.cache_budget:
+			self.image_cache = SharedImageCache(
+				budget      = self.cache_budget,
+				slot_bytes  = SharedImageCache.slot_bytes_for(self.image_size),
+				num_keys    = len(self.image_paths),
+				num_streams = 1,
+			)
 	
 	def cache_labels(self, path: str) -> dict:
 		"""Cache labels, check images and read shapes.
@@ -308,9 +381,10 @@ class Detection2DDataset(VisionDataset, metaclass=ABCMeta):
 				self.caching_labels = True
 			
 		# NOTE: Write cache
-		logger.info(f"Labels has been cached to: {path}.")
 		cache_labels["hash"] = get_hash(self.label_paths + self.image_paths)
-		torch.save(cache_labels, path)  # Save for next time
+		if is_main_process():
+			logger.info(f"Labels has been cached to: {path}.")
+			torch.save(cache_labels, path)  # Save for next time
 		return cache_labels
 	
 	@abstractmethod
@@ -333,9 +407,8 @@ class Detection2DDataset(VisionDataset, metaclass=ABCMeta):
 		"""Cache images into memory for faster training (WARNING: large
 		datasets may exceed system RAM).
 		"""
-		n    = len(self.image_paths)
 		gb   = 0  # Gigabytes of cached images
-		pbar = tqdm(range(n), desc="Caching images")
+		pbar = tqdm(self.shard_indices(), desc="Caching images")
 		for i in pbar:  # Should be max 10k images
 			# image, hw_original, hw_resized
 			(self.data[i].image,
@@ -359,6 +432,14 @@ class Detection2DDataset(VisionDataset, metaclass=ABCMeta):
 		image = self.data[index].image
 		info  = self.data[index].image_info
 		
+		if image is None and info is not None and \
+			self.image_cache is not None:
+			image = self.image_cache.get(index=index, stream=0)
+			if image is not None:  # Shared cache hit
+				info.height, info.width = image.shape[:2]
+				info.depth = image.shape[2] if image.ndim > 2 else 1
+				return image, info
+		
 		if image is None:  # Not cached
 			path  = self.image_paths[index]
 			image = cv2.imread(path)  # BGR
@@ -380,10 +461,20 @@ class Detection2DDataset(VisionDataset, metaclass=ABCMeta):
 			info.width  = w1 if info.width  != w1 else info.width
 			info.depth  = (image.shape[2] if info.depth != image.shape[2]
 						   else info.depth)
+			if self.image_cache is not None:
+				self.image_cache.put(index=index, image=image, stream=0)
 			return image, info
 		else:
 			return self.data[index].image, self.data[index].image_info
 	
+	def load_bbox_labels(self, index: int) -> np.ndarray:
+		"""Return the bounding box labels of 1 image (a new array that can be
+		modified in-place).
+		"""
+		if self.label_store is not None:
+			return self.label_store.bbox_labels(index=index)
+		return self.data[index].bbox_labels
+	
 	# noinspection PyUnboundLocalVariable
 	def load_mosaic(self, index: int) -> tuple[np.ndarray, np.ndarray]:
 		"""Load 4 images and create a mosaic.
@@ -431,10 +522,13 @@ class Detection2DDataset(VisionDataset, metaclass=ABCMeta):
 			padh = y1a - y1b
 			
 			# Labels
-			labels = self.data[index].bbox_labels
+			labels = self.load_bbox_labels(index=index)
 			if labels.size > 0:
-				labels[:, 2:6] = bbox_cxcywh_norm_xyxy(labels[:, 2:6], h, w)  # Normalized xywh to pixel xyxy format
-				labels[:, 2:6] = shift_bbox(labels[:, 2:6], padh, padw)       # Add padding
+				# Normalized xywh to pixel xyxy format and add padding
+				convert_boxes(
+					labels[:, 2:6], "cxcywh_norm", "xyxy", h, w,
+					shift=(padw, padh), out=labels[:, 2:6]
+				)
 			labels4.append(labels)
 			
 		# Concat/clip labels
@@ -472,8 +566,13 @@ class Detection2DDataset(VisionDataset, metaclass=ABCMeta):
 			self.prepare_for_rect_training()
 		
 		# NOTE: Write data to our custom label format
-		if not self.has_custom_labels or self.write_labels:
+		if (not self.has_custom_labels or self.write_labels) and \
+			is_main_process():
 			self.write_custom_labels()
+		
+		# NOTE: Drop the `VisionData` objects, keep the columnar labels
+		if self.label_store is not None and not self.caching_images:
+			self.data = self.label_store.views()
 	
 	# MARK: Utils
 	
@@ -494,14 +593,22 @@ class Detection2DDataset(VisionDataset, metaclass=ABCMeta):
 			nb = bi[-1] + 1  # Number of batches
 			
 			# NOTE: Sort data by aspect ratio
-			s     = [data.image_info.shape0 for data in self.data]
-			s     = np.array(s, dtype=np.float64)
+			if self.label_store is not None:
+				s = self.label_store.shape0.astype(np.float64)
+			else:
+				s = [data.image_info.shape0 for data in self.data]
+				s = np.array(s, dtype=np.float64)
 			ar    = s[:, 1] / s[:, 0]  # Aspect ratio
 			irect = ar.argsort()
 			
 			self.image_paths = [self.image_paths[i] for i in irect]
 			self.label_paths = [self.label_paths[i] for i in irect]
-			self.data        = [self.data[i]        for i in irect]
+			if self.label_store is not None:
+				self.label_store = self.label_store.select(irect)
+			if isinstance(self.data, VisionDataList):
+				self.data = self.label_store.views()
+			else:
+				self.data = [self.data[i] for i in irect]
 			ar				 = ar[irect]
 			
 			# NOTE: Set training image shapes
@@ -542,3 +649,6 @@ class Detection2DDataset(VisionDataset, metaclass=ABCMeta):
 					desc="Writing custom annotations", total=len(self.data))
 		for (data, path) in pbar:
 			VisualDataHandler().dump_to_file(data=data, path=path)
+		
+		# NOTE: List the new files on the next `list_files()`
+		FileIndex.invalidate(root=self.root)
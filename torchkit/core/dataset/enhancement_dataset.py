@@ -28,12 +28,19 @@ from ..data.image_info import ImageInfo
 from torchkit.core.data import ImageAugment
 from torchkit.core.data import VisionData
 from torchkit.core.fileio import create_dirs
+from torchkit.core.fileio import FileIndex
 from torchkit.core.fileio import get_hash
 from torchkit.core.image import random_perspective_mask
 from torchkit.core.image import resize_image
 from torchkit.core.utils import Dim3
+from torchkit.core.utils import get_rank
+from torchkit.core.utils import get_world_size
+from torchkit.core.utils import is_main_process
+from torchkit.core.utils import main_process_first
 from .formatter import LABEL_FORMATTERS
 from .handler import VisualDataHandler
+from .image_cache import SharedImageCache
+from .label_store import ImageInfoStore
 
 logger = logging.getLogger()
 
@@ -59,8 +66,11 @@ class EnhancementDataset(VisionDataset, metaclass=ABCMeta):
 		label_paths (list):
 			A list of all label filepaths that can provide extra info about the
 			image and enhanced image.
-		data (list):
-			The list of all `VisionData` objects.
+		data (Sequence[VisionData]):
+			The list of all `VisionData` objects. After loading, it is a
+			`VisionDataList` view of `info_store`, unless `caching_images`.
+		info_store (ImageInfoStore, optional):
+			The image info of all items as columns. Default: `None`.
 		classlabels (ClassLabels, optional):
 			The `ClassLabels` object contains all class-labels defined in the
 			dataset. Default: `None`.
@@ -76,7 +86,16 @@ class EnhancementDataset(VisionDataset, metaclass=ABCMeta):
 		caching_labels (bool):
 			Should overwrite the existing cached labels?
 		caching_images (bool):
-			Cache images into memory for faster training..
+			Cache images into memory for faster training. With more than 1
+			process, each rank caches only its shard of the images (see
+			`ShardedSampler`).
+		cache_budget (int, optional):
+			The byte budget of the shared decoded-image cache used when
+			`caching_images` is `False`. All DataLoader workers share the
+			cache. If `None`, images are decoded from disk each time.
+			Default: `None`.
+		image_cache (SharedImageCache, optional):
+			The shared decoded-image cache.
 		write_labels (bool):
 			After loading images and labels for the first time, we will convert
 			it to our custom data format and write to files.
@@ -112,6 +131,7 @@ class EnhancementDataset(VisionDataset, metaclass=ABCMeta):
 		shape           : Dim3                   = (720, 1280, 3),
 		caching_labels  : bool                   = False,
 		caching_images  : bool                   = False,
+		cache_budget    : Optional[int]          = None,
 		write_labels    : bool                   = False,
 		fast_dev_run    : bool                   = False,
 		augment         : Union[str, dict, None] = None,
@@ -131,11 +151,14 @@ class EnhancementDataset(VisionDataset, metaclass=ABCMeta):
 		self.eimage_paths      = []
 		self.label_paths       = []
 		self.data              = []
+		self.info_store        = None
 		self.classlabels       = classlabels
 		self.shape             = shape
 		self.has_custom_labels = False
 		self.caching_labels    = caching_labels
 		self.caching_images    = caching_images
+		self.cache_budget      = cache_budget
+		self.image_cache       = None
 		self.write_labels      = write_labels
 		self.fast_dev_run      = fast_dev_run
 		
@@ -191,6 +214,24 @@ class EnhancementDataset(VisionDataset, metaclass=ABCMeta):
 			target = self.transforms(target)
 		return image, target, rest
 	
+	# MARK: Properties
+	
+	@property
+	def file_index(self) -> FileIndex:
+		"""Return the persisted index of the files under `root`."""
+		return FileIndex.from_root(root=self.root)
+	
+	@property
+	def sharded(self) -> bool:
+		"""Return `True` if each rank caches only its shard of the images."""
+		return self.caching_images and get_world_size() > 1
+	
+	def shard_indices(self) -> list[int]:
+		"""Return the indices of the images cached by the current rank: the
+		ones `ShardedSampler` draws on it.
+		"""
+		return list(range(get_rank(), len(self.image_paths), get_world_size()))
+	
 	# MARK: Pre-Load Data
 	
 	@abstractmethod
@@ -217,16 +258,18 @@ class EnhancementDataset(VisionDataset, metaclass=ABCMeta):
 		split_prefix      = path[ : path.find(self.split)]
 		cached_label_path = f"{split_prefix}{self.split}.cache"
 		
-		if os.path.isfile(cached_label_path):
-			cache = torch.load(cached_label_path)  # Load
-			if self.caching_labels:  # Force re-cache
-				cache = self.cache_labels(path=cached_label_path)  # Re-cache
-			elif cache["hash"] != get_hash(self.label_paths +
-										   self.image_paths +
-										   self.eimage_paths):  # Dataset changed
-				cache = self.cache_labels(path=cached_label_path)  # Re-cache
-		else:
-			cache = self.cache_labels(path=cached_label_path)  # Cache
+		# NOTE: Rank 0 (re-)caches the labels, the other ranks load its file
+		with main_process_first():
+			if os.path.isfile(cached_label_path):
+				cache = torch.load(cached_label_path)  # Load
+				if self.caching_labels and is_main_process():  # Force re-cache
+					cache = self.cache_labels(path=cached_label_path)
+				elif cache["hash"] != get_hash(self.label_paths +
+											   self.image_paths +
+											   self.eimage_paths):  # Changed
+					cache = self.cache_labels(path=cached_label_path)  # Re-cache
+			else:
+				cache = self.cache_labels(path=cached_label_path)  # Cache
 	
 		# NOTE: Get labels
 		self.data = [cache[x] for x in self.image_paths]
@@ -235,6 +278,13 @@ class EnhancementDataset(VisionDataset, metaclass=ABCMeta):
 		if self.caching_images:
 			self.cache_images()
 			self.cache_enhanced_images()
+		elif self.cache_budget:
+			self.image_cache = SharedImageCache(
+				budget      = self.cache_budget,
+				slot_bytes  = SharedImageCache.slot_bytes_for(self.shape),
+				num_keys    = len(self.image_paths),
+				num_streams = 2,
+			)
 	
 	def cache_labels(self, path: str) -> dict:
 		"""Cache labels, check images and read shapes.
@@ -271,11 +321,12 @@ class EnhancementDataset(VisionDataset, metaclass=ABCMeta):
 				self.caching_labels = True
 		
 		# NOTE: Write cache
-		logger.info(f"Labels has been cached to: {path}.")
 		cache_labels["hash"] = get_hash(self.label_paths +
 										self.image_paths +
 										self.eimage_paths)
-		torch.save(cache_labels, path)  # Save for next time
+		if is_main_process():
+			logger.info(f"Labels has been cached to: {path}.")
+			torch.save(cache_labels, path)  # Save for next time
 		return cache_labels
 	
 	@abstractmethod
@@ -305,9 +356,8 @@ class EnhancementDataset(VisionDataset, metaclass=ABCMeta):
 		"""Cache images into memory for faster training (WARNING: large
 		datasets may exceed system RAM).
 		"""
-		n    = len(self.image_paths)
 		gb   = 0  # Gigabytes of cached images
-		pbar = tqdm(range(n), desc="Caching images")
+		pbar = tqdm(self.shard_indices(), desc="Caching images")
 		for i in pbar:  # Should be max 10k images
 			# image, hw_original, hw_resized
 			(self.data[i].image,
@@ -328,8 +378,17 @@ class EnhancementDataset(VisionDataset, metaclass=ABCMeta):
 			info (ImageInfo):
 				The `ImageInfo` object.
 		"""
-		image = self.data[index].image
-		info  = self.data[index].image_info
+		data  = self.data[index]
+		image = data.image
+		info  = data.image_info
+		
+		if image is None and info is not None and \
+			self.image_cache is not None:
+			image = self.image_cache.get(index=index, stream=0)
+			if image is not None:  # Shared cache hit
+				info.height, info.width = image.shape[:2]
+				info.depth = image.shape[2] if image.ndim > 2 else 1
+				return image, info
 		
 		if image is None:  # Not cached
 			path  = self.image_paths[index]
@@ -346,17 +405,18 @@ class EnhancementDataset(VisionDataset, metaclass=ABCMeta):
 			info.width  = w1 if info.width  != w1 else info.width
 			info.depth  = (image.shape[2] if info.depth != image.shape[2]
 						   else info.depth)
+			if self.image_cache is not None:
+				self.image_cache.put(index=index, image=image, stream=0)
 			return image, info
 		else:
-			return self.data[index].image, self.data[index].image_info
+			return data.image, data.image_info
 	
 	def cache_enhanced_images(self):
 		"""Cache enhanced images into memory for faster training (WARNING:
 		large datasets may exceed system RAM).
 		"""
-		n    = len(self.eimage_paths)
 		gb   = 0  # Gigabytes of cached images
-		pbar = tqdm(range(n), desc="Caching enhanced images")
+		pbar = tqdm(self.shard_indices(), desc="Caching enhanced images")
 		for i in pbar:  # Should be max 10k images
 			# image, hw_original, hw_resized
 			(self.data[i].eimage,
@@ -377,8 +437,17 @@ class EnhancementDataset(VisionDataset, metaclass=ABCMeta):
 			info (ImageInfo):
 				The `ImageInfo` object.
 		"""
-		image = self.data[index].eimage
-		info  = self.data[index].eimage_info
+		data  = self.data[index]
+		image = data.eimage
+		info  = data.eimage_info
+		
+		if image is None and info is not None and \
+			self.image_cache is not None:
+			image = self.image_cache.get(index=index, stream=1)
+			if image is not None:  # Shared cache hit
+				info.height, info.width = image.shape[:2]
+				info.depth = image.shape[2] if image.ndim > 2 else 1
+				return image, info
 		
 		if image is None:  # Not cached
 			path  = self.eimage_paths[index]
@@ -395,9 +464,11 @@ class EnhancementDataset(VisionDataset, metaclass=ABCMeta):
 			info.width  = w1 if info.width  != w1 else info.width
 			info.depth  = (image.shape[2] if info.depth != image.shape[2]
 						   else info.depth)
+			if self.image_cache is not None:
+				self.image_cache.put(index=index, image=image, stream=1)
 			return image, info
 		else:
-			return self.data[index].eimage, self.data[index].eimage_info
+			return data.eimage, data.eimage_info
 	
 	# noinspection PyUnboundLocalVariable
 	def load_mosaic(self, index: int) -> tuple[np.ndarray, np.ndarray]:
@@ -469,8 +540,14 @@ class EnhancementDataset(VisionDataset, metaclass=ABCMeta):
 		to add more operations, just `extend` this method.
 		"""
 		# NOTE: Write data to our custom label format
-		if not self.has_custom_labels or self.write_labels:
+		if (not self.has_custom_labels or self.write_labels) and \
+			is_main_process():
 			self.write_custom_labels()
+		
+		# NOTE: Drop the `VisionData` objects, keep the image info as columns
+		if not self.caching_images:
+			self.info_store = ImageInfoStore.from_vision_data(data=self.data)
+			self.data       = self.info_store.views()
 
 	# MARK: Utils
 	
@@ -499,3 +576,6 @@ class EnhancementDataset(VisionDataset, metaclass=ABCMeta):
 					desc="Writing custom annotations", total=len(self.data))
 		for (data, path) in pbar:
 			VisualDataHandler().dump_to_file(data=data, path=path)
+		
+		# NOTE: List the new files on the next `list_files()`
+		FileIndex.invalidate(root=self.root)
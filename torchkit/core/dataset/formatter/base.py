@@ -11,6 +11,7 @@ from __future__ import annotations
 import logging
 from abc import ABCMeta
 from abc import abstractmethod
+from collections.abc import Sequence
 from typing import Any
 
 from torchkit.core.data import ImageAugment
@@ -26,8 +27,9 @@ class BaseLabelFormatter(metaclass=ABCMeta):
 	Attributes:
 		dataset (object):
 			The dataset object.
-		data (list, optional):
-			The list of data items.
+		data (Sequence, optional):
+			The list of data items (or a list-like view, for example:
+			`VisionDataList`).
 		augment (object, optional):
 			A object contains all hyperparameters for augmentation operations.
 	"""
@@ -45,7 +47,7 @@ class BaseLabelFormatter(metaclass=ABCMeta):
 		if hasattr(self.dataset, "augment"):
 			self.augment = self.dataset.augment
 
-		assert isinstance(self.data, list) and len(self.data) >= 0, \
+		assert isinstance(self.data, Sequence) and len(self.data) >= 0, \
 			f"No data available."
 		assert isinstance(self.augment, ImageAugment), \
 			f"{self.augment} is not a `VisualAugment` object."
@@ -15,11 +15,9 @@ import torch
 
 from torchkit.core.data import ObjectAnnotation as Annotation
 from torchkit.core.image import augment_hsv
-from torchkit.core.image import bbox_cxcywh_norm_xyxy
-from torchkit.core.image import bbox_xyxy_cxcywh_norm
+from torchkit.core.image import convert_boxes
 from torchkit.core.image import letterbox
 from torchkit.core.image import random_perspective_bbox
-from torchkit.core.image import shift_bbox
 from .base import BaseLabelFormatter
 from .builder import LABEL_FORMATTERS
 
@@ -54,12 +52,13 @@ class YoloLabelFormatter(BaseLabelFormatter):
 				The shape of the resized image.
 		"""
 		# NOTE: Prepare data
-		data               = self.data[index]
-		self.load_image    = getattr(self.dataset, "load_image"   , None)
-		self.load_mosaic   = getattr(self.dataset, "load_mosaic"  , None)
-		self.image_size    = getattr(self.dataset, "image_size"   , None)
-		self.batch_shapes  = getattr(self.dataset, "batch_shapes" , None)
-		self.batch_indexes = getattr(self.dataset, "batch_indexes", None)
+		data                  = self.data[index]
+		self.load_image       = getattr(self.dataset, "load_image"      , None)
+		self.load_mosaic      = getattr(self.dataset, "load_mosaic"     , None)
+		self.load_bbox_labels = getattr(self.dataset, "load_bbox_labels", None)
+		self.image_size       = getattr(self.dataset, "image_size"      , None)
+		self.batch_shapes     = getattr(self.dataset, "batch_shapes"    , None)
+		self.batch_indexes    = getattr(self.dataset, "batch_indexes"   , None)
 		assert getattr(data, "objects", None) is not None, \
 			f"{data} doesn't have `objects` attribute."
 		assert self.load_image is not None, \
@@ -103,12 +102,14 @@ class YoloLabelFormatter(BaseLabelFormatter):
 			shape = (h0, w0), ((h / h0, w / w0), pad)
 
 			# Load labels
-			labels         = data.bbox_labels
+			labels         = self.load_bbox_labels(index=index) \
+				if self.load_bbox_labels is not None else data.bbox_labels
 			new_h          = ratio[1] * h
 			new_w          = ratio[0] * w
-			labels[:, 2:6] = bbox_cxcywh_norm_xyxy(labels[:, 2:6],
-												   new_h, new_w)
-			labels[:, 2:6] = shift_bbox(labels[:, 2:6], pad[1], pad[0])
+			convert_boxes(
+				labels[:, 2:6], "cxcywh_norm", "xyxy", new_h, new_w,
+				shift=(pad[0], pad[1]), out=labels[:, 2:6]
+			)
 		
 		# NOTE: Augmentation
 		if self.augment is not None:
@@ -139,9 +140,10 @@ class YoloLabelFormatter(BaseLabelFormatter):
 				labels = labels
 			else:
 				labels = np.zeros((nl, Annotation.bbox_label_len()))
-			labels[:, 2:6] = bbox_xyxy_cxcywh_norm(labels[:, 2:6],
-												   image.shape[0],
-												   image.shape[1])
+			convert_boxes(
+				labels[:, 2:6], "xyxy", "cxcywh_norm", image.shape[0],
+				image.shape[1], out=labels[:, 2:6]
+			)
 			# Flip up-down
 			if random.random() < self.augment.flip_ud:
 				image        = np.flipud(image)
@@ -0,0 +1,300 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Byte-budgeted cache of decoded images stored in shared memory, so all
+DataLoader workers reuse each other's decodes.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing as mp
+import os
+from multiprocessing import shared_memory
+from typing import Optional
+from typing import Union
+
+import numpy as np
+from torch.utils.data import get_worker_info
+
+from torchkit.core.utils import Dim3
+
+logger = logging.getLogger()
+
+__all__ = ["SharedImageCache"]
+
+
+# MARK: - SharedImageCache
+
+class SharedImageCache:
+	"""Shared Image Cache keeps decoded (and resized) uint8 images in a
+	fixed number of equal-size slots of a `SharedMemory` segment. The number
+	of slots is `budget // slot_bytes`, so the cache never exceeds its byte
+	budget. When it is full, the CLOCK policy (an approximation of LRU)
+	evicts a slot that has not been read since the last sweep.
+
+	The cache is created in the main process and attached by name when the
+	dataset is pickled to the DataLoader workers (spawn), or inherited
+	(fork). Insertions and evictions are serialized by a lock. Reads are
+	lock-free: each slot has a version counter (a seqlock) that is odd while
+	the slot is being written, and a read is discarded if the version changed
+	while copying.
+
+	Keys are `index * num_streams + stream`, where `stream` distinguishes the
+	images of the same item (for example: the image and the enhanced image).
+
+	Attributes:
+		budget (int):
+			The byte budget of the image data.
+		slot_bytes (int):
+			The size of one slot. Images larger than that are not cached.
+		num_keys (int):
+			The number of items in the dataset.
+		num_streams (int):
+			The number of images per item. Default: `1`.
+		max_workers (int):
+			The maximum number of workers tracked in the stats. Default: `64`.
+		num_slots (int):
+			The number of images that fit in the budget.
+	"""
+
+	stat_names = ["hits", "misses", "inserts", "evictions"]
+
+	# MARK: Magic Functions
+
+	def __init__(
+		self,
+		budget     : int,
+		slot_bytes : int,
+		num_keys   : int,
+		num_streams: int = 1,
+		max_workers: int = 64,
+	):
+		self.budget      = int(budget)
+		self.slot_bytes  = int(slot_bytes)
+		self.num_keys    = int(num_keys) * num_streams
+		self.num_streams = num_streams
+		self.max_workers = max_workers
+		self.num_slots   = self.budget // self.slot_bytes
+		if self.num_slots < 1:
+			raise ValueError(f"`budget` ({self.budget} bytes) is smaller than "
+							 f"one image ({self.slot_bytes} bytes).")
+
+		self.owner = os.getpid()
+		self.lock  = mp.Lock()
+		self.data  = shared_memory.SharedMemory(
+			create=True, size=self.num_slots * self.slot_bytes
+		)
+		self.meta  = shared_memory.SharedMemory(
+			create=True, size=self.meta_size() * 8
+		)
+		self.map_arrays()
+		self.slot_of[:]  = -1
+		self.key_of[:]   = -1
+		self.shape_of[:] = 0
+		self.ref[:]      = 0
+		self.version[:]  = 0
+		self.hand[:]     = 0
+		self.counts[:]   = 0
+		logger.info(f"Shared image cache: {self.num_slots} slots of "
+					f"{self.slot_bytes / 1E6:.1f}MB "
+					f"({self.num_slots * self.slot_bytes / 1E9:.2f}GB).")
+
+	def __len__(self) -> int:
+		"""Return the number of cached images."""
+		return int(np.count_nonzero(self.key_of >= 0))
+
+	def __contains__(self, key: int) -> bool:
+		return 0 <= key < self.num_keys and self.slot_of[key] >= 0
+
+	def __getstate__(self) -> dict:
+		"""Drop the numpy views. The segments are re-attached by name."""
+		state = self.__dict__.copy()
+		for name in ["data", "meta", "slot_of", "key_of", "shape_of", "ref",
+					 "version", "hand", "counts"]:
+			state.pop(name, None)
+		state["data_name"] = self.data.name
+		state["meta_name"] = self.meta.name
+		return state
+
+	def __setstate__(self, state: dict):
+		data_name = state.pop("data_name")
+		meta_name = state.pop("meta_name")
+		self.__dict__.update(state)
+		self.data = attach_shared_memory(data_name)
+		self.meta = attach_shared_memory(meta_name)
+		self.map_arrays()
+
+	def __del__(self):
+		self.close()
+
+	def __repr__(self) -> str:
+		stats = self.stats()
+		return (f"{self.__class__.__name__}("
+				f"images={stats['images']}/{self.num_slots}, "
+				f"hit_rate={stats['hit_rate']:.3f})")
+
+	# MARK: Configure
+
+	@staticmethod
+	def slot_bytes_for(shape: Union[Dim3, int], channels: int = 3) -> int:
+		"""Return the largest size (bytes) of an image resized by
+		`resize_image(image, shape)`: exactly [H, W, C] for a tuple, at most
+		[shape, shape, C] for an int.
+		"""
+		if isinstance(shape, int):
+			return shape * shape * channels
+		c = shape[2] if len(shape) > 2 else channels
+		return int(shape[0]) * int(shape[1]) * int(c)
+
+	def meta_size(self) -> int:
+		"""Return the number of int64 of the metadata segment."""
+		return (self.num_keys                 # slot_of
+				+ self.num_slots * 6          # key_of, shape_of, ref, version
+				+ 1                           # hand
+				+ (self.max_workers + 1) * len(self.stat_names))
+
+	def map_arrays(self):
+		"""Create the numpy views of the metadata segment."""
+		meta  = np.ndarray((self.meta_size(),), dtype=np.int64,
+						   buffer=self.meta.buf)
+		sizes = [
+			("slot_of" , self.num_keys),
+			("key_of"  , self.num_slots),
+			("shape_of", self.num_slots * 3),
+			("ref"     , self.num_slots),
+			("version" , self.num_slots),
+			("hand"    , 1),
+			("counts"  , (self.max_workers + 1) * len(self.stat_names)),
+		]
+		start = 0
+		for name, size in sizes:
+			setattr(self, name, meta[start:start + size])
+			start += size
+		self.shape_of = self.shape_of.reshape(self.num_slots, 3)
+		self.counts   = self.counts.reshape(self.max_workers + 1, -1)
+
+	def close(self):
+		"""Detach from the segments, and unlink them in the owner process."""
+		if "meta" not in self.__dict__:
+			return
+		for name in ["slot_of", "key_of", "shape_of", "ref", "version",
+					 "hand", "counts"]:
+			self.__dict__.pop(name, None)
+		data = self.__dict__.pop("data")
+		meta = self.__dict__.pop("meta")
+		for shm in [data, meta]:
+			try:
+				shm.close()
+				if self.owner == os.getpid():
+					shm.unlink()
+			except (BufferError, FileNotFoundError):
+				pass
+
+	# MARK: Get/Put
+
+	def get(self, index: int, stream: int = 0) -> Optional[np.ndarray]:
+		"""Return a copy of the cached image, or `None` on a miss."""
+		key   = index * self.num_streams + stream
+		row   = self.worker_row()
+		slot  = int(self.slot_of[key])
+		image = None
+		if slot >= 0:
+			version = int(self.version[slot])
+			if version % 2 == 0 and self.key_of[slot] == key:
+				shape = tuple(int(s) for s in self.shape_of[slot] if s > 0)
+				image = np.ndarray(
+					shape, dtype=np.uint8, buffer=self.data.buf,
+					offset=slot * self.slot_bytes
+				).copy()
+				if self.version[slot] != version:  # Overwritten while copying
+					image = None
+				else:
+					self.ref[slot] = 1
+		self.counts[row, 0 if image is not None else 1] += 1
+		return image
+
+	def put(self, index: int, image: np.ndarray, stream: int = 0) -> bool:
+		"""Insert the image, evicting another one if needed. Return `False`
+		if the image is already cached or cannot be cached.
+		"""
+		key = index * self.num_streams + stream
+		if image.dtype != np.uint8 or image.ndim > 3 or \
+			image.nbytes > self.slot_bytes:
+			return False
+		row = self.worker_row()
+		with self.lock:
+			if self.slot_of[key] >= 0:  # Inserted by another worker
+				return False
+			slot = self.next_victim()
+			old  = int(self.key_of[slot])
+			self.version[slot] += 1  # Odd: being written
+			if old >= 0:
+				self.slot_of[old]     = -1
+				self.counts[row, 3] += 1
+			dst = np.ndarray(
+				image.shape, dtype=np.uint8, buffer=self.data.buf,
+				offset=slot * self.slot_bytes
+			)
+			dst[...]            = image
+			self.shape_of[slot] = list(image.shape) + [0] * (3 - image.ndim)
+			self.key_of[slot]   = key
+			self.ref[slot]      = 1
+			self.version[slot] += 1  # Even: readable
+			self.slot_of[key]   = slot
+			self.counts[row, 2] += 1
+		return True
+
+	def next_victim(self) -> int:
+		"""Advance the CLOCK hand to a free slot or to a slot whose reference
+		bit is clear, clearing the bits it passes. Must hold the lock.
+		"""
+		hand = int(self.hand[0])
+		while True:
+			slot = hand
+			hand = (hand + 1) % self.num_slots
+			if self.key_of[slot] < 0 or self.ref[slot] == 0:
+				break
+			self.ref[slot] = 0
+		self.hand[0] = hand
+		return slot
+
+	# MARK: Stats
+
+	def worker_row(self) -> int:
+		"""Return the stats row of the current process: 0 for the main
+		process, `worker_id + 1` for the DataLoader workers.
+		"""
+		info = get_worker_info()
+		if info is None:
+			return 0
+		return min(info.id + 1, self.max_workers)
+
+	def stats(self) -> dict:
+		"""Return the hit/miss/insert/eviction counts summed over all
+		processes, the hit rate, and the memory in use.
+		"""
+		counts = self.counts.sum(axis=0)
+		stats  = {name: int(c) for name, c in zip(self.stat_names, counts)}
+		lookups           = stats["hits"] + stats["misses"]
+		stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+		stats["images"]   = len(self)
+		stats["bytes"]    = int(np.prod(
+			np.maximum(self.shape_of, 1), axis=1
+		)[self.key_of >= 0].sum())
+		stats["budget"]   = self.budget
+		return stats
+
+	def reset_stats(self):
+		"""Reset the counts (for example, at the start of each epoch)."""
+		self.counts[:] = 0
+
+
+def attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+	"""Attach to an existing segment without registering it again to the
+	resource tracker (only the creator unlinks it).
+	"""
+	try:
+		return shared_memory.SharedMemory(name=name, track=False)
+	except TypeError:  # Python < 3.13
+		return shared_memory.SharedMemory(name=name)
@@ -0,0 +1,381 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Columnar label store of a whole split: the labels of all images are kept
+in a few contiguous numpy arrays and saved to a single `.npz` file. The image
+info of the enhancement datasets is kept the same way.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Optional
+from typing import Union
+
+import numpy as np
+
+from torchkit.core.data import ImageInfo
+from torchkit.core.data import ObjectAnnotation
+from torchkit.core.data import VisionData
+
+logger = logging.getLogger()
+
+__all__ = ["ImageInfoStore", "LabelStore", "VisionDataList"]
+
+
+# MARK: - LabelStore
+
+class LabelStore:
+	"""Label Store keeps the labels of a split as columns instead of one
+	`VisionData` (and one JSON file) per image. The objects of image `i` are
+	the rows `offsets[i]:offsets[i + 1]` of the object columns, so reading
+	the labels of an image is a slice.
+
+	Notes:
+		Only the detection labels are stored. The objects' segmentations and
+		keypoints are not.
+
+	Attributes:
+		paths (np.ndarray):
+			The image paths [N].
+		shape0 (np.ndarray):
+			The original image shapes as [H, W, C] [N, 3].
+		offsets (np.ndarray):
+			The start of the objects of each image [N + 1].
+		image_id (np.ndarray):
+			The objects' image IDs [M].
+		class_id (np.ndarray):
+			The objects' class IDs [M].
+		bbox (np.ndarray):
+			The objects' boxes in [cx_norm, cy_norm, w_norm, h_norm] [M, 4].
+		confidence (np.ndarray):
+			The objects' confidences [M].
+		area (np.ndarray):
+			The objects' box areas (pixels) [M].
+		flags (np.ndarray):
+			The objects' [truncation, occlusion, difficult, is_crowd] [M, 4].
+		hash (int):
+			The hash of the label and image files the store was built from.
+	"""
+
+	columns = ["paths", "shape0", "offsets", "image_id", "class_id", "bbox",
+			   "confidence", "area", "flags"]
+
+	# MARK: Magic Functions
+
+	def __init__(
+		self,
+		paths     : np.ndarray,
+		shape0    : np.ndarray,
+		offsets   : np.ndarray,
+		image_id  : np.ndarray,
+		class_id  : np.ndarray,
+		bbox      : np.ndarray,
+		confidence: np.ndarray,
+		area      : np.ndarray,
+		flags     : np.ndarray,
+		hash      : int = 0,
+	):
+		self.paths      = paths
+		self.shape0     = shape0
+		self.offsets    = offsets
+		self.image_id   = image_id
+		self.class_id   = class_id
+		self.bbox       = bbox
+		self.confidence = confidence
+		self.area       = area
+		self.flags      = flags
+		self.hash       = int(hash)
+
+	def __len__(self) -> int:
+		"""Return the number of images."""
+		return len(self.paths)
+
+	# MARK: Properties
+
+	@property
+	def num_objects(self) -> int:
+		"""Return the number of objects of all images."""
+		return len(self.class_id)
+
+	# MARK: Configure
+
+	@staticmethod
+	def from_vision_data(
+		data: list[VisionData], image_paths: list[str], hash: int = 0
+	) -> LabelStore:
+		"""Create a `LabelStore` object from a list of `VisionData` objects,
+		one per image path.
+		"""
+		counts = np.array([len(d.objects) for d in data], dtype=np.int64)
+		objs   = [o for d in data for o in d.objects]
+		bbox   = np.zeros((len(objs), 4), dtype=np.float32)
+		for i, o in enumerate(objs):
+			bbox[i] = o.bbox
+		return LabelStore(
+			paths      = np.array(image_paths, dtype=str),
+			shape0     = np.array([d.image_info.shape0 for d in data],
+								  dtype=np.int32).reshape(-1, 3),
+			offsets    = np.concatenate(([0], np.cumsum(counts))),
+			image_id   = np.array([o.image_id or 0 for o in objs], np.float32),
+			class_id   = np.array([o.class_id for o in objs], np.int32),
+			bbox       = bbox,
+			confidence = np.array([o.confidence for o in objs], np.float32),
+			area       = np.array([o.area for o in objs], np.float32),
+			flags      = np.array(
+				[[o.truncation, o.occlusion, o.difficult, o.is_crowd]
+				 for o in objs], dtype=np.float32
+			).reshape(-1, 4),
+			hash       = hash,
+		)
+
+	@staticmethod
+	def load_from_file(path: str) -> Optional[LabelStore]:
+		"""Load the store from a `.npz` file. Return `None` if the file does
+		not exist.
+		"""
+		if not os.path.isfile(path):
+			return None
+		with np.load(path, allow_pickle=False) as f:
+			columns = {k: f[k] for k in LabelStore.columns}
+			columns["hash"] = int(f["hash"])
+		return LabelStore(**columns)
+
+	def dump_to_file(self, path: str):
+		"""Save the store to a single uncompressed `.npz` file."""
+		columns = {k: getattr(self, k) for k in self.columns}
+		with open(path, "wb") as f:
+			np.savez(f, hash=np.int64(self.hash), **columns)
+		logger.info(f"Labels of {len(self)} images ({self.num_objects} "
+					f"objects) have been stored to: {path}.")
+
+	def select(self, indices: np.ndarray) -> LabelStore:
+		"""Return a new store with the images reordered/subset by `indices`."""
+		indices = np.asarray(indices, dtype=np.int64)
+		starts  = self.offsets[indices]
+		counts  = self.offsets[indices + 1] - starts
+		offsets = np.concatenate(([0], np.cumsum(counts)))
+		# NOTE: Concatenated ranges [start, start + count) of each image
+		rows    = np.repeat(starts - offsets[:-1], counts) + \
+			np.arange(offsets[-1])
+		return LabelStore(
+			paths      = self.paths[indices],
+			shape0     = self.shape0[indices],
+			offsets    = offsets,
+			image_id   = self.image_id[rows],
+			class_id   = self.class_id[rows],
+			bbox       = self.bbox[rows],
+			confidence = self.confidence[rows],
+			area       = self.area[rows],
+			flags      = self.flags[rows],
+			hash       = self.hash,
+		)
+
+	def rows_of(self, image_paths: list[str]) -> Optional[np.ndarray]:
+		"""Return the indices of `image_paths` in the store, or `None` if
+		some of them are not stored.
+		"""
+		if len(image_paths) == len(self.paths) and \
+			np.array_equal(self.paths, np.array(image_paths, dtype=str)):
+			return np.arange(len(self.paths))
+		index = {p: i for i, p in enumerate(self.paths.tolist())}
+		rows  = [index.get(p, -1) for p in image_paths]
+		if -1 in rows:
+			return None
+		return np.array(rows, dtype=np.int64)
+
+	# MARK: Access
+
+	def bbox_labels(self, index: int) -> np.ndarray:
+		"""Return the bounding box labels of an image, as `VisionData`:
+		<image_id> <class_id> <cx_norm> <cy_norm> <w_norm> <h_norm>
+		<confidence> <area> <truncation> <occlusion>
+		"""
+		s      = slice(self.offsets[index], self.offsets[index + 1])
+		labels = np.empty((s.stop - s.start, 10), dtype=np.float32)
+		labels[:, 0]   = self.image_id[s]
+		labels[:, 1]   = self.class_id[s]
+		labels[:, 2:6] = self.bbox[s]
+		labels[:, 6]   = self.confidence[s]
+		labels[:, 7]   = self.area[s]
+		labels[:, 8:]  = self.flags[s, 0:2]
+		return labels
+
+	def vision_data(self, index: int) -> VisionData:
+		"""Build the `VisionData` object of an image."""
+		path       = str(self.paths[index])
+		h0, w0, c  = (int(x) for x in self.shape0[index])
+		image_info = ImageInfo(
+			id      = Path(path).stem,
+			name    = Path(path).name,
+			path    = path,
+			height0 = h0,
+			width0  = w0,
+			height  = h0,
+			width   = w0,
+			depth   = c,
+		)
+		objects = []
+		for i in range(self.offsets[index], self.offsets[index + 1]):
+			objects.append(ObjectAnnotation(
+				image_id   = self.image_id[i].item(),
+				class_id   = int(self.class_id[i]),
+				bbox       = self.bbox[i].copy(),
+				confidence = float(self.confidence[i]),
+				area       = float(self.area[i]),
+				truncation = float(self.flags[i, 0]),
+				occlusion  = float(self.flags[i, 1]),
+				difficult  = float(self.flags[i, 2]),
+				is_crowd   = int(self.flags[i, 3]),
+			))
+		return VisionData(image_info=image_info, objects=objects)
+
+	def views(self) -> VisionDataList:
+		"""Return a list-like view that builds the `VisionData` objects on
+		demand.
+		"""
+		return VisionDataList(store=self)
+
+
+# MARK: - ImageInfoStore
+
+class ImageInfoStore:
+	"""Image Info Store keeps the image info of an enhancement split (the
+	image and the enhanced image of each item) as columns instead of one
+	`VisionData` with two `ImageInfo` per item.
+
+	Attributes:
+		paths (np.ndarray):
+			The image paths [N].
+		ids (np.ndarray):
+			The image IDs [N].
+		shape0 (np.ndarray):
+			The original image shapes as [H, W, C] [N, 3].
+		epaths (np.ndarray):
+			The enhanced image paths [N].
+		eids (np.ndarray):
+			The enhanced image IDs [N].
+		eshape0 (np.ndarray):
+			The original enhanced image shapes as [H, W, C] [N, 3].
+	"""
+
+	# MARK: Magic Functions
+
+	def __init__(
+		self,
+		paths  : np.ndarray,
+		ids    : np.ndarray,
+		shape0 : np.ndarray,
+		epaths : np.ndarray,
+		eids   : np.ndarray,
+		eshape0: np.ndarray,
+	):
+		self.paths   = paths
+		self.ids     = ids
+		self.shape0  = shape0
+		self.epaths  = epaths
+		self.eids    = eids
+		self.eshape0 = eshape0
+
+	def __len__(self) -> int:
+		"""Return the number of items."""
+		return len(self.paths)
+
+	# MARK: Configure
+
+	@staticmethod
+	def from_vision_data(data: Sequence[VisionData]) -> ImageInfoStore:
+		"""Create an `ImageInfoStore` object from the `image_info` and
+		`eimage_info` of a list of `VisionData` objects.
+		"""
+		infos  = [d.image_info  or ImageInfo() for d in data]
+		einfos = [d.eimage_info or ImageInfo() for d in data]
+		return ImageInfoStore(
+			paths   = np.array([i.path for i in infos], dtype=str),
+			ids     = np.array([str(i.id) for i in infos], dtype=str),
+			shape0  = np.array([i.shape0 for i in infos],
+							   dtype=np.int32).reshape(-1, 3),
+			epaths  = np.array([i.path for i in einfos], dtype=str),
+			eids    = np.array([str(i.id) for i in einfos], dtype=str),
+			eshape0 = np.array([i.shape0 for i in einfos],
+							   dtype=np.int32).reshape(-1, 3),
+		)
+
+	# MARK: Access
+
+	@staticmethod
+	def image_info(path: str, id: str, shape0: np.ndarray) -> ImageInfo:
+		"""Build an `ImageInfo` object. The resized shape is the original one
+		until the image is loaded.
+		"""
+		h0, w0, c = (int(x) for x in shape0)
+		return ImageInfo(
+			id      = id,
+			name    = Path(path).name,
+			path    = path,
+			height0 = h0,
+			width0  = w0,
+			height  = h0,
+			width   = w0,
+			depth   = c,
+		)
+
+	def vision_data(self, index: int) -> VisionData:
+		"""Build the `VisionData` object of an item."""
+		return VisionData(
+			image_info  = self.image_info(
+				str(self.paths[index]), str(self.ids[index]),
+				self.shape0[index]
+			),
+			eimage_info = self.image_info(
+				str(self.epaths[index]), str(self.eids[index]),
+				self.eshape0[index]
+			),
+		)
+
+	def views(self) -> VisionDataList:
+		"""Return a list-like view that builds the `VisionData` objects on
+		demand.
+		"""
+		return VisionDataList(store=self)
+
+
+# MARK: - VisionDataList
+
+class VisionDataList(Sequence):
+	"""Vision Data List is a read-only sequence of `VisionData` objects built
+	on demand from a `LabelStore` or an `ImageInfoStore`. Datasets hold it instead of a list of
+	`VisionData` so the metadata is a few numpy arrays: forked DataLoader
+	workers do not touch (and copy-on-write) one Python object per image and
+	per annotation.
+
+	Notes:
+		Each access builds new objects, so assigning their attributes (for
+		example: `data[i].image = ...`) has no effect. Use a list when the
+		objects must be modified (for example: `caching_images`).
+
+	Attributes:
+		store (LabelStore, ImageInfoStore):
+			The store.
+	"""
+
+	# MARK: Magic Functions
+
+	def __init__(self, store: Union[LabelStore, ImageInfoStore]):
+		self.store = store
+
+	def __len__(self) -> int:
+		return len(self.store)
+
+	def __getitem__(self, index: Union[int, slice]):
+		if isinstance(index, slice):
+			return [self.store.vision_data(i)
+					for i in range(*index.indices(len(self)))]
+		if index < 0:
+			index += len(self)
+		if not 0 <= index < len(self):
+			raise IndexError(f"Index {index} is out of range [0, {len(self)}).")
+		return self.store.vision_data(index)
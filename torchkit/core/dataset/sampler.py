@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Samplers for distributed training.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Iterator
+from typing import Optional
+
+import torch
+from torch.utils.data import Dataset
+from torch.utils.data import DistributedSampler
+
+from torchkit.core.utils import get_rank
+from torchkit.core.utils import get_world_size
+
+logger = logging.getLogger()
+
+__all__ = ["ShardedSampler"]
+
+
+# MARK: - ShardedSampler
+
+class ShardedSampler(DistributedSampler):
+	"""Sharded Sampler gives each rank the same fixed shard every epoch: the
+	indices `rank, rank + world_size, ...`, which are the images the dataset
+	cached on that rank with `caching_images` (see `shard_indices()`). The
+	order inside the shard is shuffled with `seed + epoch`, so Lightning's
+	`set_epoch()` reshuffles it at every epoch.
+
+	`DistributedSampler` reshuffles the whole dataset across ranks, so most of
+	the images a rank draws would not be in its memory.
+
+	Notes:
+		All shards are cut (`drop_last`) or padded by repeating their first
+		indices to the same length, so every rank runs the same number of
+		steps.
+	"""
+
+	# MARK: Magic Functions
+
+	def __init__(
+		self,
+		dataset     : Dataset,
+		num_replicas: Optional[int] = None,
+		rank        : Optional[int] = None,
+		shuffle     : bool          = True,
+		seed        : int           = 0,
+		drop_last   : bool          = False,
+	):
+		super().__init__(
+			dataset      = dataset,
+			num_replicas = get_world_size() if num_replicas is None
+						   else num_replicas,
+			rank         = get_rank() if rank is None else rank,
+			shuffle      = shuffle,
+			seed         = seed,
+			drop_last    = drop_last,
+		)
+
+	def __iter__(self) -> Iterator[int]:
+		indices = list(range(self.rank, len(self.dataset), self.num_replicas))
+		if self.shuffle:
+			g = torch.Generator()
+			g.manual_seed(self.seed + self.epoch)
+			order   = torch.randperm(len(indices), generator=g).tolist()
+			indices = [indices[i] for i in order]
+
+		# NOTE: Same length on all ranks
+		if 0 < len(indices) < self.num_samples:
+			padding  = self.num_samples - len(indices)
+			indices += (indices * (padding // len(indices) + 1))[:padding]
+		indices = indices[:self.num_samples]
+		return iter(indices)
@@ -21,6 +21,8 @@ import cv2
 import numpy as np
 import torch
 import torchvision
+from joblib import delayed
+from joblib import Parallel
 from torchvision.datasets import VisionDataset
 from tqdm import tqdm
 
@@ -29,14 +31,21 @@ from ..data.image_info import ImageInfo
 from torchkit.core.data import ImageAugment
 from torchkit.core.data import VisionData
 from torchkit.core.fileio import create_dirs
+from torchkit.core.fileio import FileIndex
 from torchkit.core.fileio import get_hash
-from torchkit.core.image import create_semantic_image
 from torchkit.core.image import is_image_file
+from torchkit.core.image import pack_polygons
 from torchkit.core.image import random_perspective_mask
+from torchkit.core.image import rasterize_polygons
 from torchkit.core.image import resize_image
 from torchkit.core.utils import Dim3
+from torchkit.core.utils import get_rank
+from torchkit.core.utils import get_world_size
+from torchkit.core.utils import is_main_process
+from torchkit.core.utils import main_process_first
 from .formatter import LABEL_FORMATTERS
 from .handler import VisualDataHandler
+from .image_cache import SharedImageCache
 
 logger = logging.getLogger()
 
@@ -80,7 +89,29 @@ class SemanticDataset(VisionDataset, metaclass=ABCMeta):
         caching_labels (bool):
             Should overwrite the existing cached labels?
         caching_images (bool):
-            Cache images into memory for faster training.
+            Cache images into memory for faster training. With more than 1
+            process, each rank caches only its shard of the images (see
+            `ShardedSampler`).
+        cache_budget (int, optional):
+            The byte budget of the shared decoded-image cache used when
+            `caching_images` is `False`. All DataLoader workers share the
+            cache. If `None`, images are decoded from disk each time.
+            Default: `None`.
+        image_cache (SharedImageCache, optional):
+            The shared decoded-image cache.
+        rasterize_semantic (bool):
+            If `True`, keep the objects' polygons packed in memory and
+            rasterize the semantic segmentation images on-the-fly in
+            `load_semantic_image()`, instead of writing and decoding PNG
+            files. Default: `False`.
+        polygon_vertices (np.ndarray):
+            The vertices of the packed polygons of all images [V, 2].
+        polygon_table (np.ndarray):
+            The packed polygons of all images as (number of vertices, class
+            ID) [P, 2].
+        polygon_offsets (np.ndarray):
+            The start of each image in `polygon_vertices` and `polygon_table`
+            [N + 1, 2].
         write_labels (bool):
             After loading images and labels for the first time, we will convert
             it to our custom data format and write to files.
@@ -107,19 +138,21 @@ class SemanticDataset(VisionDataset, metaclass=ABCMeta):
     
     def __init__(
         self,
-        root            : str,
-        split           : str,
-        classlabels     : ClassLabels            = None,
-        shape           : Dim3                   = (720, 1280, 3),
-        encoding        : str                    = "id",
-        caching_labels  : bool                   = False,
-        caching_images  : bool                   = False,
-        write_labels    : bool                   = False,
-        fast_dev_run    : bool                   = False,
-        augment         : Union[str, dict, None] = None,
-        transforms      : Optional[Callable]     = None,
-        transform       : Optional[Callable]     = None,
-        target_transform: Optional[Callable]     = None,
+        root              : str,
+        split             : str,
+        classlabels       : ClassLabels            = None,
+        shape             : Dim3                   = (720, 1280, 3),
+        encoding          : str                    = "id",
+        caching_labels    : bool                   = False,
+        caching_images    : bool                   = False,
+        cache_budget      : Optional[int]          = None,
+        rasterize_semantic: bool                   = False,
+        write_labels      : bool                   = False,
+        fast_dev_run      : bool                   = False,
+        augment           : Union[str, dict, None] = None,
+        transforms        : Optional[Callable]     = None,
+        transform         : Optional[Callable]     = None,
+        target_transform  : Optional[Callable]     = None,
         *args, **kwargs
     ):
         super().__init__(
@@ -128,20 +161,26 @@ class SemanticDataset(VisionDataset, metaclass=ABCMeta):
             transform        = transform,
             target_transform = target_transform
         )
-        self.split             = split
-        self.image_paths       = []
-        self.semantic_paths    = []
-        self.label_paths       = []
-        self.data              = []
-        self.classlabels       = classlabels
-        self.shape             = shape
-        self.encoding          = encoding
-        self.has_custom_labels = False
-        self.has_subdirs       = False
-        self.caching_labels    = caching_labels
-        self.caching_images    = caching_images
-        self.write_labels      = write_labels
-        self.fast_dev_run      = fast_dev_run
+        self.split              = split
+        self.image_paths        = []
+        self.semantic_paths     = []
+        self.label_paths        = []
+        self.data               = []
+        self.classlabels        = classlabels
+        self.shape              = shape
+        self.encoding           = encoding
+        self.has_custom_labels  = False
+        self.has_subdirs        = False
+        self.caching_labels     = caching_labels
+        self.caching_images     = caching_images
+        self.cache_budget       = cache_budget
+        self.image_cache        = None
+        self.rasterize_semantic = rasterize_semantic
+        self.polygon_vertices   = None
+        self.polygon_table      = None
+        self.polygon_offsets    = None
+        self.write_labels       = write_labels
+        self.fast_dev_run       = fast_dev_run
         
         # NOTE: Define augmentation parameters
         if isinstance(augment, dict):
@@ -195,6 +234,24 @@ class SemanticDataset(VisionDataset, metaclass=ABCMeta):
             target = self.transforms(target)
         return image, target, rest
     
+    # MARK: Properties
+    
+    @property
+    def file_index(self) -> FileIndex:
+        """Return the persisted index of the files under `root`."""
+        return FileIndex.from_root(root=self.root)
+    
+    @property
+    def sharded(self) -> bool:
+        """Return `True` if each rank caches only its shard of the images."""
+        return self.caching_images and get_world_size() > 1
+    
+    def shard_indices(self) -> list[int]:
+        """Return the indices of the images cached by the current rank: the
+        ones `ShardedSampler` draws on it.
+        """
+        return list(range(get_rank(), len(self.image_paths), get_world_size()))
+    
     # MARK: Pre-Load Data
     
     @abstractmethod
@@ -222,16 +279,18 @@ class SemanticDataset(VisionDataset, metaclass=ABCMeta):
         split_prefix      = path[: path.find(self.split)]
         cached_label_path = f"{split_prefix}{self.split}.cache"
         
-        if os.path.isfile(cached_label_path):
-            cache = torch.load(cached_label_path)  # Load
-            if self.caching_labels:  # Force re-cache
-                cache = self.cache_labels(path=cached_label_path)  # Re-cache
-            elif cache["hash"] != get_hash(self.label_paths +
-                                           self.image_paths +
-                                           self.semantic_paths):  # Dataset changed
-                cache = self.cache_labels(path=cached_label_path)  # Re-cache
-        else:
-            cache = self.cache_labels(path=cached_label_path)  # Cache
+        # NOTE: Rank 0 (re-)caches the labels, the other ranks load its file
+        with main_process_first():
+            if os.path.isfile(cached_label_path):
+                cache = torch.load(cached_label_path)  # Load
+                if self.caching_labels and is_main_process():  # Force re-cache
+                    cache = self.cache_labels(path=cached_label_path)
+                elif cache["hash"] != get_hash(self.label_paths +
+                                               self.image_paths +
+                                               self.semantic_paths):  # Changed
+                    cache = self.cache_labels(path=cached_label_path)  # Re-cache
+            else:
+                cache = self.cache_labels(path=cached_label_path)  # Cache
     
         # NOTE: Get labels
         self.data = [cache[x] for x in self.image_paths]
@@ -240,6 +299,13 @@ class SemanticDataset(VisionDataset, metaclass=ABCMeta):
         if self.caching_images:
             self.cache_images()
             self.cache_semantic_images()
+        elif self.cache_budget:
+            self.image_cache = SharedImageCache(
+                budget      = self.cache_budget,
+                slot_bytes  = SharedImageCache.slot_bytes_for(self.shape),
+                num_keys    = len(self.image_paths),
+                num_streams = 2,
+            )
     
     def cache_labels(self, path: str) -> dict:
         """Cache labels, check images and read shapes.
@@ -272,11 +338,12 @@ class SemanticDataset(VisionDataset, metaclass=ABCMeta):
                 self.caching_labels = True
         
         # NOTE: Write cache
-        logger.info(f"Labels has been cached to: {path}.")
         cache_labels["hash"] = get_hash(self.label_paths +
                                         self.image_paths +
                                         self.semantic_paths)
-        torch.save(cache_labels, path)  # Save for next time
+        if is_main_process():
+            logger.info(f"Labels has been cached to: {path}.")
+            torch.save(cache_labels, path)  # Save for next time
         return cache_labels
     
     @abstractmethod
@@ -306,9 +373,8 @@ class SemanticDataset(VisionDataset, metaclass=ABCMeta):
         """Cache images into memory for faster training (WARNING: large
         datasets may exceed system RAM).
         """
-        n    = len(self.image_paths)
         gb   = 0  # Gigabytes of cached images
-        pbar = tqdm(range(n), desc="Caching images")
+        pbar = tqdm(self.shard_indices(), desc="Caching images")
         for i in pbar:  # Should be max 10k images
             # image, hw_original, hw_resized
             (self.data[i].image,
@@ -332,6 +398,14 @@ class SemanticDataset(VisionDataset, metaclass=ABCMeta):
         image = self.data[index].image
         info  = self.data[index].image_info
         
+        if image is None and info is not None and \
+            self.image_cache is not None:
+            image = self.image_cache.get(index=index, stream=0)
+            if image is not None:  # Shared cache hit
+                info.height, info.width = image.shape[:2]
+                info.depth = image.shape[2] if image.ndim > 2 else 1
+                return image, info
+        
         if image is None:  # Not cached
             path  = self.image_paths[index]
             image = cv2.imread(path)  # BGR
@@ -347,6 +421,8 @@ class SemanticDataset(VisionDataset, metaclass=ABCMeta):
             info.width  = w1 if info.width  != w1 else info.width
             info.depth  = (image.shape[2] if info.depth != image.shape[2]
                            else info.depth)
+            if self.image_cache is not None:
+                self.image_cache.put(index=index, image=image, stream=0)
             return image, info
         else:
             return self.data[index].image, self.data[index].image_info
@@ -359,9 +435,9 @@ class SemanticDataset(VisionDataset, metaclass=ABCMeta):
             if not is_image_file(path=semantic_path):
                 return
         
-        n    = len(self.semantic_paths)
         gb   = 0  # Gigabytes of cached images
-        pbar = tqdm(range(n), desc="Caching semantic segmentation image")
+        pbar = tqdm(self.shard_indices(),
+                    desc="Caching semantic segmentation image")
         for i in pbar:  # Should be max 10k images
             # image, hw_original, hw_resized
             (self.data[i].semantic,
@@ -385,6 +461,17 @@ class SemanticDataset(VisionDataset, metaclass=ABCMeta):
         image = self.data[index].semantic
         info  = self.data[index].semantic_info
         
+        if image is None and info is not None and \
+            self.image_cache is not None:
+            image = self.image_cache.get(index=index, stream=1)
+            if image is not None:  # Shared cache hit
+                info.height, info.width = image.shape[:2]
+                info.depth = image.shape[2] if image.ndim > 2 else 1
+                return image, info
+        
+        if image is None and self.rasterize_semantic:
+            return self.rasterize_semantic_image(index=index)
+        
         if image is None:  # Not cached
             path  = self.semantic_paths[index]
             image = cv2.imread(path)  # BGR
@@ -401,6 +488,8 @@ class SemanticDataset(VisionDataset, metaclass=ABCMeta):
             info.width  = w1 if info.width  != w1 else info.width
             info.depth  = (image.shape[2] if info.depth != image.shape[2]
                            else info.depth)
+            if self.image_cache is not None:
+                self.image_cache.put(index=index, image=image, stream=1)
             return image, info
         else:
             return self.data[index].semantic, self.data[index].semantic_info
@@ -476,11 +565,16 @@ class SemanticDataset(VisionDataset, metaclass=ABCMeta):
         `rect_training` augmentation, and some labels statistics. If you want
         to add more operations, just `extend` this method.
         """
-        # NOTE: Write semantic segmentation images
-        self.write_semantic_images()
+        # NOTE: Pack polygons or write semantic segmentation images
+        if self.rasterize_semantic:
+            self.pack_semantic_polygons()
+        else:
+            with main_process_first():
+                self.write_semantic_images()
         
         # NOTE: Write data to our custom label format
-        if not self.has_custom_labels or self.write_labels:
+        if (not self.has_custom_labels or self.write_labels) and \
+            is_main_process():
             self.write_custom_labels()
 
     # MARK: Utils
@@ -513,19 +607,112 @@ class SemanticDataset(VisionDataset, metaclass=ABCMeta):
 					desc="Writing custom annotations", total=len(self.data))
         for (data, path) in pbar:
             VisualDataHandler().dump_to_file(data=data, path=path)
+        
+        # NOTE: List the new files on the next `list_files()`
+        FileIndex.invalidate(root=self.root)
 
     def write_semantic_images(self):
-        """Write semantic segmentation images.
+        """Write the missing semantic segmentation images (or all of them if
+        `write_labels`) in parallel.
         """
-        for i in tqdm(range(len(self.semantic_paths)),
-					  desc="Writing semantic segmentation images"):
-            data          = self.data[i]
-            semantic_path = self.semantic_paths[i]
-            # Force re-write or semantic segmentation image is not found.
-            if not is_image_file(path=semantic_path) or self.write_labels:
-                semantic_image = create_semantic_image(
-                    data        = data,
-                    classlabels = self.classlabels,
-                    encoding    = self.encoding,
-                )
-                cv2.imwrite(semantic_path, semantic_image)
+        indices = [
+            i for i, path in enumerate(self.semantic_paths)
+            if not is_image_file(path=path) or self.write_labels
+        ]
+        if len(indices) == 0:
+            return
+        # NOTE: OpenCV releases the GIL, so threads are enough
+        Parallel(n_jobs=-1, prefer="threads")(
+            delayed(self.write_semantic_image)(i)
+            for i in tqdm(indices, desc="Writing semantic segmentation images")
+        )
+        FileIndex.invalidate(root=self.root)
+
+    def write_semantic_image(self, index: int):
+        """Rasterize the objects' polygons of 1 image at the original size and
+        write the semantic segmentation image.
+        """
+        data               = self.data[index]
+        vertices, polygons = pack_polygons(
+            data=data, classlabels=self.classlabels
+        )
+        semantic = rasterize_polygons(
+            vertices   = vertices,
+            polygons   = polygons,
+            shape      = data.image_info.shape0,
+            lut        = self.classlabels.lut(encoding=self.encoding),
+            background = self.background_id,
+        )
+        if self.encoding != "color":
+            semantic = semantic[..., 0]
+        cv2.imwrite(self.semantic_paths[index], semantic)
+    
+    def pack_semantic_polygons(self):
+        """Pack the objects' polygons of all images into 3 contiguous arrays
+        for `rasterize_semantic_image()`.
+        """
+        vertices = []
+        polygons = []
+        offsets  = np.zeros((len(self.data) + 1, 2), dtype=np.int64)
+        for i, data in enumerate(self.data):
+            v, p = pack_polygons(data=data, classlabels=self.classlabels)
+            vertices.append(v)
+            polygons.append(p)
+            offsets[i + 1] = offsets[i] + (len(v), len(p))
+        self.polygon_vertices = np.concatenate(vertices) if vertices \
+            else np.zeros((0, 2), np.float32)
+        self.polygon_table    = np.concatenate(polygons) if polygons \
+            else np.zeros((0, 2), np.int32)
+        self.polygon_offsets  = offsets
+        mb = (self.polygon_vertices.nbytes + self.polygon_table.nbytes
+              + offsets.nbytes) / 1E6
+        logger.info(f"Packed {len(self.polygon_table)} polygons ({mb:.1f}MB).")
+    
+    def rasterize_semantic_image(
+        self, index: int
+    ) -> tuple[np.ndarray, ImageInfo]:
+        """Rasterize the semantic segmentation image of 1 image directly at
+        `shape` from the packed polygons.
+
+        Args:
+            index (int):
+                The image index.
+
+        Returns:
+            image (np.ndarray):
+                The semantic segmentation image.
+            info (ImageInfo):
+                The `ImageInfo` object.
+        """
+        image_info = self.data[index].image_info
+        h0, w0     = image_info.height0, image_info.width0
+        h1, w1     = self.shape[0], self.shape[1]
+        (v0, p0), (v1, p1) = self.polygon_offsets[index:index + 2]
+        image = rasterize_polygons(
+            vertices   = self.polygon_vertices[v0:v1],
+            polygons   = self.polygon_table[p0:p1],
+            shape      = (h1, w1),
+            lut        = self.classlabels.lut(encoding=self.encoding),
+            background = self.background_id,
+            scale      = (w1 / w0, h1 / h0),
+        )
+        
+        info = self.data[index].semantic_info
+        if info is None:
+            info = ImageInfo(
+                id      = image_info.id,
+                name    = Path(self.semantic_paths[index]).name,
+                path    = self.semantic_paths[index],
+                height0 = h0,
+                width0  = w0,
+            )
+        info.height, info.width, info.depth = image.shape
+        return image, info
+    
+    @property
+    def background_id(self) -> int:
+        """Return the class ID of the `unlabeled` class-label."""
+        unlabeled = self.classlabels.name2label.get("unlabeled")
+        assert unlabeled is not None, \
+            "`classlabels` doesn't have the `unlabeled` label."
+        return unlabeled["id"]
@@ -6,10 +6,14 @@
 
 from __future__ import annotations
 
+import ast
+import importlib
 import inspect
 import logging
+import os
 from copy import deepcopy
 from pprint import pprint
+from typing import Callable
 from typing import Optional
 from typing import Union
 
@@ -26,6 +30,10 @@ logger = logging.getLogger()
 class Registry:
 	"""The base registry class for registering classes.
 
+	Besides registered classes, the registry can hold lazy entries: a
+	`name -> module path` manifest. The module is imported (hence its
+	`@register` decorators run) on the first `get()`/`build()` of the name.
+
 	Attributes:
 		name (str):
 			The registry name.
@@ -36,12 +44,13 @@ class Registry:
 	def __init__(self, name: str):
 		self._name     = name
 		self._registry = {}
+		self._lazy     = {}
 	
 	def __len__(self):
-		return len(self._registry)
+		return len(set(self._registry) | set(self._lazy))
 	
 	def __contains__(self, key: str):
-		return self.get(key) is not None
+		return key in self._registry or key in self._lazy
 	
 	def __repr__(self):
 		format_str = self.__class__.__name__ \
@@ -57,14 +66,37 @@ class Registry:
 	
 	@property
 	def registry(self) -> dict:
-		"""Return the registry's dictionary."""
+		"""Return the registry's dictionary of resolved entries."""
 		return self._registry
 	
+	@property
+	def lazy_registry(self) -> dict:
+		"""Return the dictionary of unresolved `name -> module path` entries."""
+		return self._lazy
+	
 	def get(self, key: str) -> FuncCls:
-		"""Get the registry record of the given `key`."""
+		"""Get the registry record of the given `key`. Lazy entries are
+		resolved by importing their module.
+		"""
+		if key not in self._registry and key in self._lazy:
+			self.resolve(key)
 		if key in self._registry:
 			return self._registry[key]
 	
+	def resolve(self, key: str):
+		"""Import the module of the lazy entry `key`."""
+		module_path = self._lazy.pop(key)
+		importlib.import_module(module_path)
+		if key not in self._registry:
+			logger.warning(f"{module_path} does not register `{key}` in "
+						   f"{self.name}.")
+	
+	def resolve_all(self):
+		"""Resolve all lazy entries."""
+		for key in list(self._lazy):
+			if key in self._lazy:
+				self.resolve(key)
+	
 	# MARK: Register
 	
 	def register(
@@ -140,6 +172,30 @@ class Registry:
 				logger.info(f"{name} is already registered in {self.name}.")
 				continue
 			self._registry[name] = module_class
+			self._lazy.pop(name, None)
+	
+	def register_lazy(self, name: str, module_path: str, force: bool = False):
+		"""Register a lazy entry. The module is only imported when `name` is
+		first requested.
+
+		Args:
+			name (str):
+				The name to be registered.
+			module_path (str):
+				The module that registers `name` when imported. For example:
+				`torchkit.models.enhancers.mprnet`.
+			force (bool):
+				Whether to override an existing entry with the same name.
+		"""
+		if not force and (name in self._registry or name in self._lazy):
+			return
+		self._registry.pop(name, None)
+		self._lazy[name] = module_path
+	
+	def register_manifest(self, manifest: dict[str, str], force: bool = False):
+		"""Register lazy entries from a `name -> module path` manifest."""
+		for name, module_path in manifest.items():
+			self.register_lazy(name=name, module_path=module_path, force=force)
 	
 	# MARK: Print
 
@@ -147,6 +203,8 @@ class Registry:
 		"""Print the registry dictionary."""
 		print(f"{self.name}:")
 		pprint(self.registry, sort_dicts=False)
+		if self.lazy_registry:
+			pprint(self.lazy_registry, sort_dicts=False)
 		print()
 
 
@@ -181,11 +239,12 @@ class Factory(Registry):
 			instance (object, optional):
 				An instance of the class that is created.
 		"""
-		if name not in self.registry:
+		module = self.get(name)
+		if module is None:
 			logger.warning(f"{name} does not exist in the registry.")
 			return None
 		
-		return self.registry[name](*args, **kwargs)
+		return module(*args, **kwargs)
 	
 	def build_from_dict(
 		self, cfg: Optional[Union[dict, Munch]], **kwargs
@@ -248,3 +307,79 @@ class Factory(Registry):
 			instances.append(self.build(name=name, **cfg))
 		
 		return instances if len(instances) > 0 else None
+
+
+# MARK: - Lazy Import
+
+def scan_registrations(root_dir: str, package: str) -> dict[str, dict[str, str]]:
+	"""Statically scan the `.py` files under `root_dir` (without importing
+	them) for `@<REGISTRY>.register(name=...)` decorators. Used to generate
+	the registry manifests.
+
+	Args:
+		root_dir (str):
+			The package's directory.
+		package (str):
+			The package's dotted name. For example: `torchkit.models`.
+
+	Returns:
+		manifests (dict):
+			The dictionary of {registry variable: {name: module path}}.
+	"""
+	manifests = {}
+	for dirpath, dirnames, filenames in os.walk(root_dir):
+		dirnames.sort()
+		for filename in sorted(filenames):
+			if not filename.endswith(".py") or filename == "__init__.py":
+				continue
+			path        = os.path.join(dirpath, filename)
+			rel_path    = os.path.relpath(path, root_dir)[:-3]
+			module_path = ".".join([package] + rel_path.split(os.sep))
+			with open(path, "r", encoding="utf-8") as f:
+				tree = ast.parse(f.read(), filename=path)
+			for node in ast.walk(tree):
+				if not isinstance(node, (ast.ClassDef, ast.FunctionDef)):
+					continue
+				for dec in node.decorator_list:
+					if not (isinstance(dec, ast.Call) and
+							isinstance(dec.func, ast.Attribute) and
+							dec.func.attr == "register" and
+							isinstance(dec.func.value, ast.Name)):
+						continue
+					names = [node.name.lower()]
+					for kw in dec.keywords:
+						if kw.arg == "name":
+							names = ast.literal_eval(kw.value)
+							names = [names] if isinstance(names, str) else names
+					registry = manifests.setdefault(dec.func.value.id, {})
+					for name in names:
+						registry.setdefault(name, module_path)
+	return manifests
+
+
+def lazy_getattr(package: str, submodules: list[str]) -> Callable:
+	"""Build a module-level `__getattr__` (PEP 562) for a package that no
+	longer star-imports its submodules. Attributes are looked up in
+	`submodules` (imported one by one, in order) on first access, so
+	`from package import SomeClass` keeps working.
+
+	Args:
+		package (str):
+			The package's dotted name.
+		submodules (list[str]):
+			The relative names of the submodules previously star-imported.
+
+	Returns:
+		__getattr__ (Callable):
+			The module-level `__getattr__` function.
+	"""
+	def __getattr__(name: str):
+		if name.startswith("__"):
+			raise AttributeError(name)
+		for submodule in submodules:
+			module = importlib.import_module(submodule, package)
+			if hasattr(module, name):
+				return getattr(module, name)
+		raise AttributeError(f"module {package!r} has no attribute {name!r}")
+	
+	return __getattr__
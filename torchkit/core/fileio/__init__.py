@@ -8,6 +8,7 @@ from __future__ import annotations
 
 
 from .file_client import *
+from .file_index import *
 from .filedir import *
 from .handler import *
 from .io import *
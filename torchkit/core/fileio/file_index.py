@@ -0,0 +1,267 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Persisted index of the files under a dataset root, so listing files does
+not glob (and stat) the disk on every dataset construction.
+"""
+
+from __future__ import annotations
+
+import glob
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatchcase
+from typing import Optional
+
+from .io import dump
+from .io import load
+
+logger = logging.getLogger()
+
+__all__ = ["FileIndex"]
+
+
+# MARK: - FileIndex
+
+class FileIndex:
+    """File Index walks a root directory once with `os.scandir()` (one thread
+    per directory) and keeps, for each directory: its mtime, its sub-
+    directories, and the (size, mtime) of its files. The index is saved to
+    `<root>/.file_index.pkl`.
+
+    On the next runs, only the directories are stat-ed: adding, removing or
+    renaming a file changes the mtime of its parent directory, so only the
+    directories whose mtime changed are scanned again.
+
+    Notes:
+        - Modifying a file in-place does not change its parent directory's
+          mtime, so its (size, mtime) in the index may be stale. The list of
+          files is always up-to-date.
+        - The index is shared by all datasets of the same root in a process,
+          and refreshed when it is first used. Call `invalidate()` after
+          writing files under the root, so the next `from_root()` refreshes
+          it again.
+
+    Attributes:
+        root (str):
+            The root directory.
+        index_path (str):
+            The file the index is saved to.
+        num_workers (int):
+            The number of threads used to stat and scan directories.
+            Default: `16`.
+        dirs (dict):
+            {relative dir: {"mtime": int, "subdirs": list, "files": {name:
+            (size, mtime)}}}.
+    """
+
+    version   = 1
+    instances = {}
+    magic     = re.compile(r"[*?[]")
+
+    # MARK: Magic Functions
+
+    def __init__(
+        self,
+        root       : str,
+        index_path : Optional[str] = None,
+        num_workers: int           = 16,
+    ):
+        self.root        = os.path.normpath(root)
+        self.abs_root    = os.path.abspath(root)
+        self.index_path  = index_path or os.path.join(root, ".file_index.pkl")
+        self.num_workers = num_workers
+        self.dirs        = {}
+
+    def __len__(self) -> int:
+        """Return the number of indexed files."""
+        return sum(len(d["files"]) for d in self.dirs.values())
+
+    # MARK: Configure
+
+    @staticmethod
+    def from_root(root: str, **kwargs) -> FileIndex:
+        """Return the up-to-date index of `root`. It is loaded (or built) and
+        refreshed once per process, or again after `invalidate()`.
+        """
+        key = os.path.abspath(root)
+        if key not in FileIndex.instances:
+            index = FileIndex(root=root, **kwargs)
+            index.load_from_file()
+            if index.update():
+                index.dump_to_file()
+            FileIndex.instances[key] = index
+        return FileIndex.instances[key]
+
+    @staticmethod
+    def invalidate(root: str):
+        """Drop the index of `root` kept by the process, so the next
+        `from_root()` scans the directories that changed since (for example:
+        after writing custom labels under `root`).
+        """
+        FileIndex.instances.pop(os.path.abspath(root), None)
+
+    def load_from_file(self):
+        """Load the saved index if it exists and matches the root."""
+        if not os.path.isfile(self.index_path):
+            return
+        try:
+            index = load(path=self.index_path, file_format="pickle")
+        except Exception as err:
+            logger.warning(f"Cannot load file index {self.index_path}: {err}.")
+            return
+        if isinstance(index, dict) and index.get("version") == self.version \
+            and index.get("root") == self.abs_root:
+            self.dirs = index["dirs"]
+
+    def dump_to_file(self):
+        """Save the index. A read-only root is not an error. The file is
+        written to a temporary path then renamed, so processes indexing the
+        same root at the same time (for example: DDP ranks) never read a
+        partial file.
+        """
+        index = {"version": self.version, "root": self.abs_root,
+                 "dirs": self.dirs}
+        tmp   = f"{self.index_path}.{os.getpid()}.tmp"
+        try:
+            dump(obj=index, path=tmp, file_format="pickle")
+            os.replace(tmp, self.index_path)
+        except OSError as err:
+            logger.warning(f"Cannot save file index {self.index_path}: {err}.")
+
+    # MARK: Update
+
+    def update(self) -> bool:
+        """Scan again the new directories and the directories whose mtime
+        changed. Return `True` if the index changed.
+        """
+        pending = self.changed_dirs() if self.dirs else [""]
+        if not pending:
+            return False
+
+        with ThreadPoolExecutor(max_workers=self.num_workers) as pool:
+            while pending:
+                next_pending = []
+                for rel, entry in pool.map(self.scan_dir, pending):
+                    old = self.dirs.pop(rel, None)
+                    if entry is None:  # Deleted
+                        self.remove_subtree(rel)
+                        continue
+                    self.dirs[rel] = entry
+                    if old is not None:
+                        for sub in set(old["subdirs"]) - set(entry["subdirs"]):
+                            self.remove_subtree(os.path.join(rel, sub))
+                    for sub in entry["subdirs"]:
+                        sub_rel = os.path.join(rel, sub)
+                        if sub_rel not in self.dirs:
+                            next_pending.append(sub_rel)
+                pending = next_pending
+
+        logger.info(f"File index of {self.root}: {len(self.dirs)} "
+                    f"directories, {len(self)} files.")
+        return True
+
+    def changed_dirs(self) -> list[str]:
+        """Return the indexed directories whose mtime changed."""
+        rels = list(self.dirs.keys())
+        with ThreadPoolExecutor(max_workers=self.num_workers) as pool:
+            mtimes = list(pool.map(self.dir_mtime, rels))
+        return [rel for rel, mtime in zip(rels, mtimes)
+                if mtime != self.dirs[rel]["mtime"]]
+
+    def dir_mtime(self, rel: str) -> Optional[int]:
+        """Return the mtime (ns) of a directory, or `None` if it is gone."""
+        try:
+            return os.stat(os.path.join(self.abs_root, rel)).st_mtime_ns
+        except OSError:
+            return None
+
+    def scan_dir(self, rel: str) -> tuple[str, Optional[dict]]:
+        """List one directory (not recursive)."""
+        path = os.path.join(self.abs_root, rel)
+        try:
+            mtime   = os.stat(path).st_mtime_ns
+            subdirs = []
+            files   = {}
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        subdirs.append(entry.name)
+                    elif entry.is_file():
+                        stat = entry.stat()
+                        files[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            return rel, None
+        return rel, {"mtime": mtime, "subdirs": sorted(subdirs),
+                     "files": files}
+
+    def remove_subtree(self, rel: str):
+        """Remove a directory and its sub-directories from the index."""
+        prefix = rel + os.sep
+        for key in [k for k in self.dirs if k == rel or k.startswith(prefix)]:
+            del self.dirs[key]
+
+    # MARK: Query
+
+    def relpath(self, path: str) -> Optional[str]:
+        """Return the path relative to the root, or `None` if it is outside
+        of the root.
+        """
+        rel = os.path.relpath(os.path.abspath(path), self.abs_root)
+        if rel == os.pardir or rel.startswith(os.pardir + os.sep):
+            return None
+        return "" if rel == os.curdir else rel
+
+    def glob(self, pattern: str) -> list[str]:
+        """Return the sorted files matching `pattern`, like `glob.glob()`
+        (without `**`). Fall back to `glob.glob()` for patterns outside of
+        the root.
+        """
+        rel = self.relpath(pattern)
+        if rel is None or "**" in pattern:
+            return sorted(glob.glob(pattern))
+
+        *dir_parts, name = rel.split(os.sep)
+        dirs = [""]
+        for part in dir_parts:
+            matched = []
+            for d in dirs:
+                subdirs = self.dirs[d]["subdirs"] if d in self.dirs else []
+                if self.magic.search(part):
+                    matched += [os.path.join(d, s) for s in subdirs
+                                if fnmatchcase(s, part) and
+                                (part.startswith(".") or not s.startswith("."))]
+                elif part in subdirs:
+                    matched.append(os.path.join(d, part))
+            dirs = matched
+
+        paths = []
+        for d in dirs:
+            files = self.dirs[d]["files"] if d in self.dirs else {}
+            if not self.magic.search(name):
+                names = [name] if name in files else []
+            else:
+                names = [n for n in files if fnmatchcase(n, name) and
+                         (name.startswith(".") or not n.startswith("."))]
+            paths += [os.path.join(self.root, d, n) for n in sorted(names)]
+        return paths
+
+    def isfile(self, path: str) -> bool:
+        """Check if the file exists, from the index."""
+        rel = self.relpath(path)
+        if rel is None:
+            return os.path.isfile(path)
+        d, name = os.path.split(rel)
+        entry   = self.dirs.get(d)
+        return entry is not None and name in entry["files"]
+
+    def stat(self, path: str) -> Optional[tuple[int, int]]:
+        """Return the indexed (size, mtime) of a file, or `None`."""
+        rel = self.relpath(path)
+        if rel is None:
+            return None
+        d, name = os.path.split(rel)
+        entry   = self.dirs.get(d)
+        return entry["files"].get(name) if entry is not None else None
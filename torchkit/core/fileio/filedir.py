@@ -120,6 +120,19 @@ def is_json_file(path: Optional[str]) -> bool:
     return False
 
 
+def is_mmap_weights_file(path: Optional[str]) -> bool:
+    """Check if the given path is a memory-mapped `.tkw` weights file."""
+    if path is None:
+        return False
+
+    if os.path.isfile(path=path):
+        extension = os.path.splitext(path)[1]
+        if extension in [".tkw"]:
+            return True
+
+    return False
+
+
 def is_name(path: Optional[str]) -> bool:
     """Check if the given path is a name."""
     if path is None:
@@ -6,11 +6,13 @@ colorspace, geometric (box, mask, polygon, ...), io, ...
 """
 
 from .bbox import *
+from .bbox_ops import *
 from .builder import *
 from .color import *
 from .contour import *
 from .distance import *
 from .gradient import *
+from .guided_filter import *
 from .imageproc import *
 from .io import *
 from .point import *
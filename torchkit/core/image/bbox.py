@@ -22,6 +22,12 @@ from torchkit.core.utils import Dim2
 from .imageproc import to_channel_last
 from .imageproc import unnormalize_image
 
+try:
+	from torchvision.ops import batched_nms as tv_batched_nms
+	has_tv_nms = True
+except ImportError:
+	has_tv_nms = False
+
 logger = logging.getLogger()
 
 
@@ -167,6 +173,92 @@ def batch_bbox_iou(xyxy1: np.ndarray, xyxy2: np.ndarray) -> np.ndarray:
 	return iou
 
 
+@dispatch(torch.Tensor, torch.Tensor)
+def batch_bbox_iou(xyxy1: torch.Tensor, xyxy2: torch.Tensor) -> torch.Tensor:
+	"""Computes IOU between two sets of boxes.
+
+	Args:
+		xyxy1 (torch.Tensor):
+			The target bounding boxes as [N, 4] of [x1, y1, x2, y2].
+		xyxy2 (torch.Tensor):
+			The ground-truth bounding boxes as [M, 4] of [x1, y1, x2, y2].
+
+	Returns:
+		iou (torch.Tensor):
+			The ratio IoUs as [N, M].
+	"""
+	area1 = (xyxy1[:, 2] - xyxy1[:, 0]) * (xyxy1[:, 3] - xyxy1[:, 1])
+	area2 = (xyxy2[:, 2] - xyxy2[:, 0]) * (xyxy2[:, 3] - xyxy2[:, 1])
+	lt    = torch.max(xyxy1[:, None, :2], xyxy2[None, :, :2])
+	rb    = torch.min(xyxy1[:, None, 2:], xyxy2[None, :, 2:])
+	wh    = (rb - lt).clamp(min=0)
+	inter = wh[..., 0] * wh[..., 1]
+	return inter / (area1[:, None] + area2[None, :] - inter)
+
+
+def nms(
+	xyxy: torch.Tensor, scores: torch.Tensor, iou_threshold: float
+) -> torch.Tensor:
+	"""Greedy Non-Maximum Suppression.
+
+	Args:
+		xyxy (torch.Tensor):
+			The bounding boxes as [N, 4] of [x1, y1, x2, y2].
+		scores (torch.Tensor):
+			The scores as [N].
+		iou_threshold (float):
+			Discard the boxes overlapping a kept box with IoU > threshold.
+
+	Returns:
+		keep (torch.Tensor):
+			The indexes of the kept boxes, sorted by decreasing score.
+	"""
+	order = scores.argsort(descending=True)
+	if order.numel() == 0:
+		return order
+	iou   = batch_bbox_iou(xyxy[order], xyxy[order]).triu_(diagonal=1)
+	# NOTE: A box is suppressed by a higher-score box only if that box is kept
+	# itself. Iterate on the (small) set of boxes that suppress others.
+	keep  = torch.ones(order.numel(), dtype=torch.bool, device=xyxy.device)
+	over  = iou > iou_threshold
+	for i in torch.nonzero(over.any(dim=1)).flatten().tolist():
+		if keep[i]:
+			keep &= ~over[i]
+	return order[keep]
+
+
+def batched_nms(
+	xyxy         : torch.Tensor,
+	scores       : torch.Tensor,
+	idxs         : torch.Tensor,
+	iou_threshold: float
+) -> torch.Tensor:
+	"""Non-Maximum Suppression of many groups (for example, images and classes)
+	in one call. Boxes of different groups never suppress each other: each
+	group is shifted by an offset larger than all coordinates.
+
+	Args:
+		xyxy (torch.Tensor):
+			The bounding boxes as [N, 4] of [x1, y1, x2, y2].
+		scores (torch.Tensor):
+			The scores as [N].
+		idxs (torch.Tensor):
+			The group index of each box as [N].
+		iou_threshold (float):
+			Discard the boxes overlapping a kept box with IoU > threshold.
+
+	Returns:
+		keep (torch.Tensor):
+			The indexes of the kept boxes, sorted by decreasing score.
+	"""
+	if xyxy.numel() == 0:
+		return torch.empty((0,), dtype=torch.int64, device=xyxy.device)
+	if has_tv_nms:
+		return tv_batched_nms(xyxy.float(), scores.float(), idxs, iou_threshold)
+	offsets = idxs.to(xyxy) * (xyxy.max() + 1)
+	return nms(xyxy + offsets[:, None], scores, iou_threshold)
+
+
 # MARK: - Box Transformation
 
 def clip_bbox_xyxy(xyxy: torch.Tensor, image_size: Dim2) -> torch.Tensor:
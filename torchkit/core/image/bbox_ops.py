@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Batched, dispatch-free operations on bounding boxes. All functions work on
+`np.ndarray` and `torch.Tensor` of shape [..., 4], with an optional `out=`.
+
+The conversions between [`xyxy`, `xywh`, `cxcywh`, `cxcywh_norm`] and the
+scale/shift of the boxes are affine maps of the 4 coordinates. A chain of
+them (for example: `cxcywh_norm` -> `xyxy` -> shift) is composed into a single
+4x4 matrix and offset (cached), then applied in one pass.
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+from typing import Optional
+from typing import Union
+
+import numpy as np
+import torch
+
+logger = logging.getLogger()
+
+__all__ = [
+	"box_affine",
+	"box_formats",
+	"boxes_area",
+	"clip_boxes_",
+	"convert_boxes",
+	"scale_boxes_",
+	"shift_boxes_",
+]
+
+Boxes = Union[np.ndarray, torch.Tensor]
+
+box_formats = ["xyxy", "xywh", "cxcywh", "cxcywh_norm"]
+
+
+# MARK: - Affine Maps
+
+def _to_xyxy(fmt: str, height: float, width: float) -> np.ndarray:
+	"""Return the 5x5 homogeneous matrix mapping `fmt` to pixel `xyxy`."""
+	if fmt not in box_formats:
+		raise ValueError(f"`fmt` must be one of: {box_formats}. "
+						 f"But got: {fmt}.")
+	m = np.eye(5)
+	if fmt == "xywh":
+		m[2, 0] = m[3, 1] = 1.0                # x2 = x + w, y2 = y + h
+	elif fmt in ["cxcywh", "cxcywh_norm"]:
+		m[0, 2] = m[1, 3] = -0.5               # x1 = cx - w / 2
+		m[2, 0] = m[3, 1] = 1.0
+		m[2, 2] = m[3, 3] = 0.5                # x2 = cx + w / 2
+	if fmt == "cxcywh_norm":
+		if height is None or width is None:
+			raise ValueError(f"`height` and `width` are required for {fmt}.")
+		m = m @ np.diag([width, height, width, height, 1.0])
+	return m
+
+
+@functools.lru_cache(maxsize=1024)
+def box_affine(
+	src   : str,
+	dst   : str,
+	height: Optional[float] = None,
+	width : Optional[float] = None,
+	scale : Optional[tuple] = None,
+	shift : Optional[tuple] = None,
+) -> tuple[np.ndarray, np.ndarray]:
+	"""Compose `src` -> pixel `xyxy` -> scale -> shift -> `dst` into a single
+	affine map `y = x @ a.T + b`.
+
+	Args:
+		src (str):
+			The input format. One of: [`xyxy`, `xywh`, `cxcywh`,
+			`cxcywh_norm`].
+		dst (str):
+			The output format.
+		height (float, optional):
+			The image height. Required by the `*_norm` formats.
+		width (float, optional):
+			The image width. Required by the `*_norm` formats.
+		scale (tuple, optional):
+			The (sx, sy) scale factors applied to the pixel coordinates.
+		shift (tuple, optional):
+			The (dx, dy) shift applied to the pixel coordinates, after the
+			scale.
+
+	Returns:
+		a (np.ndarray):
+			The 4x4 matrix.
+		b (np.ndarray):
+			The offset of shape [4].
+	"""
+	m = _to_xyxy(src, height, width)
+	if scale is not None:
+		sx, sy = scale
+		m = np.diag([sx, sy, sx, sy, 1.0]) @ m
+	if shift is not None:
+		dx, dy = shift
+		t = np.eye(5)
+		t[0:4, 4] = [dx, dy, dx, dy]
+		m = t @ m
+	m = np.linalg.inv(_to_xyxy(dst, height, width)) @ m
+	a = np.ascontiguousarray(m[0:4, 0:4])
+	b = np.ascontiguousarray(m[0:4, 4])
+	a.flags.writeable = False
+	b.flags.writeable = False
+	return a, b
+
+
+# MARK: - Operations
+
+def convert_boxes(
+	boxes : Boxes,
+	src   : str,
+	dst   : str             = "xyxy",
+	height: Optional[float] = None,
+	width : Optional[float] = None,
+	scale : Optional[tuple] = None,
+	shift : Optional[tuple] = None,
+	out   : Optional[Boxes] = None,
+) -> Boxes:
+	"""Convert the boxes from `src` to `dst` format, optionally scaling and
+	shifting them in the same pass.
+
+	Args:
+		boxes (np.ndarray, torch.Tensor):
+			The boxes of shape [..., 4].
+		src (str):
+			The input format. One of: [`xyxy`, `xywh`, `cxcywh`,
+			`cxcywh_norm`].
+		dst (str):
+			The output format. Default: `xyxy`.
+		height (float, optional):
+			The image height. Required by the `*_norm` formats.
+		width (float, optional):
+			The image width. Required by the `*_norm` formats.
+		scale (tuple, optional):
+			The (sx, sy) scale factors of the pixel coordinates.
+		shift (tuple, optional):
+			The (dx, dy) shift of the pixel coordinates (after the scale).
+		out (np.ndarray, torch.Tensor, optional):
+			The output array. Can be `boxes` itself (in-place) or a view (for
+			example: `labels[:, 2:6]`). If `None`, allocate a new array.
+
+	Returns:
+		out (np.ndarray, torch.Tensor):
+			The converted boxes.
+
+	Examples:
+		>>> # YOLO labels to padded pixel `xyxy`, in-place:
+		>>> convert_boxes(labels[:, 2:6], "cxcywh_norm", "xyxy", h, w,
+		>>>               shift=(pad_w, pad_h), out=labels[:, 2:6])
+	"""
+	if src == dst and scale is None and shift is None:
+		if out is None:
+			return boxes.clone() if torch.is_tensor(boxes) else boxes.copy()
+		if out is not boxes:
+			out[...] = boxes
+		return out
+
+	a, b = box_affine(
+		src    = src,
+		dst    = dst,
+		height = None if height is None else float(height),
+		width  = None if width  is None else float(width),
+		scale  = None if scale  is None else tuple(map(float, scale)),
+		shift  = None if shift  is None else tuple(map(float, shift)),
+	)
+	if torch.is_tensor(boxes):
+		dtype = boxes.dtype if boxes.is_floating_point() else torch.float32
+		a     = torch.as_tensor(a, dtype=dtype, device=boxes.device)
+		b     = torch.as_tensor(b, dtype=dtype, device=boxes.device)
+		res   = torch.addmm(b, boxes.reshape(-1, 4).to(dtype), a.T)
+		res   = res.reshape(boxes.shape)
+		if out is None:
+			return res
+		out.copy_(res)
+		return out
+
+	if out is None:
+		dtype = boxes.dtype if np.issubdtype(boxes.dtype, np.floating) \
+			else np.float64
+		res   = np.matmul(boxes, a.T.astype(dtype, copy=False))
+		res  += b.astype(dtype, copy=False)
+		return res
+	if out.flags.c_contiguous and not np.shares_memory(out, boxes):
+		np.matmul(boxes, a.T.astype(out.dtype, copy=False), out=out)
+		out += b.astype(out.dtype, copy=False)
+	else:
+		out[...] = np.matmul(boxes, a.T) + b
+	return out
+
+
+def shift_boxes_(boxes: Boxes, dx: float, dy: float) -> Boxes:
+	"""Shift `xyxy` boxes in-place."""
+	boxes[..., 0::2] += dx
+	boxes[..., 1::2] += dy
+	return boxes
+
+
+def scale_boxes_(boxes: Boxes, sx: float, sy: float) -> Boxes:
+	"""Scale `xyxy` boxes in-place."""
+	boxes[..., 0::2] *= sx
+	boxes[..., 1::2] *= sy
+	return boxes
+
+
+def clip_boxes_(boxes: Boxes, height: float, width: float) -> Boxes:
+	"""Clip `xyxy` boxes to the image in-place."""
+	if torch.is_tensor(boxes):
+		boxes[..., 0::2].clamp_(0, width)
+		boxes[..., 1::2].clamp_(0, height)
+	else:
+		np.clip(boxes[..., 0::2], 0, width,  out=boxes[..., 0::2])
+		np.clip(boxes[..., 1::2], 0, height, out=boxes[..., 1::2])
+	return boxes
+
+
+def boxes_area(xyxy: Boxes) -> Boxes:
+	"""Return the areas of `xyxy` boxes of shape [..., 4]."""
+	return (xyxy[..., 2] - xyxy[..., 0]) * (xyxy[..., 3] - xyxy[..., 1])
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Edge-aware upsampling with the fast guided filter: enhance a downscaled
+image, then transfer the correction to full resolution using the original
+image as the guide.
+
+References:
+	He and Sun, "Fast Guided Filter", arXiv:1505.00996.
+"""
+
+from __future__ import annotations
+
+import torch
+import torch.nn.functional as F
+
+
+# MARK: - Functional API
+
+def box_filter(x: torch.Tensor, radius: int) -> torch.Tensor:
+	"""Return the mean of each (2r + 1) x (2r + 1) window of `x` [B, C, H, W],
+	in O(1) per pixel with cumulative sums. Windows are cut at the borders
+	and normalized by their actual size.
+	"""
+	h, w = x.shape[-2:]
+	r    = radius
+
+	def window_sum(t: torch.Tensor, dim: int, n: int) -> torch.Tensor:
+		c     = torch.cumsum(t, dim=dim)
+		c     = F.pad(c, [1, 0] if dim == -1 else [0, 0, 1, 0])  # Leading 0
+		index = torch.arange(n, device=t.device)
+		hi    = (index + r + 1).clamp(max=n)
+		lo    = (index - r).clamp(min=0)
+		return c.index_select(dim, hi) - c.index_select(dim, lo)
+
+	s = window_sum(window_sum(x, -2, h), -1, w)
+	n = window_sum(window_sum(
+		torch.ones(1, 1, h, w, dtype=x.dtype, device=x.device), -2, h
+	), -1, w)
+	return s / n
+
+
+def guided_filter_coefficients(
+	guide : torch.Tensor,
+	src   : torch.Tensor,
+	radius: int   = 2,
+	eps   : float = 1e-3,
+) -> tuple[torch.Tensor, torch.Tensor]:
+	"""Return the per-pixel linear coefficients (a, b) such that
+	`src ~ a * guide + b` over each window, per channel.
+	"""
+	mean_g  = box_filter(guide, radius)
+	mean_s  = box_filter(src, radius)
+	cov_gs  = box_filter(guide * src, radius) - mean_g * mean_s
+	var_g   = box_filter(guide * guide, radius) - mean_g * mean_g
+	a       = cov_gs / (var_g + eps)
+	b       = mean_s - a * mean_g
+	return box_filter(a, radius), box_filter(b, radius)
+
+
+def guided_upsample(
+	x_lr  : torch.Tensor,
+	y_lr  : torch.Tensor,
+	x_hr  : torch.Tensor,
+	radius: int   = 2,
+	eps   : float = 1e-3,
+) -> torch.Tensor:
+	"""Transfer the low-resolution enhancement `x_lr -> y_lr` to `x_hr`.
+
+	The linear coefficients mapping `x_lr` to `y_lr` are fitted at low
+	resolution, upsampled bilinearly, and applied to the full-resolution
+	input, so the edges come from `x_hr` and not from the upsampling.
+
+	Args:
+		x_lr (torch.Tensor):
+			The downscaled input [B, C, h, w].
+		y_lr (torch.Tensor):
+			The enhanced downscaled input [B, C, h, w].
+		x_hr (torch.Tensor):
+			The full-resolution input (the guide) [B, C, H, W].
+		radius (int):
+			The window radius, in low-resolution pixels. Default: `2`.
+		eps (float):
+			The regularization. Larger values smooth more. Default: `1e-3`.
+
+	Returns:
+		y_hr (torch.Tensor):
+			The enhanced full-resolution image [B, C, H, W].
+	"""
+	a, b = guided_filter_coefficients(
+		guide=x_lr, src=y_lr.to(x_lr.dtype), radius=radius, eps=eps
+	)
+	size = x_hr.shape[-2:]
+	a    = F.interpolate(a, size=size, mode="bilinear", align_corners=False)
+	b    = F.interpolate(b, size=size, mode="bilinear", align_corners=False)
+	return a * x_hr + b
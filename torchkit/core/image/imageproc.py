@@ -1253,6 +1253,91 @@ def create_semantic_image(
     return semantic
 
 
+def pack_polygons(
+    data: VisionData, classlabels: ClassLabels
+) -> tuple[np.ndarray, np.ndarray]:
+    """Pack the drawable polygons of `data` into contiguous arrays. The same
+    objects as in `create_semantic_image()` are skipped.
+
+    Args:
+        data (VisionData):
+            A `VisualData` object.
+        classlabels (ClassLabels):
+            The `ClassLabels` object contains all class-labels defined in the
+            dataset.
+
+    Returns:
+        vertices (np.ndarray):
+            The vertices of all polygons of shape [V, 2] as (x, y) in the
+            original image.
+        polygons (np.ndarray):
+            The polygons of shape [P, 2] as (number of vertices, class ID), in
+            drawing order.
+    """
+    id2label = classlabels.id2label
+    vertices = []
+    polygons = []
+    for obj in data.objects:
+        class_id = obj.class_id
+        polygon  = obj.polygon
+        deleted  = getattr(obj, "deleted", False)
+        if class_id is None or class_id < 0 or deleted or len(polygon) < 3 \
+            or class_id not in id2label:
+            continue
+        polygon = np.asarray(polygon, dtype=np.float32).reshape(-1, 2)
+        vertices.append(polygon)
+        polygons.append((len(polygon), class_id))
+    
+    if len(vertices) == 0:
+        return np.zeros((0, 2), np.float32), np.zeros((0, 2), np.int32)
+    return np.concatenate(vertices), np.asarray(polygons, dtype=np.int32)
+
+
+def rasterize_polygons(
+    vertices  : np.ndarray,
+    polygons  : np.ndarray,
+    shape     : Dim3,
+    lut       : np.ndarray,
+    background: int,
+    scale     : Optional[tuple] = None,
+) -> np.ndarray:
+    """Rasterize packed polygons into a semantic segmentation image. The
+    class IDs are drawn into a single-channel mask which is then encoded at
+    once with a lookup table, so no label dictionary is built per call.
+
+    Args:
+        vertices (np.ndarray):
+            The vertices of shape [V, 2] as returned by `pack_polygons()`.
+        polygons (np.ndarray):
+            The polygons of shape [P, 2] as (number of vertices, class ID).
+        shape (Dim3):
+            The output shape [H, W, ...].
+        lut (np.ndarray):
+            The lookup table of shape [N, 3] from `ClassLabels.lut()`.
+        background (int):
+            The class ID of the background (`unlabeled`).
+        scale (tuple, optional):
+            The (sx, sy) scale of the vertices, to draw directly at the
+            resized shape. Default: `None`.
+
+    Returns:
+        semantic (np.ndarray):
+            The semantic image of shape [H, W, 3].
+    """
+    h, w = shape[0], shape[1]
+    mask = np.full((h, w), background, dtype=np.uint16)
+    if len(polygons):
+        if scale is not None:
+            vertices = vertices * np.asarray(scale, dtype=np.float32)
+        vertices = np.round(vertices).astype(np.int32)
+        start    = 0
+        for num_vertices, class_id in polygons:
+            cv2.fillPoly(mask, pts=[vertices[start:start + num_vertices]],
+                         color=int(class_id))
+            start += num_vertices
+    return lut[mask]
+
+
 # MARK: - Color Space Conversions
 
 def augment_hsv(
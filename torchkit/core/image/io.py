@@ -11,7 +11,9 @@ import multiprocessing
 import os
 from glob import glob
 from pathlib import Path
+from typing import Iterator
 from typing import Optional
+from typing import Union
 
 import cv2
 import numpy as np
@@ -125,6 +127,37 @@ def is_video_stream(path: str) -> bool:
 	return "rtsp" in path
 
 
+def scan_image_files(root: str) -> Iterator[str]:
+	"""Lazily yield all image files under `root` (recursively) using
+	`os.scandir()`. Unlike `glob(recursive=True)`, it does not build the whole
+	listing in memory and does not `stat()` every entry.
+	
+	Args:
+		root (str):
+			The root directory.
+	
+	Yields:
+		file (str):
+			The path to an image file.
+	"""
+	image_formats = ImageFormat.values()
+	stack         = [root]
+	while stack:
+		dirpath = stack.pop()
+		try:
+			with os.scandir(dirpath) as it:
+				entries = sorted(it, key=lambda e: e.name)
+		except OSError:
+			continue
+		subdirs = []
+		for entry in entries:
+			if entry.is_dir(follow_symlinks=True):
+				subdirs.append(entry.path)
+			elif os.path.splitext(entry.name)[1] in image_formats:
+				yield entry.path
+		stack.extend(reversed(subdirs))
+
+
 # MARK: - Read
 
 def exif_size(image: Image) -> tuple:
@@ -437,7 +470,10 @@ class ImageLoader:
 					break
 				
 				file     = self.image_files[self.index]
-				rel_path = file.replace(self.data, "")
+				if isinstance(self.data, str):
+					rel_path = file.replace(self.data, "")
+				else:
+					rel_path = os.path.basename(file)
 
 				images.append(cv2.imread(self.image_files[self.index]))
 				indexes.append(self.index)
@@ -454,17 +490,17 @@ class ImageLoader:
 		"""Initialize list of image files in data source.
 		
 		Args:
-			data (str):
+			data (str, list):
 				The data source. Can be a path to an image file or a directory.
-				It can be a pathname pattern to images.
+				It can be a pathname pattern to images, or a list of image
+				files.
 		"""
-		if is_image_file(data):
+		if isinstance(data, (list, tuple)):
+			self.image_files = [img for img in data if is_image_file(img)]
+		elif is_image_file(data):
 			self.image_files = [data]
 		elif os.path.isdir(data):
-			self.image_files = [
-				img for img in glob(os.path.join(data, "**/*"), recursive=True)
-				if is_image_file(img)
-			]
+			self.image_files = list(scan_image_files(root=data))
 		elif isinstance(data, str):
 			self.image_files = [img for img in glob(data) if is_image_file(img)]
 		else:
@@ -550,6 +586,157 @@ class ImageWriter:
 
 # MARK: - VideoLoader/Writer
 
+def to_frame_index(value: Union[int, float, None], fps: float) -> Optional[int]:
+	"""Convert a frame position to a frame index. `int` values are frame
+	indexes, `float` values are timestamps in seconds.
+	"""
+	if value is None or isinstance(value, int):
+		return value
+	if fps is None or fps <= 0:
+		raise ValueError(f"Cannot convert {value}s to a frame index without a "
+						 f"valid frame rate.")
+	return int(round(value * fps))
+
+
+def get_frame_indexes(
+	num_frames: int,
+	start     : Union[int, float]           = 0,
+	end       : Union[int, float, None]     = None,
+	stride    : int                         = 1,
+	max_frames: Optional[int]               = None,
+	fps       : Optional[float]             = None,
+) -> Optional[range]:
+	"""Get the indexes of the frames to decode.
+
+	Args:
+		num_frames (int):
+			Total number of frames in the source. `-1` for online streams.
+		start (int, float):
+			The first frame index (`int`) or timestamp in seconds (`float`).
+			Default: `0`.
+		end (int, float, optional):
+			The frame index (`int`) or timestamp in seconds (`float`) to stop
+			at (exclusive). Default: `None` means the end of the source.
+		stride (int):
+			Keep every `stride`-th frame. Default: `1`.
+		max_frames (int, optional):
+			Maximum number of frames to keep. Default: `None`.
+		fps (float, optional):
+			The frame rate, used to convert timestamps. Default: `None`.
+
+	Returns:
+		frame_indexes (range, optional):
+			The frame indexes. `None` if the range is unbounded (online stream
+			without `end` nor `max_frames`).
+	"""
+	assert stride >= 1, f"Invalid `stride={stride}`. Must be >= 1."
+	start = to_frame_index(start, fps) or 0
+	end   = to_frame_index(end,   fps)
+	if num_frames >= 0:
+		end = num_frames if end is None else min(end, num_frames)
+	if end is None:
+		if max_frames is None:
+			return None
+		end = start + max_frames * stride
+
+	frame_indexes = range(start, max(start, end), stride)
+	if max_frames is not None:
+		frame_indexes = frame_indexes[:max_frames]
+	return frame_indexes
+
+
+def seek_frame(
+	video_capture : cv2.VideoCapture,
+	position      : int,
+	target        : int,
+	seekable      : bool = True,
+	seek_threshold: int  = 32,
+) -> int:
+	"""Move `video_capture` so that the next decoded frame is `target`. Short
+	gaps are skipped with `grab()` (demux without retrieving). Long gaps use
+	`CAP_PROP_POS_FRAMES` when the container supports seeking.
+
+	Args:
+		video_capture (cv2.VideoCapture):
+			The `VideoCapture` object.
+		position (int):
+			The index of the next frame `video_capture` will decode.
+		target (int):
+			The index of the frame to decode next.
+		seekable (bool):
+			Whether if the source supports seeking. Default: `True`.
+		seek_threshold (int):
+			Minimum gap (in frames) to seek instead of grabbing. Default: `32`.
+
+	Returns:
+		position (int):
+			The new position. Less than `target` if the source ended.
+	"""
+	if seekable and (target < position or target - position > seek_threshold):
+		if video_capture.set(cv2.CAP_PROP_POS_FRAMES, target):
+			return target
+	while position < target:
+		if not video_capture.grab():
+			break
+		position += 1
+	return position
+
+
+def decode_frame(
+	video_capture: cv2.VideoCapture,
+	position     : int,
+	index        : int,
+	frame_indexes: Optional[range],
+	start_index  : int  = 0,
+	stride       : int  = 1,
+	seekable     : bool = True,
+) -> tuple[int, Optional[int], Optional[np.ndarray]]:
+	"""Decode the `index`-th selected frame. Frames in between are skipped
+	with `grab()` or by seeking.
+
+	Args:
+		video_capture (cv2.VideoCapture):
+			The `VideoCapture` object.
+		position (int):
+			The index of the next frame `video_capture` will decode.
+		index (int):
+			The index in `frame_indexes` of the frame to decode.
+		frame_indexes (range, optional):
+			The indexes of the selected frames. `None` for an unbounded
+			stream: the frame is `start_index + index * stride`.
+		start_index (int):
+			The first frame index of an unbounded stream. Default: `0`.
+		stride (int):
+			The stride of an unbounded stream. Default: `1`.
+		seekable (bool):
+			Whether if the source supports seeking. Default: `True`.
+
+	Returns:
+		position (int):
+			The new position.
+		frame_index (int, optional):
+			The index of the frame in the video.
+		image (np.ndarray, optional):
+			The frame. `None` if the video or stream has ended.
+	"""
+	if frame_indexes is None:
+		target = start_index + index * stride
+	else:
+		target = frame_indexes[index]
+	position = seek_frame(
+		video_capture = video_capture,
+		position      = position,
+		target        = target,
+		seekable      = seekable,
+	)
+	if position < target:
+		return position, None, None
+	ret_val, image = video_capture.read()
+	if not ret_val:
+		return position, None, None
+	return position + 1, target, image
+
+
 class VideoLoader:
 	"""Video Loader loads frames from a video file or a video stream.
 
@@ -558,22 +745,51 @@ class VideoLoader:
 			The data source. Can be a path to video file or a stream link.
 		batch_size (int):
 			Number of samples in one forward & backward pass.
+		start (int, float):
+			The first frame index (`int`) or timestamp in seconds (`float`).
+		end (int, float, optional):
+			The frame index (`int`) or timestamp in seconds (`float`) to stop
+			at (exclusive). `None` means the end of the video.
+		stride (int):
+			Keep every `stride`-th frame. Skipped frames are only grabbed,
+			not decoded.
+		max_frames (int, optional):
+			Maximum number of frames to load.
 		video_capture (VideoCapture):
 			The `VideoCapture` object from OpenCV.
+		frame_indexes (range, optional):
+			The indexes of the frames to load. `None` for an unbounded stream.
 		num_frames (int):
-			Total number of frames in the video.
+			Number of frames to load.
+		position (int):
+			The index of the next frame the `video_capture` will decode.
 		index (int, optional):
-			The current frame index.
+			The current index in `frame_indexes`.
 	"""
 
 	# MARK: Magic Functions
 
-	def __init__(self, data: str, batch_size: int = 1):
+	def __init__(
+		self,
+		data      : str,
+		batch_size: int                     = 1,
+		start     : Union[int, float]       = 0,
+		end       : Union[int, float, None] = None,
+		stride    : int                     = 1,
+		max_frames: Optional[int]           = None,
+	):
 		super().__init__()
 		self.data          = data
 		self.batch_size    = batch_size
+		self.start         = start
+		self.end           = end
+		self.stride        = stride
+		self.max_frames    = max_frames
 		self.video_capture = None
+		self.frame_indexes = None
+		self.start_index   = 0
 		self.num_frames    = -1
+		self.position      = 0
 		self.index         = 0
 
 		self.init_video_capture(data=self.data)
@@ -592,7 +808,7 @@ class VideoLoader:
 		"""Returns an iterator starting at index 0."""
 		self.index = 0
 		return self
-
+	
 	def __next__(self):
 		"""
 		e.g.:
@@ -609,7 +825,7 @@ class VideoLoader:
 			rel_paths (list):
 				The list of images' relative paths corresponding to data.
 		"""
-		if self.index >= self.num_frames:
+		if self.is_exhausted:
 			raise StopIteration
 		else:
 			images    = []
@@ -618,25 +834,45 @@ class VideoLoader:
 			rel_paths = []
 
 			for i in range(self.batch_size):
-				if self.index >= self.num_frames:
+				if self.is_exhausted:
 					break
-					
-				ret_val, image = self.video_capture.read()
-				rel_path       = os.path.basename(self.data)
+				
+				frame_index, image = self.read_frame()
+				if image is None:  # End of the video or stream
+					self.num_frames = self.index
+					break
+				rel_path = os.path.basename(self.data)
 				
 				images.append(image)
-				indexes.append(self.index)
+				indexes.append(frame_index)
 				files.append(self.data)
 				rel_paths.append(rel_path)
 				
 				self.index += 1
 
+			if len(images) == 0:
+				raise StopIteration
 			return np.array(images), indexes, files, rel_paths
 
 	def __del__(self):
 		"""Close the `video_capture` object."""
 		self.close()
 
+	# MARK: Properties
+	
+	@property
+	def is_exhausted(self) -> bool:
+		"""Return `True` if all frames have been read. Online streams (with
+		`num_frames=-1`) are only exhausted when the capture stops returning
+		frames.
+		"""
+		return self.num_frames != -1 and self.index >= self.num_frames
+	
+	@property
+	def is_stream(self) -> bool:
+		"""Return `True` if the data source is an online stream."""
+		return is_video_stream(self.data)
+
 	# MARK: Configure
 	
 	def init_video_capture(self, data: str):
@@ -648,19 +884,55 @@ class VideoLoader:
 		"""
 		if is_video_file(data):
 			self.video_capture = cv2.VideoCapture(data)
-			self.num_frames    = int(self.video_capture.get(cv2.CAP_PROP_FRAME_COUNT))
+			num_frames         = int(self.video_capture.get(cv2.CAP_PROP_FRAME_COUNT))
 		elif is_video_stream(data):
 			self.video_capture = cv2.VideoCapture(data)  # stream
 			# Set buffer (batch) size
 			self.video_capture.set(cv2.CAP_PROP_BUFFERSIZE, self.batch_size)
+			num_frames         = -1
 		
 		if self.video_capture is None:
 			raise IOError("Error when reading input stream or video file!")
-
+		
+		fps                = self.video_capture.get(cv2.CAP_PROP_FPS)
+		self.start_index   = to_frame_index(self.start, fps) or 0
+		self.frame_indexes = get_frame_indexes(
+			num_frames = num_frames,
+			start      = self.start,
+			end        = self.end,
+			stride     = self.stride,
+			max_frames = self.max_frames,
+			fps        = fps,
+		)
+		self.num_frames = -1 if self.frame_indexes is None \
+			else len(self.frame_indexes)
+	
 	def close(self):
 		"""Release the current `video_capture` object."""
 		if self.video_capture:
 			self.video_capture.release()
+	
+	# MARK: Read
+	
+	def read_frame(self) -> tuple[Optional[int], Optional[np.ndarray]]:
+		"""Decode the next selected frame (see `decode_frame()`).
+		
+		Returns:
+			frame_index (int, optional):
+				The index of the frame in the video.
+			image (np.ndarray, optional):
+				The frame. `None` if the video or stream has ended.
+		"""
+		self.position, frame_index, image = decode_frame(
+			video_capture = self.video_capture,
+			position      = self.position,
+			index         = self.index,
+			frame_indexes = self.frame_indexes,
+			start_index   = self.start_index,
+			stride        = self.stride,
+			seekable      = not self.is_stream,
+		)
+		return frame_index, image
 
 
 class VideoWriter:
@@ -788,25 +1060,55 @@ class FrameLoader:
 			a video, or a stream. It can also be a pathname pattern to images.
 		batch_size (int):
 			Number of samples in one forward & backward pass.
+		start (int, float):
+			The first frame index (`int`) or timestamp in seconds (`float`).
+			For image files, it is the index of the first file.
+		end (int, float, optional):
+			The frame index (`int`) or timestamp in seconds (`float`) to stop
+			at (exclusive). `None` means the end of the data source.
+		stride (int):
+			Keep every `stride`-th frame. Skipped video frames are only
+			grabbed, not decoded.
+		max_frames (int, optional):
+			Maximum number of frames to load.
 		image_files (list):
 			List of image files found in the data source.
 		video_capture (VideoCapture):
 			The VideoCapture object from OpenCV.
+		frame_indexes (range, optional):
+			The indexes of the frames to load. `None` for an unbounded stream.
 		num_frames (int):
-			Total number of image files or total number of frames in the video.
+			Number of image files or number of frames to load in the video.
+		position (int):
+			The index of the next frame the `video_capture` will decode.
 		index (int):
 			The current index.
 	"""
 
 	# MARK: Magic Functions
 
-	def __init__(self, data: str, batch_size: int = 1):
+	def __init__(
+		self,
+		data      : str,
+		batch_size: int                     = 1,
+		start     : Union[int, float]       = 0,
+		end       : Union[int, float, None] = None,
+		stride    : int                     = 1,
+		max_frames: Optional[int]           = None,
+	):
 		super().__init__()
 		self.data          = data
 		self.batch_size    = batch_size
+		self.start         = start
+		self.end           = end
+		self.stride        = stride
+		self.max_frames    = max_frames
 		self.image_files   = []
 		self.video_capture = None
+		self.frame_indexes = None
+		self.start_index   = 0
 		self.num_frames    = -1
+		self.position      = 0
 		self.index         = 0
 
 		self.init_image_files_or_video_capture(data=self.data)
@@ -848,7 +1150,7 @@ class FrameLoader:
 			rel_paths (list):
 				The list of images' relative paths corresponding to data.
 		"""
-		if self.index >= self.num_frames:
+		if self.is_exhausted:
 			raise StopIteration
 		else:
 			images    = []
@@ -857,30 +1159,46 @@ class FrameLoader:
 			rel_paths = []
 
 			for i in range(self.batch_size):
-				if self.index >= self.num_frames:
+				if self.is_exhausted:
 					break
 
 				if self.video_capture:
-					ret_val, image = self.video_capture.read()
-					rel_path 	   = os.path.basename(self.data)
+					frame_index, image = self.read_frame()
+					rel_path 	       = os.path.basename(self.data)
+					if image is None:  # End of the video or stream
+						self.num_frames = self.index
+						break
 				else:
-					image	 = cv2.imread(self.image_files[self.index])
-					file     = self.image_files[self.index]
-					rel_path = file.replace(self.data, "")
+					frame_index = self.index
+					image	    = cv2.imread(self.image_files[self.index])
+					file        = self.image_files[self.index]
+					rel_path    = file.replace(self.data, "")
 
 				images.append(image)
-				indexes.append(self.index)
+				indexes.append(frame_index)
 				files.append(self.data)
 				rel_paths.append(rel_path)
 
 				self.index += 1
 
+			if len(images) == 0:
+				raise StopIteration
 			return np.array(images), indexes, files, rel_paths
 
 	def __del__(self):
 		"""Close `video_capture` object."""
 		self.close()
 
+	# MARK: Properties
+
+	@property
+	def is_exhausted(self) -> bool:
+		"""Return `True` if all frames have been read. Online streams (with
+		`num_frames=-1`) are only exhausted when the capture stops returning
+		frames.
+		"""
+		return self.num_frames != -1 and self.index >= self.num_frames
+
 	# MARK: Configure
 
 	def init_image_files_or_video_capture(self, data: str):
@@ -894,27 +1212,71 @@ class FrameLoader:
 		"""
 		if is_video_file(data):
 			self.video_capture = cv2.VideoCapture(data)
-			self.num_frames    = int(self.video_capture.get(cv2.CAP_PROP_FRAME_COUNT))
+			num_frames         = int(self.video_capture.get(cv2.CAP_PROP_FRAME_COUNT))
 		elif is_video_stream(data):
 			self.video_capture = cv2.VideoCapture(data)  # stream
 			self.video_capture.set(cv2.CAP_PROP_BUFFERSIZE, self.batch_size)  # set buffer (batch) size
-			self.num_frames    = -1
+			num_frames         = -1
 		elif is_image_file(data):
 			self.image_files = [data]
-			self.num_frames  = len(self.image_files)
 		elif os.path.isdir(data):
-			self.image_files = [img for img in glob.glob(os.path.join(data, "**/*"), recursive=True) if is_image_file(img)]
-			self.num_frames  = len(self.image_files)
+			self.image_files = [img for img in glob(os.path.join(data, "**/*"), recursive=True) if is_image_file(img)]
 		elif isinstance(data, str):
-			self.image_files = [img for img in glob.glob(data) if is_image_file(img)]
-			self.num_frames  = len(self.image_files)
+			self.image_files = [img for img in glob(data) if is_image_file(img)]
 		else:
 			raise IOError(f"Error when reading data!")
+		
+		if self.video_capture:
+			fps                = self.video_capture.get(cv2.CAP_PROP_FPS)
+			self.start_index   = to_frame_index(self.start, fps) or 0
+			self.frame_indexes = get_frame_indexes(
+				num_frames = num_frames,
+				start      = self.start,
+				end        = self.end,
+				stride     = self.stride,
+				max_frames = self.max_frames,
+				fps        = fps,
+			)
+			self.num_frames = -1 if self.frame_indexes is None \
+				else len(self.frame_indexes)
+		else:
+			frame_indexes    = get_frame_indexes(
+				num_frames = len(self.image_files),
+				start      = int(self.start),
+				end        = None if self.end is None else int(self.end),
+				stride     = self.stride,
+				max_frames = self.max_frames,
+			)
+			self.image_files = [self.image_files[i] for i in frame_indexes]
+			self.num_frames  = len(self.image_files)
 
 	def close(self):
 		"""Release the `video_capture` object."""
 		if self.video_capture:
 			self.video_capture.release()
+	
+	# MARK: Read
+	
+	def read_frame(self) -> tuple[Optional[int], Optional[np.ndarray]]:
+		"""Decode the next selected frame of the video (see
+		`decode_frame()`).
+		
+		Returns:
+			frame_index (int, optional):
+				The index of the frame in the video.
+			image (np.ndarray, optional):
+				The frame. `None` if the video or stream has ended.
+		"""
+		self.position, frame_index, image = decode_frame(
+			video_capture = self.video_capture,
+			position      = self.position,
+			index         = self.index,
+			frame_indexes = self.frame_indexes,
+			start_index   = self.start_index,
+			stride        = self.stride,
+			seekable      = not is_video_stream(self.data),
+		)
+		return frame_index, image
 
 
 class FrameWriter:
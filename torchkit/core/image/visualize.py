@@ -150,7 +150,6 @@ def imshow_plt(
 			axes[j, i].set_xticklabels([])
 	plt.tight_layout()
 	plt.subplots_adjust(wspace=0.0, hspace=0.0)
-	plt.show()
 	
 	# NOTE: Save figure
 	if save_cfg:
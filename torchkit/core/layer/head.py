@@ -7,12 +7,14 @@
 from __future__ import annotations
 
 import logging
+from typing import Optional
 from typing import Union
 
 import torch
 from torch import nn as nn
 from torch.nn import functional as F
 
+from torchkit.core.image import batched_nms
 from .adaptive_avgmax_pool import SelectAdaptivePool2d
 from .builder import HEADS
 from .linear import Linear
@@ -112,7 +114,11 @@ class ClassifierHead(nn.Module):
 
 @HEADS.register(name="detect")
 class Detect(nn.Module):
-    """Detector head."""
+    """Detector head. In inference, the raw outputs are decoded to
+    [B, N, 5 + num_classes] as (cx, cy, w, h, objectness, class scores...)
+    in input-image pixels. The decoding offsets and anchor multipliers are
+    cached per (layer, feature map size, device, dtype).
+    """
     
     # MARK: Magic Functions
     
@@ -127,7 +133,7 @@ class Detect(nn.Module):
         self.num_outputs = num_classes + 5       # Number of outputs per anchor
         self.num_layers  = len(anchors)          # Number of detection layers
         self.num_anchors = len(anchors[0]) // 2  # Number of anchors
-        self.grid        = [torch.zeros(1)] * self.num_layers  # Init grid
+        self.grids       = {}    # Cached (xy offsets, wh gains)
         self.stride      = None  # Strides computed during build
         
         a = torch.tensor(anchors).float().view(self.num_layers, -1, 2)
@@ -145,9 +151,44 @@ class Detect(nn.Module):
     # MARK: Configure
 
     @staticmethod
-    def _make_grid(nx: int = 20, ny: int = 20):
-        yv, xv = torch.meshgrid([torch.arange(ny), torch.arange(nx)])
-        return torch.stack((xv, yv), 2).view((1, 1, ny, nx, 2)).float()
+    def _make_grid(
+        nx    : int                    = 20,
+        ny    : int                    = 20,
+        device: Optional[torch.device] = None,
+        dtype : torch.dtype            = torch.float32
+    ) -> torch.Tensor:
+        yv, xv = torch.meshgrid([torch.arange(ny, device=device),
+                                 torch.arange(nx, device=device)])
+        return torch.stack((xv, yv), 2).view((1, 1, ny, nx, 2)).to(dtype)
+    
+    def get_grid(
+        self, i: int, x: torch.Tensor
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        """Return the cached decoding terms of the i-th layer for the raw
+        output `x` of shape [B, A, H, W, O]:
+            xy = sigmoid * (2 * stride) + (grid - 0.5) * stride
+            wh = sigmoid ** 2 * (4 * anchor)
+        
+        Returns:
+            xy_offset (torch.Tensor):
+                The (grid - 0.5) * stride of shape [1, 1, H, W, 2].
+            wh_gain (torch.Tensor):
+                The 4 * anchor of shape [1, A, 1, 1, 2].
+        """
+        ny, nx = x.shape[2:4]
+        key    = (i, ny, nx, x.device, x.dtype)
+        if key not in self.grids:
+            stride    = float(self.stride[i])
+            grid      = self._make_grid(nx, ny, device=x.device, dtype=x.dtype)
+            xy_offset = (grid - 0.5) * stride
+            wh_gain   = (self.anchor_grid[i] * 4.0).to(x.device, x.dtype)
+            self.grids[key] = (xy_offset, wh_gain)
+        return self.grids[key]
+    
+    def _apply(self, fn):
+        # NOTE: The cached terms depend on the buffers' device and dtype
+        self.grids = {}
+        return super()._apply(fn)
     
     # MARK: Forward Pass
     
@@ -162,13 +203,145 @@ class Detect(nn.Module):
             x[i] = x[i].permute(0, 1, 3, 4, 2).contiguous()
 
             if not self.training:  # inference
-                if self.grid[i].shape[2:4] != x[i].shape[2:4]:
-                    self.grid[i] = self._make_grid(nx, ny).to(x[i].device)
-                
-                y = x[i].sigmoid()
-                y[..., 0:2] = (y[..., 0:2] * 2.0 - 0.5 +
-                               self.grid[i].to(x[i].device)) * self.stride[i]  # xy
-                y[..., 2:4] = (y[..., 2:4] * 2) ** 2 * self.anchor_grid[i]  # wh
+                xy_offset, wh_gain = self.get_grid(i, x[i])
+                stride = float(self.stride[i])
+                y      = x[i].sigmoid()
+                xy     = y[..., 0:2] * (2.0 * stride) + xy_offset
+                wh     = y[..., 2:4] ** 2 * wh_gain
+                y      = torch.cat((xy, wh, y[..., 4:]), -1)
                 z.append(y.view(bs, -1, self.num_outputs))
         
         return x if self.training else (torch.cat(z, 1), x)
+
+
+# MARK: - DetectPostprocess
+
+class DetectPostprocess(nn.Module):
+    """Post-processing of the decoded `Detect` outputs: confidence
+    pre-filtering, then class-aware NMS over the whole batch in a single call,
+    and a fixed-size padded output (export friendly).
+    
+    Attributes:
+        conf_threshold (float):
+            Discard the candidates with score (objectness * class score) lower
+            than this value. Default: `0.25`.
+        iou_threshold (float):
+            The NMS IoU threshold. Default: `0.45`.
+        max_candidates (int):
+            Maximum number of candidates per image entering NMS, the highest
+            scores are kept. Default: `3000`.
+        max_detections (int):
+            Maximum number of detections per image, the size of the padded
+            output. Default: `300`.
+        multi_label (bool):
+            Allow several labels per box (one candidate per class over the
+            threshold). Otherwise, only the best class. Default: `False`.
+        agnostic (bool):
+            Class-agnostic NMS. Default: `False`.
+    """
+    
+    # MARK: Magic Functions
+    
+    def __init__(
+        self,
+        conf_threshold: float = 0.25,
+        iou_threshold : float = 0.45,
+        max_candidates: int   = 3000,
+        max_detections: int   = 300,
+        multi_label   : bool  = False,
+        agnostic      : bool  = False,
+    ):
+        super().__init__()
+        self.conf_threshold = conf_threshold
+        self.iou_threshold  = iou_threshold
+        self.max_candidates = max_candidates
+        self.max_detections = max_detections
+        self.multi_label    = multi_label
+        self.agnostic       = agnostic
+    
+    # MARK: Forward Pass
+    
+    def forward(
+        self, pred: torch.Tensor
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        """Post-process the predictions.
+        
+        Args:
+            pred (torch.Tensor):
+                The decoded predictions of shape [B, N, 5 + num_classes] as
+                (cx, cy, w, h, objectness, class scores...).
+        
+        Returns:
+            detections (torch.Tensor):
+                The detections of shape [B, max_detections, 6] as
+                (x1, y1, x2, y2, score, class), sorted by decreasing score and
+                padded with zeros.
+            num_detections (torch.Tensor):
+                The number of valid detections of each image of shape [B].
+        """
+        bs, num_classes = pred.shape[0], pred.shape[2] - 5
+        detections      = pred.new_zeros((bs, self.max_detections, 6))
+        
+        # NOTE: Pre-filter on objectness (score <= objectness)
+        b, n   = torch.nonzero(pred[..., 4] > self.conf_threshold, as_tuple=True)
+        cand   = pred[b, n]
+        scores = cand[:, 5:] * cand[:, 4:5]
+        if self.multi_label:
+            i, c   = torch.nonzero(scores > self.conf_threshold, as_tuple=True)
+            b      = b[i]
+            cand   = cand[i]
+            scores = scores[i, c]
+        else:
+            scores, c = scores.max(dim=1)
+            i         = scores > self.conf_threshold
+            b, c      = b[i], c[i]
+            cand      = cand[i]
+            scores    = scores[i]
+        
+        # NOTE: Keep the `max_candidates` best candidates of each image
+        order, rank = self.rank_by_image(b=b, scores=scores)
+        order       = order[rank < self.max_candidates]
+        b, c, cand  = b[order], c[order], cand[order]
+        scores      = scores[order]
+        
+        # NOTE: (cx, cy, w, h) to (x1, y1, x2, y2)
+        half = cand[:, 2:4] / 2.0
+        xyxy = torch.cat((cand[:, 0:2] - half, cand[:, 0:2] + half), 1)
+        
+        # NOTE: One NMS call for all images and classes
+        idxs = b if self.agnostic else b * num_classes + c
+        keep = batched_nms(xyxy, scores, idxs, self.iou_threshold)
+        b, c, xyxy, scores = b[keep], c[keep], xyxy[keep], scores[keep]
+        
+        # NOTE: Scatter into the padded output
+        order, rank = self.rank_by_image(b=b, scores=scores)
+        keep        = rank < self.max_detections
+        order, rank = order[keep], rank[keep]
+        b           = b[order]
+        detections[b, rank] = torch.cat(
+            (xyxy[order], scores[order, None], c[order, None].to(xyxy)), 1
+        )
+        num_detections = torch.bincount(b, minlength=bs)
+        return detections, num_detections
+    
+    # MARK: Utils
+    
+    @staticmethod
+    def rank_by_image(
+        b: torch.Tensor, scores: torch.Tensor
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        """Sort the candidates by image, then by decreasing score.
+        
+        Returns:
+            order (torch.Tensor):
+                The sorting indexes.
+            rank (torch.Tensor):
+                The rank of each sorted candidate within its image.
+        """
+        order  = scores.argsort(descending=True)
+        _, idx = torch.sort(b[order], stable=True)
+        order  = order[idx]
+        b      = b[order].contiguous()
+        rank   = torch.arange(b.numel(), device=b.device) - \
+                 torch.searchsorted(b, b)
+        return order, rank
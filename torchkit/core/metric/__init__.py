@@ -10,6 +10,7 @@ from .accuracy import *
 from .ae import *
 from .builder import *
 from .mae import *
+from .mean_ap import *
 from .mse import *
 from .psnr import *
 from .rmse import *
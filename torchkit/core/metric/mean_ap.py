@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""COCO-style mean Average Precision (mAP) and Average Recall (AR) of 2D
+detections, accumulated batch by batch.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Optional
+from typing import Union
+
+import numpy as np
+import torch
+from torch import nn
+
+from torchkit.core.image import batch_bbox_iou
+from .builder import METRICS
+
+logger = logging.getLogger()
+
+
+# MARK: - MeanAP
+
+def match_detections(
+	detections    : np.ndarray,
+	targets       : np.ndarray,
+	iou_thresholds: np.ndarray,
+) -> np.ndarray:
+	"""Match the detections of one image to its ground-truth boxes at several
+	IoU thresholds at once, as COCO does: the detections are visited by
+	decreasing score, and each one is matched to the unmatched ground truth
+	of the same class with the highest IoU >= the threshold (if any).
+
+	Args:
+		detections (np.ndarray):
+			The detections of shape [N, 6] as (x1, y1, x2, y2, score, class).
+		targets (np.ndarray):
+			The ground truth of shape [M, 5] as (class, x1, y1, x2, y2).
+		iou_thresholds (np.ndarray):
+			The IoU thresholds of shape [T].
+
+	Returns:
+		tp (np.ndarray):
+			The true positive flags of shape [N, T].
+	"""
+	tp = np.zeros((len(detections), len(iou_thresholds)), dtype=bool)
+	if len(detections) == 0 or len(targets) == 0:
+		return tp
+
+	iou = batch_bbox_iou(
+		targets[:, 1:5].astype(np.float32),
+		detections[:, 0:4].astype(np.float32)
+	)                                                      # [M, N]
+	iou[targets[:, 0:1] != detections[None, :, 5]] = -1.0  # Class-aware
+	matched = np.zeros((len(targets), len(iou_thresholds)), dtype=bool)
+	columns = np.arange(len(iou_thresholds))
+	for det in np.argsort(-detections[:, 4], kind="stable"):
+		# NOTE: [M, T] IoU with the free ground truths above each threshold
+		free = (iou[:, det:det + 1] >= iou_thresholds[None, :]) & ~matched
+		if not free.any():
+			continue
+		gt = np.where(free, iou[:, det:det + 1], -1.0).argmax(axis=0)  # [T]
+		ok = free[gt, columns]
+		matched[gt[ok], columns[ok]] = True
+		tp[det, ok] = True
+	return tp
+
+
+# noinspection PyMethodMayBeStatic
+@METRICS.register(name="mean_ap")
+class MeanAP(nn.Module):
+	"""Streaming COCO-style mAP and AR. Each `update()` matches a batch of
+	detections to the ground truth with vectorized IoU, then only keeps the
+	compact per-detection (score, class, TP flags) arrays and the per-class
+	ground-truth counts. The boxes are discarded, so the memory does not grow
+	with the number of boxes of the validation set. `compute()` builds the PR
+	curves with numpy.
+
+	Notes:
+		- No `iscrowd`/area-range handling: all ground truths count.
+		- Call `reset()` at the start of each evaluation.
+
+	Attributes:
+		name (str):
+			Name of the metric.
+		num_classes (int):
+			Number of classes.
+		iou_thresholds (np.ndarray):
+			The IoU thresholds. Default: [0.5:0.95:0.05].
+		max_detections (int):
+			Maximum number of (highest score) detections kept per image.
+			Default: `100`.
+		recall_thresholds (np.ndarray):
+			The recall points of the interpolated precision. Default: 101
+			points in [0, 1].
+	"""
+
+	# MARK: Magic Functions
+
+	def __init__(
+		self,
+		num_classes   : int,
+		iou_thresholds: Optional[list] = None,
+		max_detections: int            = 100,
+	):
+		super().__init__()
+		self.name              = "mean_ap"
+		self.num_classes       = num_classes
+		self.iou_thresholds    = np.asarray(
+			iou_thresholds if iou_thresholds is not None
+			else np.linspace(0.5, 0.95, 10), dtype=np.float32
+		)
+		self.max_detections    = max_detections
+		self.recall_thresholds = np.linspace(0.0, 1.0, 101)
+		self.reset()
+
+	# MARK: Forward Pass
+
+	def forward(
+		self,
+		y_hat: Union[torch.Tensor, np.ndarray, list],
+		y    : Union[torch.Tensor, np.ndarray, list],
+	) -> torch.Tensor:
+		"""Accumulate the batch and return its own mAP@[.5:.95]. The mAP of
+		all accumulated batches is only computed by `compute()`, e.g. at the
+		end of the epoch.
+		"""
+		start   = len(self.scores)
+		num_gts = self.num_gts.copy()
+		self.update(detections=y_hat, targets=y)
+		metrics = self.summarize(
+			scores  = self.scores[start:],
+			classes = self.classes[start:],
+			tps     = self.tps[start:],
+			num_gts = self.num_gts - num_gts,
+		)
+		return torch.tensor(metrics["map"])
+
+	# MARK: Update
+
+	def reset(self):
+		"""Drop the accumulated matches."""
+		self.scores     = []
+		self.classes    = []
+		self.tps        = []
+		self.num_gts    = np.zeros(self.num_classes, dtype=np.int64)
+		self.num_images = 0
+
+	def update(
+		self,
+		detections    : Union[torch.Tensor, np.ndarray, list],
+		targets       : Union[torch.Tensor, np.ndarray, list],
+		num_detections: Union[torch.Tensor, np.ndarray, None] = None,
+	):
+		"""Accumulate the matches of a batch.
+
+		Args:
+			detections (torch.Tensor, np.ndarray, list):
+				The detections as (x1, y1, x2, y2, score, class). Either a
+				list of [N_i, 6] (one per image), or a padded [B, N, 6] as
+				returned by `DetectPostprocess`.
+			targets (torch.Tensor, np.ndarray, list):
+				The ground truth in pixels. Either a list of [M_i, 5] as
+				(class, x1, y1, x2, y2), one per image, or a [M, 6] as
+				(image index, class, x1, y1, x2, y2) for the whole batch.
+			num_detections (torch.Tensor, np.ndarray, optional):
+				The number of valid detections of each image when
+				`detections` is padded. If `None`, the padded rows (score 0)
+				are dropped.
+		"""
+		detections = self.split_detections(detections, num_detections)
+		targets    = self.split_targets(targets, num_images=len(detections))
+		for dets, gts in zip(detections, targets):
+			dets = dets[dets[:, 4] > 0]
+			dets = dets[np.argsort(-dets[:, 4], kind="stable")]
+			dets = dets[:self.max_detections]
+			self.num_gts += np.bincount(
+				gts[:, 0].astype(np.int64), minlength=self.num_classes
+			)[:self.num_classes]
+			self.scores.append(dets[:, 4].astype(np.float32))
+			self.classes.append(dets[:, 5].astype(np.int32))
+			self.tps.append(match_detections(dets, gts, self.iou_thresholds))
+		self.num_images += len(detections)
+
+	# MARK: Compute
+
+	def compute(self) -> dict:
+		"""Compute the metrics from the accumulated matches.
+
+		Returns:
+			metrics (dict):
+				See `summarize()`.
+		"""
+		return self.summarize(
+			scores  = self.scores,
+			classes = self.classes,
+			tps     = self.tps,
+			num_gts = self.num_gts,
+		)
+
+	def summarize(
+		self,
+		scores : list[np.ndarray],
+		classes: list[np.ndarray],
+		tps    : list[np.ndarray],
+		num_gts: np.ndarray,
+	) -> dict:
+		"""Build the PR curves of the given per-image matches.
+
+		Returns:
+			metrics (dict):
+				- `map`: mAP@[.5:.95].
+				- `map_50`, `map_75`: mAP@.5 and mAP@.75 (if they are among
+				  the thresholds).
+				- `mar`: AR@`max_detections` averaged over the thresholds.
+				- `ap_per_class`: [C, T] AP of each class and threshold,
+				  `NaN` for the classes without ground truth.
+				- `ar_per_class`: [C, T] recall of each class and threshold.
+		"""
+		num_t   = len(self.iou_thresholds)
+		ap      = np.full((self.num_classes, num_t), np.nan)
+		ar      = np.full((self.num_classes, num_t), np.nan)
+		if len(scores):
+			scores  = np.concatenate(scores)
+			classes = np.concatenate(classes)
+			tps     = np.concatenate(tps)
+		else:
+			scores  = np.zeros(0, dtype=np.float32)
+			classes = np.zeros(0, dtype=np.int32)
+			tps     = np.zeros((0, num_t), dtype=bool)
+
+		# NOTE: Sort by class, then by decreasing score
+		order   = np.lexsort((-scores, classes))
+		classes = classes[order]
+		tps     = tps[order]
+		bounds  = np.searchsorted(classes, np.arange(self.num_classes + 1))
+
+		for c in np.nonzero(num_gts)[0]:
+			tp = tps[bounds[c]:bounds[c + 1]]
+			if len(tp) == 0:
+				ap[c] = ar[c] = 0.0
+				continue
+			tp_cum    = np.cumsum(tp, axis=0)
+			fp_cum    = np.cumsum(~tp, axis=0)
+			recall    = tp_cum / num_gts[c]
+			precision = tp_cum / (tp_cum + fp_cum)
+			# NOTE: Precision envelope (monotonically decreasing)
+			precision = np.maximum.accumulate(precision[::-1], axis=0)[::-1]
+			ar[c]     = recall[-1]
+			for t in range(num_t):
+				i = np.searchsorted(recall[:, t], self.recall_thresholds,
+									side="left")
+				q        = np.zeros(len(self.recall_thresholds))
+				valid    = i < len(recall)
+				q[valid] = precision[i[valid], t]
+				ap[c, t] = q.mean()
+
+		valid   = num_gts > 0
+		metrics = {
+			"map"         : float(np.mean(ap[valid])) if valid.any() else 0.0,
+			"mar"         : float(np.mean(ar[valid])) if valid.any() else 0.0,
+			"ap_per_class": ap,
+			"ar_per_class": ar,
+		}
+		for key, thr in [("map_50", 0.5), ("map_75", 0.75)]:
+			t = np.nonzero(np.isclose(self.iou_thresholds, thr))[0]
+			if len(t):
+				metrics[key] = float(np.mean(ap[valid, t[0]])) \
+					if valid.any() else 0.0
+		return metrics
+
+	# MARK: Utils
+
+	def split_detections(
+		self,
+		detections    : Union[torch.Tensor, np.ndarray, list],
+		num_detections: Union[torch.Tensor, np.ndarray, None] = None,
+	) -> list[np.ndarray]:
+		"""Return the list of [N_i, 6] detections, one per image."""
+		if isinstance(detections, (list, tuple)):
+			return [_to_numpy(d).reshape(-1, 6) for d in detections]
+		detections = _to_numpy(detections)
+		if num_detections is None:
+			return list(detections)
+		num_detections = _to_numpy(num_detections)
+		return [d[:n] for d, n in zip(detections, num_detections)]
+
+	def split_targets(
+		self, targets: Union[torch.Tensor, np.ndarray, list], num_images: int
+	) -> list[np.ndarray]:
+		"""Return the list of [M_i, 5] ground truth, one per image."""
+		if isinstance(targets, (list, tuple)):
+			return [_to_numpy(t).reshape(-1, 5) for t in targets]
+		targets = _to_numpy(targets).reshape(-1, 6)
+		index   = targets[:, 0].astype(np.int64)
+		return [targets[index == i, 1:6] for i in range(num_images)]
+
+
+def _to_numpy(x: Union[torch.Tensor, np.ndarray]) -> np.ndarray:
+	"""Convert `x` to a numpy array."""
+	if isinstance(x, torch.Tensor):
+		return x.detach().cpu().numpy()
+	return np.asarray(x)
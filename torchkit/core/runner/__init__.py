@@ -6,11 +6,18 @@
 
 from __future__ import annotations
 
+from .activation_checkpoint import *
 from .callbacks import *
+from .capacity import *
+from .compiler import *
 from .debugger import *
+from .gating import *
 from .inference import *
+from .launcher import *
 from .logger import *
 from .model import *
 from .model_io import *
+from .server import *
+from .telemetry import *
 from .trainer import *
 from .utils import *
@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Sub-module level activation checkpointing: trade compute for memory by
+recomputing the activations of selected sub-modules during backward.
+"""
+
+from __future__ import annotations
+
+import inspect
+import logging
+import time
+from typing import Optional
+
+import torch
+from torch import nn
+from torch.utils.checkpoint import checkpoint
+
+logger = logging.getLogger()
+
+
+# MARK: - ActivationCheckpoint
+
+class ActivationCheckpoint:
+	"""Activation Checkpoint replaces a sub-module's `forward()`. When the
+	sub-module is in training mode and gradients are enabled, its intermediate
+	activations are not stored but recomputed during backward. Otherwise, it
+	calls the original `forward()`.
+
+	The inputs and outputs may be tensors or lists/tuples of tensors (for
+	example, the UNet encoder's features). They are flattened before
+	`torch.utils.checkpoint.checkpoint()` so gradients flow through every
+	tensor.
+
+	Notes:
+		- BatchNorm's running statistics are updated twice per step (forward
+		  and recomputation). It is a known limitation of checkpointing.
+		- With the reentrant implementation (PyTorch < 1.11), at least one
+		  input must require gradients, otherwise the sub-module's parameters
+		  get no gradients. In that case, the call is not checkpointed.
+
+	Attributes:
+		module (nn.Module):
+			The checkpointed sub-module.
+		forward_fn (Callable):
+			The original (bound) `forward()`.
+		preserve_rng_state (bool):
+			Restore the RNG state for the recomputation (dropout).
+			Default: `True`.
+		num_calls (int):
+			Number of checkpointed calls.
+	"""
+
+	use_reentrant = "use_reentrant" not in \
+		inspect.signature(checkpoint).parameters
+
+	# MARK: Magic Functions
+
+	def __init__(self, module: nn.Module, preserve_rng_state: bool = True):
+		self.module             = module
+		self.forward_fn         = type(module).forward.__get__(module)
+		self.preserve_rng_state = preserve_rng_state
+		self.num_calls          = 0
+
+	def __call__(self, *args, **kwargs):
+		if not (self.module.training and torch.is_grad_enabled()):
+			return self.forward_fn(*args, **kwargs)
+
+		keys   = list(kwargs.keys())
+		inputs = list(args) + [kwargs[k] for k in keys]
+		flat, specs = flatten_tensors(inputs)
+		if self.use_reentrant and \
+			not any(torch.is_tensor(t) and t.requires_grad for t in flat):
+			return self.forward_fn(*args, **kwargs)
+
+		num_args    = len(args)
+		output_spec = []
+
+		def run(*flat_inputs):
+			values = unflatten_tensors(list(flat_inputs), specs)
+			output = self.forward_fn(
+				*values[:num_args], **dict(zip(keys, values[num_args:]))
+			)
+			outputs, spec = flatten_tensors([output])
+			output_spec[:] = spec
+			return tuple(outputs)
+
+		if self.use_reentrant:
+			outputs = checkpoint(
+				run, *flat, preserve_rng_state=self.preserve_rng_state
+			)
+		else:
+			outputs = checkpoint(
+				run, *flat, preserve_rng_state=self.preserve_rng_state,
+				use_reentrant=False
+			)
+		self.num_calls += 1
+		outputs = list(outputs) if isinstance(outputs, tuple) else [outputs]
+		return unflatten_tensors(outputs, output_spec)[0]
+
+
+# MARK: - Enable/Disable
+
+def enable_activation_checkpoint(
+	model             : nn.Module,
+	modules           : list[str],
+	preserve_rng_state: bool = True,
+) -> list[str]:
+	"""Enable activation checkpointing for the given sub-modules.
+
+	Args:
+		model (nn.Module):
+			The model.
+		modules (list[str]):
+			The names of the sub-modules as in `model.named_modules()`. For
+			example: [`stage1_encoder`, `stage3_orsnet`].
+		preserve_rng_state (bool):
+			Restore the RNG state for the recomputation. Default: `True`.
+
+	Returns:
+		modules (list[str]):
+			The names of the checkpointed sub-modules.
+	"""
+	named   = dict(model.named_modules())
+	enabled = []
+	for name in modules:
+		if name not in named:
+			logger.warning(f"{name} is not a sub-module of "
+						   f"{model.__class__.__name__}.")
+			continue
+		module = named[name]
+		if not isinstance(module.__dict__.get("forward"), ActivationCheckpoint):
+			# NOTE: Shadow the class method so the `state_dict()` keys do not
+			# change.
+			module.__dict__["forward"] = ActivationCheckpoint(
+				module=module, preserve_rng_state=preserve_rng_state
+			)
+		enabled.append(name)
+	if enabled:
+		logger.info(f"Activation checkpointing: {enabled}.")
+	return enabled
+
+
+def disable_activation_checkpoint(
+	model: nn.Module, modules: Optional[list[str]] = None
+):
+	"""Disable activation checkpointing for the given sub-modules. If `None`,
+	disable it for all sub-modules.
+	"""
+	named = dict(model.named_modules())
+	for name in (modules if modules is not None else named.keys()):
+		module = named.get(name, None)
+		if module is not None and \
+			isinstance(module.__dict__.get("forward"), ActivationCheckpoint):
+			del module.__dict__["forward"]
+
+
+def checkpointed_modules(model: nn.Module) -> list[str]:
+	"""Return the names of the checkpointed sub-modules."""
+	return [
+		name for name, module in model.named_modules()
+		if isinstance(module.__dict__.get("forward"), ActivationCheckpoint)
+	]
+
+
+# MARK: - Report
+
+def profile_activation_checkpoint(
+	model  : nn.Module,
+	x      : torch.Tensor,
+	y      : Optional[torch.Tensor] = None,
+	modules: Optional[list[str]]    = None,
+	iters  : int                    = 3,
+) -> list[dict]:
+	"""Measure the peak memory and the time of a training step (forward +
+	backward) without checkpointing, with each sub-module checkpointed alone,
+	and with all of them checkpointed.
+
+	Args:
+		model (nn.Module):
+			The model. `forward_train(x, y)` must return (y_hat, metrics) with
+			`metrics["loss"]`.
+		x (torch.Tensor):
+			The input batch.
+		y (torch.Tensor, optional):
+			The ground truth batch. If `None`, use `x`.
+		modules (list[str], optional):
+			The candidate sub-modules. If `None`, use `model.checkpoint_modules`.
+		iters (int):
+			Number of timed iterations per configuration. Default: `3`.
+
+	Returns:
+		report (list[dict]):
+			One row per configuration with keys: `modules`, `peak_memory`
+			(MB, `None` on CPU), `time` (s/step), `memory_saving` (%) and
+			`compute_overhead` (%) relative to no checkpointing.
+	"""
+	modules  = modules if modules is not None \
+		else list(getattr(model, "checkpoint_modules", []))
+	y        = x if y is None else y
+	previous = checkpointed_modules(model)
+	training = model.training
+	configs  = [[]] + [[m] for m in modules]
+	if len(modules) > 1:
+		configs.append(list(modules))
+
+	model.train()
+	report = []
+	for config in configs:
+		disable_activation_checkpoint(model)
+		enable_activation_checkpoint(model, modules=config)
+		peak_memory, step_time = measure_train_step(
+			model=model, x=x, y=y, iters=iters
+		)
+		report.append({
+			"modules"    : config or ["none"],
+			"peak_memory": peak_memory,
+			"time"       : step_time,
+		})
+
+	disable_activation_checkpoint(model)
+	enable_activation_checkpoint(model, modules=previous)
+	model.train(training)
+
+	base = report[0]
+	for row in report:
+		row["memory_saving"] = (
+			100.0 * (1.0 - row["peak_memory"] / base["peak_memory"])
+			if row["peak_memory"] and base["peak_memory"] else None
+		)
+		row["compute_overhead"] = 100.0 * (row["time"] / base["time"] - 1.0)
+
+	lines = [f"{'Checkpointed':<48} {'Peak (MB)':>10} {'Saving':>8} "
+			 f"{'Step (s)':>9} {'Overhead':>9}"]
+	for row in report:
+		peak   = f"{row['peak_memory']:.1f}" if row["peak_memory"] else "n/a"
+		saving = f"{row['memory_saving']:.1f}%" \
+			if row["memory_saving"] is not None else "n/a"
+		lines.append(f"{', '.join(row['modules']):<48} {peak:>10} "
+					 f"{saving:>8} {row['time']:>9.3f} "
+					 f"{row['compute_overhead']:>8.1f}%")
+	logger.info("Activation checkpointing report:\n" + "\n".join(lines))
+	return report
+
+
+def measure_train_step(
+	model: nn.Module, x: torch.Tensor, y: torch.Tensor, iters: int = 3
+) -> tuple[Optional[float], float]:
+	"""Return the peak memory (MB, `None` on CPU) and the mean time of a
+	training step.
+	"""
+	cuda = x.is_cuda
+
+	def step():
+		_, metrics = model.forward_train(x=x, y=y)
+		metrics["loss"].backward()
+		model.zero_grad(set_to_none=True)
+
+	step()  # Warm-up
+	if cuda:
+		torch.cuda.synchronize(x.device)
+		torch.cuda.reset_peak_memory_stats(x.device)
+	start = time.time()
+	for _ in range(iters):
+		step()
+	if cuda:
+		torch.cuda.synchronize(x.device)
+	step_time   = (time.time() - start) / max(iters, 1)
+	peak_memory = torch.cuda.max_memory_allocated(x.device) / 1024 ** 2 \
+		if cuda else None
+	return peak_memory, step_time
+
+
+# MARK: - Utils
+
+def flatten_tensors(values: list) -> tuple[list, list]:
+	"""Flatten one level of lists/tuples. Return the flat values and the spec
+	to rebuild them: for each value, `None` if it was kept as is, or
+	(type, length) if it was a list/tuple.
+	"""
+	flat  = []
+	specs = []
+	for v in values:
+		if isinstance(v, (list, tuple)):
+			flat.extend(v)
+			specs.append((type(v), len(v)))
+		else:
+			flat.append(v)
+			specs.append(None)
+	return flat, specs
+
+
+def unflatten_tensors(flat: list, specs: list) -> list:
+	"""Inverse of `flatten_tensors()`."""
+	values = []
+	i      = 0
+	for spec in specs:
+		if spec is None:
+			values.append(flat[i])
+			i += 1
+		else:
+			cls, n = spec
+			values.append(cls(flat[i:i + n]))
+			i += n
+	return values
@@ -5,3 +5,5 @@
 """
 
 from .checkpoint_callback import *
+from .image_cache_callback import *
+from .starvation_callback import *
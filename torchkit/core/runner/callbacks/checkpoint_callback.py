@@ -10,9 +10,11 @@ import copy
 import logging
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
 from pathlib import Path
 from typing import Any
+from typing import Callable
 from typing import Optional
 from typing import Union
 from weakref import proxy
@@ -84,6 +86,15 @@ class CheckpointCallback(Callback):
 			Whether to run checkpointing at the end of the training epoch.
 			If this is `False`, then the check runs at the end of the
 			validation. Default: `None` and skip saving.
+		async_save (bool):
+			If `True`, the checkpoint is snapshot to CPU memory in the training
+			loop, then serialized on a background thread. The best and last
+			checkpoints of a step share one snapshot and one write task, so the
+			loop does not wait for either of them. Every checkpoint is
+			written to a temp file and atomically renamed, and a superseded
+			checkpoint is only deleted after its replacement is durable. If
+			the write fails, the superseded checkpoint is kept and becomes the
+			best/last checkpoint again. Default: `False`.
 		last_global_step_saved (int):
 			The last training step the checkpoint was saved. Default: `-1`.
 		last_time_checked (float, optional):
@@ -119,6 +130,7 @@ class CheckpointCallback(Callback):
 		every_n_epochs         : Optional[int]         = 1,
 		train_time_interval    : Optional[timedelta]   = None,
 		save_on_train_epoch_end: Optional[bool]        = False,
+		async_save             : bool                  = False,
 	):
 		super().__init__()
 		self.filename                = filename
@@ -131,6 +143,11 @@ class CheckpointCallback(Callback):
 		self.every_n_epochs          = every_n_epochs
 		self.train_time_interval     = train_time_interval
 		self.save_on_train_epoch_end = save_on_train_epoch_end
+		self.async_save              = async_save
+		self.save_executor           = None
+		self.queued_saves            = []
+		self.pending_save            = None
+		self.pending_rollbacks       = {}
 		self.last_global_step_saved  = -1
 		self.last_time_checked       = None
 		self.best_score              = self.MODE_DICT[self.mode]
@@ -440,6 +457,29 @@ class CheckpointCallback(Callback):
 		trainer.train_loop.global_step -= 1
 		self._save_checkpoint(trainer=trainer)
 		trainer.train_loop.global_step += 1
+		self._wait_for_pending_save()
+	
+	def teardown(
+		self,
+		trainer  : "pl.Trainer",
+		pl_module: "pl.LightningModule",
+		stage    : Optional[str] = None
+	):
+		"""Wait for the background writes before the process moves on, so no
+		checkpoint is left half-written.
+
+		Args:
+			trainer (pl.Trainer):
+				The `Trainer` object.
+			pl_module (LightningModule):
+				The `LightningModule` object.
+			stage (str, optional):
+				The stage. One of: [`fit`, `validate`, `test`, `predict`].
+		"""
+		self._wait_for_pending_save()
+		if self.save_executor:
+			self.save_executor.shutdown(wait=True)
+			self.save_executor = None
 	
 	def on_save_checkpoint(
 		self,
@@ -552,6 +592,10 @@ class CheckpointCallback(Callback):
 		"""
 		self._validate_monitor_key(trainer=trainer)
 		
+		# NOTE: Settle the in-flight save first, so a failed write rolls back
+		# the best/last paths before they are compared and replaced
+		self._wait_for_pending_save()
+		
 		# NOTE: Track epoch when ckpt was last checked
 		self.last_global_step_saved = trainer.global_step
 		
@@ -570,6 +614,8 @@ class CheckpointCallback(Callback):
 		# Mode 2: Save last checkpoint
 		self._save_last_checkpoint(trainer=trainer,
 								   monitor_candidates=monitor_candidates)
+		# NOTE: Write the queued checkpoints from a single snapshot
+		self._flush_saves(trainer=trainer)
 		
 		# NOTE: Notify loggers
 		if trainer.is_global_zero and trainer.logger:
@@ -618,18 +664,20 @@ class CheckpointCallback(Callback):
 								  reverse=reverse))
 		best_path, best_score = list(sorted_dict.items())[0]
 		
-		# NOTE: Save
-		if (
-			self.best_checkpoint_path and
-			self.best_checkpoint_path != best_path and
-			trainer.should_rank_save_checkpoint
-		):
-			self._del_model(trainer=trainer, filepath=self.best_checkpoint_path)
-			
+		# NOTE: Save. The superseded best checkpoint is only deleted after the
+		# new one is written
 		if best_path != self.best_checkpoint_path:
+			old_path                  = self.best_checkpoint_path
+			old_score                 = self.best_score
 			self.best_checkpoint_path = best_path
 			self.best_score           = best_score
-			self._save_model(trainer=trainer, filepath=best_path)
+			
+			def rollback():
+				self.best_checkpoint_path = old_path
+				self.best_score           = old_score
+			
+			self._save_model(trainer=trainer, filepath=best_path,
+							 superseded=old_path, rollback=rollback)
 			if self.verbose:
 				epoch = monitor_candidates.get("epoch")
 				step  = monitor_candidates.get("step")
@@ -657,52 +705,181 @@ class CheckpointCallback(Callback):
 			epoch    = trainer.current_epoch
 		)
 		
-		# NOTE: Save
-		if (
-			self.last_checkpoint_path and
-			self.last_checkpoint_path != filepath and
-			trainer.should_rank_save_checkpoint
-		):
-			self._del_model(trainer=trainer,
-							filepath=self.last_checkpoint_path)
-		
+		# NOTE: Save. The previous last checkpoint is only deleted after the
+		# new one is written
+		old_path                  = self.last_checkpoint_path
 		self.last_checkpoint_path = filepath
-		self._save_model(trainer=trainer, filepath=filepath)
 		
-	def _save_model(self, trainer: "pl.Trainer", filepath: str):
-		"""Save the model's checkpoint.
+		def rollback():
+			self.last_checkpoint_path = old_path
+		
+		self._save_model(
+			trainer    = trainer,
+			filepath   = filepath,
+			superseded = old_path if old_path != filepath else None,
+			rollback   = rollback,
+		)
+		
+	def _save_model(
+		self,
+		trainer   : "pl.Trainer",
+		filepath  : str,
+		superseded: Optional[str]      = None,
+		rollback  : Optional[Callable] = None,
+	):
+		"""Save the model's checkpoint, then delete the checkpoint it
+		replaces. If the save fails, the superseded checkpoint is kept and
+		`rollback()` restores the callback's paths.
 		
 		Args:
 			trainer (pl.Trainer):
 				The `Trainer` object.
 			filepath (str):
 				The saved path.
+			superseded (str, optional):
+				The checkpoint path to delete once `filepath` is written.
+				Default: `None`.
+			rollback (callable, optional):
+				Called if the save fails. Default: `None`.
 		"""
 		# NOTE: In debugging, track when we save checkpoints
 		if hasattr(trainer, "dev_debugger"):
 			trainer.dev_debugger.track_checkpointing_history(filepath=filepath)
 		
-		# NOTE: Delegate the saving to the trainer
-		trainer.save_checkpoint(filepath=filepath,
-								weights_only=self.save_weights_only)
+		if not self.async_save:
+			# NOTE: Delegate the saving to the trainer
+			try:
+				trainer.save_checkpoint(filepath=filepath,
+										weights_only=self.save_weights_only)
+			except Exception:
+				if rollback:
+					rollback()
+				raise
+			if superseded and trainer.should_rank_save_checkpoint:
+				self._remove_file(superseded)
+			return
+		
+		# NOTE: Queue the write. `_flush_saves()` writes all the checkpoints of
+		# the step from one snapshot
+		self.queued_saves.append((filepath, superseded, rollback))
 	
-	# noinspection PyMethodMayBeStatic
-	def _del_model(self, trainer: "pl.Trainer", filepath: str):
-		"""Delete model's checkpoint.
+	def _flush_saves(self, trainer: "pl.Trainer"):
+		"""Snapshot the checkpoint once and write all the queued checkpoints
+		from it on the background thread.
 		
 		Args:
 			trainer (pl.Trainer):
 				The `Trainer` object.
-			filepath (str):
-				The checkpoint path to delete.
 		"""
-		if (
-			trainer.should_rank_save_checkpoint and
-			os.path.exists(path=filepath)
-		):
+		if not self.queued_saves:
+			return
+		saves             = self.queued_saves
+		self.queued_saves = []
+		
+		# NOTE: Bound the memory to one in-flight snapshot
+		self._wait_for_pending_save()
+		
+		# NOTE: Snapshot on all ranks (may involve collectives), write on the
+		# saving rank only
+		checkpoint = trainer.checkpoint_connector.dump_checkpoint(
+			weights_only=self.save_weights_only
+		)
+		if not trainer.should_rank_save_checkpoint:
+			return
+		checkpoint = self._to_cpu(checkpoint)
+		
+		if self.save_executor is None:
+			self.save_executor = ThreadPoolExecutor(max_workers=1)
+		self.pending_rollbacks = {
+			filepath: rollback for filepath, _, rollback in saves
+		}
+		self.pending_save      = self.save_executor.submit(
+			self._write_checkpoints, checkpoint,
+			[(filepath, superseded) for filepath, superseded, _ in saves]
+		)
+	
+	# noinspection PyMethodMayBeStatic
+	def _remove_file(self, filepath: str):
+		"""Remove a checkpoint file if it exists."""
+		if os.path.exists(path=filepath):
 			os.remove(path=filepath)
 			logger.debug(f"Removed checkpoint: {filepath}")
 	
+	def _to_cpu(self, data: Any) -> Any:
+		"""Recursively copy all tensors in `data` to CPU memory, so that the
+		training loop can keep updating the weights while the copy is
+		serialized.
+		"""
+		if torch.is_tensor(data):
+			return data.detach().to("cpu", copy=True)
+		if isinstance(data, dict):
+			return type(data)((k, self._to_cpu(v)) for k, v in data.items())
+		if isinstance(data, list):
+			return [self._to_cpu(v) for v in data]
+		if isinstance(data, tuple):
+			return tuple(self._to_cpu(v) for v in data)
+		return copy.deepcopy(data)
+	
+	# noinspection PyMethodMayBeStatic
+	def _write_checkpoint(
+		self, checkpoint: dict, filepath: str, superseded: Optional[str] = None
+	):
+		"""Write a checkpoint to a temp file, flush it to disk, then atomically
+		rename it to `filepath`. Only then delete the `superseded` checkpoint.
+		On failure, the temp file is removed and `superseded` is kept.
+		"""
+		tmp_path = f"{filepath}.tmp"
+		try:
+			with open(tmp_path, "wb") as f:
+				torch.save(checkpoint, f)
+				f.flush()
+				os.fsync(f.fileno())
+			os.replace(tmp_path, filepath)
+		except BaseException:
+			self._remove_file(tmp_path)
+			raise
+		logger.debug(f"Saved checkpoint: {filepath}")
+		if superseded:
+			self._remove_file(superseded)
+	
+	def _write_checkpoints(
+		self, checkpoint: dict, saves: list[tuple[str, Optional[str]]]
+	) -> dict[str, Exception]:
+		"""Write the same checkpoint to each `(filepath, superseded)` of
+		`saves`. A failed write does not stop the others.
+		
+		Returns:
+			failed (dict):
+				The error of each filepath that could not be written.
+		"""
+		failed = {}
+		for filepath, superseded in saves:
+			try:
+				self._write_checkpoint(checkpoint, filepath, superseded)
+			except Exception as err:
+				failed[filepath] = err
+		return failed
+	
+	def _wait_for_pending_save(self):
+		"""Block until the in-flight checkpoints are written. For each one
+		that failed, restore the paths of the checkpoint it was replacing.
+		"""
+		if self.pending_save is None:
+			return
+		try:
+			failed = self.pending_save.result()
+		except Exception as err:
+			failed = {filepath: err for filepath in self.pending_rollbacks}
+		try:
+			for filepath, err in failed.items():
+				logger.error(f"Cannot write checkpoint {filepath}: {err}.")
+				rollback = self.pending_rollbacks.get(filepath)
+				if rollback:
+					rollback()
+		finally:
+			self.pending_save      = None
+			self.pending_rollbacks = {}
+	
 	def _should_skip_saving_checkpoint(self, trainer: "pl.Trainer") -> bool:
 		"""Check the trainer if saving checkpoint is possible.
 
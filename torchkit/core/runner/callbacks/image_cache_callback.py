@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Image cache callback: publish the hit rate of the datasets' shared image
+caches.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Optional
+
+import pytorch_lightning as pl
+from pytorch_lightning import Callback
+from pytorch_lightning.utilities import rank_zero_info
+
+logger = logging.getLogger()
+
+__all__ = ["ImageCacheCallback"]
+
+
+# MARK: - ImageCacheCallback
+
+class ImageCacheCallback(Callback):
+	"""Image Cache Callback logs the stats of the `SharedImageCache` of each
+	dataset of the datamodule (`train`, `val`) at the end of each training
+	epoch, then resets them, so each epoch's hit rate is measured on its own.
+	The stats are summed over all DataLoader workers (they live in shared
+	memory) and logged to the trainer's logger, under `image_cache/<split>/`.
+	Datasets without a cache are skipped.
+
+	Attributes:
+		verbose (bool):
+			Print the epoch's hit rates. Default: `True`.
+	"""
+
+	splits = ["train", "val"]
+
+	# MARK: Magic Functions
+
+	def __init__(self, verbose: bool = True, *args, **kwargs):
+		super().__init__()
+		self.verbose = verbose
+
+	# MARK: Loop
+
+	def on_train_epoch_end(
+		self,
+		trainer  : "pl.Trainer",
+		pl_module: "pl.LightningModule",
+		unused   : Optional = None
+	):
+		"""Log and reset the stats of the image caches.
+
+		Args:
+			trainer (pl.Trainer):
+				The `Trainer` object.
+			pl_module (LightningModule):
+				The `LightningModule` object.
+			unused (optional):
+		"""
+		datamodule = getattr(trainer, "datamodule", None)
+		for split in self.splits:
+			dataset = getattr(datamodule, split, None)
+			cache   = getattr(dataset, "image_cache", None)
+			if cache is None:
+				continue
+			stats = cache.stats()
+			cache.reset_stats()
+			if trainer.logger is not None:
+				trainer.logger.log_metrics(
+					{f"image_cache/{split}/{k}": v for k, v in stats.items()},
+					step=trainer.current_epoch,
+				)
+			if self.verbose:
+				rank_zero_info(
+					f"Epoch {trainer.current_epoch}: {split} image cache hit "
+					f"rate {stats['hit_rate']:.3f} ({stats['hits']} hits, "
+					f"{stats['misses']} misses, {stats['evictions']} "
+					f"evictions, {stats['images']} images, "
+					f"{stats['bytes'] / 1E9:.2f}/"
+					f"{stats['budget'] / 1E9:.2f}GB)."
+				)
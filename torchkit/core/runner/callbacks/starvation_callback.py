@@ -0,0 +1,321 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Data-starvation profiling callback: how much of each training step is
+spent waiting for the data loader.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any
+from typing import Optional
+
+import pytorch_lightning as pl
+import torch
+from pytorch_lightning import Callback
+from pytorch_lightning.utilities import rank_zero_info
+
+logger = logging.getLogger()
+
+__all__ = ["DataStarvationCallback"]
+
+
+# MARK: - DataStarvationCallback
+
+class DataStarvationCallback(Callback):
+	"""Data Starvation Callback splits the wall time of each training step
+	into:
+		- `data_wait`: From the end of the previous step to the start of this
+		  one, minus the host-to-device copy: the time spent waiting for the
+		  data loader.
+		- `copy`: `transfer_batch_to_device()`.
+		- `forward`: From the start of the step to the backward pass.
+		- `backward`: The backward pass.
+		- `optimizer`: From the end of the backward pass to the end of the
+		  step (gradient clipping, optimizer step, zero grad).
+
+	It also samples the number of batches the data loader's workers have
+	ready (0 means the step will wait). At the end of each training epoch, it
+	logs the totals (s), the worker queue depth and the starvation ratio
+	(`data_wait` / step time) to the trainer's logger, under `starvation/`.
+	A ratio close to 0 means the model is the bottleneck; a high ratio means
+	more workers, caching or a cheaper augmentation will speed up training.
+
+	Notes:
+		- With `sync`, the CUDA device is synchronized at each boundary so
+		  asynchronous kernels are charged to the phase that launched them
+		  (and not to the data wait). It costs a little throughput, so only
+		  enable the callback while profiling.
+		- With `accumulate_grad_batches > 1`, the optimizer time is only
+		  spent on the last batch of each accumulation.
+
+	Attributes:
+		sync (bool):
+			Synchronize the CUDA device at each boundary. Default: `True`.
+		log_every_n_steps (int):
+			Also log the step's times every n steps. `0` to only log per
+			epoch. Default: `0`.
+		verbose (bool):
+			Print the epoch's summary. Default: `True`.
+	"""
+
+	phases = ["data_wait", "copy", "forward", "backward", "optimizer"]
+
+	# MARK: Magic Functions
+
+	def __init__(
+		self,
+		sync             : bool = True,
+		log_every_n_steps: int  = 0,
+		verbose          : bool = True,
+		*args, **kwargs
+	):
+		super().__init__()
+		self.sync              = sync
+		self.log_every_n_steps = log_every_n_steps
+		self.verbose           = verbose
+		self.cuda              = False
+		self.transfer          = None
+		self.reset()
+
+	# MARK: Configure
+
+	def reset(self):
+		"""Clear the epoch's totals."""
+		self.totals      = {phase: 0.0 for phase in self.phases}
+		self.step_times  = {phase: 0.0 for phase in self.phases}
+		self.num_steps   = 0
+		self.depths      = []
+		self.copy_time   = 0.0  # Copy time since the last boundary
+		self.last_end    = None
+		self.step_start  = None
+		self.fwd_end     = None
+		self.bwd_end     = None
+
+	def wrap_transfer(self, pl_module: "pl.LightningModule"):
+		"""Time `transfer_batch_to_device()` of `pl_module` in training."""
+		transfer = pl_module.transfer_batch_to_device
+
+		def timed_transfer(*args, **kwargs):
+			if not pl_module.training:
+				return transfer(*args, **kwargs)
+			start = self.clock()
+			batch = transfer(*args, **kwargs)
+			self.copy_time += self.clock() - start
+			return batch
+
+		self.transfer                      = transfer
+		pl_module.transfer_batch_to_device = timed_transfer
+
+	def unwrap_transfer(self, pl_module: "pl.LightningModule"):
+		"""Restore `transfer_batch_to_device()` of `pl_module`."""
+		if self.transfer is not None:
+			del pl_module.transfer_batch_to_device  # Back to the class method
+			self.transfer = None
+
+	# MARK: Loop
+
+	def on_train_start(
+		self, trainer: "pl.Trainer", pl_module: "pl.LightningModule"
+	):
+		"""Called when the train begins.
+
+		Args:
+			trainer (pl.Trainer):
+				The `Trainer` object.
+			pl_module (LightningModule):
+				The `LightningModule` object.
+		"""
+		self.cuda = self.sync and pl_module.device.type == "cuda"
+		self.wrap_transfer(pl_module=pl_module)
+
+	def on_train_end(
+		self, trainer: "pl.Trainer", pl_module: "pl.LightningModule"
+	):
+		"""Called when the train ends."""
+		self.unwrap_transfer(pl_module=pl_module)
+
+	def on_train_epoch_start(
+		self, trainer: "pl.Trainer", pl_module: "pl.LightningModule"
+	):
+		"""Start the epoch's totals. The first wait starts now."""
+		self.reset()
+		self.last_end = self.clock()
+
+	def on_train_batch_start(
+		self,
+		trainer  : "pl.Trainer",
+		pl_module: "pl.LightningModule",
+		batch    : Any,
+		batch_idx: int,
+		unused   : Optional[int] = 0,
+	):
+		"""The data wait ends: the batch is ready."""
+		now  = self.clock()
+		copy = self.copy_time
+		self.copy_time  = 0.0
+		self.step_times = {phase: 0.0 for phase in self.phases}
+		if self.last_end is not None:
+			self.step_times["data_wait"] = max(now - self.last_end - copy, 0.0)
+		self.step_times["copy"] = copy
+		self.step_start = now
+		self.fwd_end    = None
+		self.bwd_end    = None
+		depth = self.get_queue_depth(trainer=trainer)
+		if depth is not None:
+			self.depths.append(depth)
+
+	def on_before_backward(
+		self,
+		trainer  : "pl.Trainer",
+		pl_module: "pl.LightningModule",
+		loss     : torch.Tensor
+	):
+		"""The forward pass ends."""
+		self.fwd_end = self.clock()
+
+	def on_after_backward(
+		self, trainer: "pl.Trainer", pl_module: "pl.LightningModule"
+	):
+		"""The backward pass ends."""
+		self.bwd_end = self.clock()
+
+	def on_train_batch_end(
+		self,
+		trainer  : "pl.Trainer",
+		pl_module: "pl.LightningModule",
+		outputs  : Any,
+		batch    : Any,
+		batch_idx: int,
+		unused   : Optional[int] = 0,
+	):
+		"""Split the step's compute time and add the step to the totals."""
+		now  = self.clock()
+		copy = self.copy_time  # If the batch is moved inside the step
+		self.copy_time = 0.0
+		if self.step_start is None:
+			return
+
+		fwd_end = self.fwd_end or now
+		bwd_end = self.bwd_end or fwd_end
+		times   = self.step_times
+		times["copy"]     += copy
+		times["forward"]   = max(fwd_end - self.step_start - copy, 0.0)
+		times["backward"]  = bwd_end - fwd_end
+		times["optimizer"] = now - bwd_end
+		for phase in self.phases:
+			self.totals[phase] += times[phase]
+		self.num_steps += 1
+		self.last_end   = now
+
+		if self.log_every_n_steps and \
+			trainer.global_step % self.log_every_n_steps == 0:
+			self.log_metrics(
+				trainer = trainer,
+				metrics = {f"starvation_step/{k}": v for k, v in times.items()},
+				step    = trainer.global_step,
+			)
+
+	def on_validation_start(
+		self, trainer: "pl.Trainer", pl_module: "pl.LightningModule"
+	):
+		"""Do not count the validation as a data wait."""
+		self.last_end = None
+
+	def on_validation_end(
+		self, trainer: "pl.Trainer", pl_module: "pl.LightningModule"
+	):
+		"""The next wait starts after the validation."""
+		self.last_end = self.clock()
+
+	def on_train_epoch_end(
+		self,
+		trainer  : "pl.Trainer",
+		pl_module: "pl.LightningModule",
+		unused   : Optional = None
+	):
+		"""Log the epoch's totals and starvation ratio.
+
+		Args:
+			trainer (pl.Trainer):
+				The `Trainer` object.
+			pl_module (LightningModule):
+				The `LightningModule` object.
+			unused (optional):
+		"""
+		if self.num_steps == 0:
+			return
+		metrics = self.summary()
+		self.log_metrics(
+			trainer = trainer,
+			metrics = {f"starvation/{k}": v for k, v in metrics.items()},
+			step    = trainer.current_epoch,
+		)
+		if self.verbose:
+			rank_zero_info(
+				f"Epoch {trainer.current_epoch}: starvation ratio "
+				f"{metrics['ratio']:.3f} over {self.num_steps} steps (data "
+				f"wait {metrics['data_wait']:.1f}s, copy "
+				f"{metrics['copy']:.1f}s, forward {metrics['forward']:.1f}s, "
+				f"backward {metrics['backward']:.1f}s, optimizer "
+				f"{metrics['optimizer']:.1f}s)."
+			)
+
+	# MARK: Stats
+
+	def summary(self) -> dict:
+		"""Return the epoch's totals (s), the starvation ratio, the average
+		step time (s) and the worker queue depth.
+		"""
+		total   = sum(self.totals.values())
+		metrics = dict(self.totals)
+		metrics["ratio"]     = self.totals["data_wait"] / max(total, 1e-9)
+		metrics["step_time"] = total / max(self.num_steps, 1)
+		if self.depths:
+			metrics["queue_depth"] = sum(self.depths) / len(self.depths)
+			metrics["queue_empty"] = (sum(d == 0 for d in self.depths)
+									  / len(self.depths))
+		return metrics
+
+	def log_metrics(self, trainer: "pl.Trainer", metrics: dict, step: int):
+		"""Log to the trainer's logger (TensorBoard in `train.py`)."""
+		if trainer.logger is not None:
+			trainer.logger.log_metrics(metrics, step=step)
+
+	# MARK: Utils
+
+	def clock(self) -> float:
+		"""Return the time, after the queued CUDA work if `sync`."""
+		if self.cuda:
+			torch.cuda.synchronize()
+		return time.perf_counter()
+
+	def get_queue_depth(self, trainer: "pl.Trainer") -> Optional[int]:
+		"""Return the number of batches the training data loader's workers
+		have ready, or `None` if it cannot be read (no workers, or the
+		iterator is not reachable).
+		"""
+		loader   = getattr(trainer, "train_dataloader", None)
+		iterator = getattr(loader, "_iterator", None)
+		iters    = getattr(iterator, "loader_iters", iterator)
+		if isinstance(iters, dict):
+			iters = list(iters.values())
+		elif not isinstance(iters, (list, tuple)):
+			iters = [iters]
+
+		depth = None
+		for it in iters:
+			queue = getattr(it, "_data_queue", None)
+			if queue is None:
+				continue
+			try:
+				ready = queue.qsize()
+			except NotImplementedError:  # macOS
+				continue
+			# NOTE: Batches that arrived out of order wait in `_task_info`
+			task_info = getattr(it, "_task_info", {})
+			ready    += sum(len(info) == 2 for info in task_info.values())
+			depth  = (depth or 0) + ready
+		return depth
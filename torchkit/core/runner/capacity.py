@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Find the largest batch size and input resolution that fit in a memory
+budget, for training and for inference, with synthetic passes.
+"""
+
+from __future__ import annotations
+
+import gc
+import logging
+import time
+from typing import Callable
+from typing import Optional
+from typing import Union
+
+import torch
+from torch import nn
+
+from torchkit.core.utils import Dim3
+
+logger = logging.getLogger()
+
+__all__ = ["CapacityFinder"]
+
+
+# MARK: - CapacityFinder
+
+class CapacityFinder:
+	"""Capacity Finder binary-searches, on one device, the largest batch size
+	and the largest input resolution (keeping the aspect ratio of `shape`)
+	such that a step stays within the memory budget:
+		- Training: `forward_train(x, y)`, `loss.backward()` and an optimizer
+		  step (Adam with `lr=0` by default, so the optimizer states are
+		  counted but the weights do not change).
+		- Inference: `forward_infer(x)` under `torch.no_grad()`.
+
+	A configuration fits if it does not run out of memory and its peak
+	allocated memory is within the budget. The inputs are random tensors, so
+	no dataset is needed.
+
+	Notes:
+		- On CPU, the peak memory is not measured: only an out of memory error
+		  stops the search, so set `max_batch_size` and `max_side`.
+		- The peak memory does not include the DataLoader's pinned memory or
+		  the CUDA context, so keep some headroom (`budget < 1.0`).
+
+	Attributes:
+		model (nn.Module):
+			The model. `forward_train(x, y)` must return (y_hat, metrics) with
+			`metrics["loss"]`.
+		device (torch.device, str):
+			The device to run on. Default: `cuda:0`.
+		budget (float):
+			The memory budget. If <= 1.0, a fraction of the device's total
+			memory, else MB. Default: `0.9`.
+		stride (int):
+			The height and width are multiples of `stride`. Default: `32`.
+		iters (int):
+			Number of timed iterations per configuration. Default: `3`.
+		max_batch_size (int):
+			The largest batch size tried. Default: `1024`.
+		max_side (int):
+			The largest height (or width) tried. Default: `4096`.
+		optimizer (callable, optional):
+			The function creating the optimizer from the parameters. If
+			`None`, use Adam with `lr=0`. Default: `None`.
+	"""
+
+	# MARK: Magic Functions
+
+	def __init__(
+		self,
+		model         : nn.Module,
+		device        : Union[torch.device, str] = "cuda:0",
+		budget        : float                    = 0.9,
+		stride        : int                      = 32,
+		iters         : int                      = 3,
+		max_batch_size: int                      = 1024,
+		max_side      : int                      = 4096,
+		optimizer     : Optional[Callable]       = None,
+	):
+		self.device         = torch.device(device)
+		self.model          = model.to(self.device)
+		self.stride         = stride
+		self.iters          = iters
+		self.max_batch_size = max_batch_size
+		self.max_side       = max_side
+		self.optimizer      = optimizer
+		self.cuda           = self.device.type == "cuda"
+		if self.cuda and budget <= 1.0:
+			total  = torch.cuda.get_device_properties(self.device).total_memory
+			budget = budget * total / 1024 ** 2
+		self.budget = budget if self.cuda else None  # MB
+
+	# MARK: Measure
+
+	def measure(
+		self, batch_size: int, shape: Dim3, training: bool = True
+	) -> Optional[dict]:
+		"""Run `iters` synthetic steps. Return `None` if the configuration
+		does not fit, else a dict with `peak_memory` (MB, `None` on CPU),
+		`time` (s/step) and `throughput` (images/s).
+		"""
+		h, w, c   = shape
+		x         = None
+		y         = None
+		optimizer = None
+		training_ = self.model.training
+		try:
+			x = torch.rand(batch_size, c, h, w, device=self.device)
+			if training:
+				y = torch.rand(batch_size, c, h, w, device=self.device)
+				optimizer = (self.optimizer(self.model.parameters())
+							 if self.optimizer is not None else
+							 torch.optim.Adam(self.model.parameters(), lr=0.0))
+				self.model.train()
+			else:
+				self.model.eval()
+
+			def step():
+				if training:
+					_, metrics = self.model.forward_train(x=x, y=y)
+					metrics["loss"].backward()
+					optimizer.step()
+					optimizer.zero_grad(set_to_none=True)
+				else:
+					with torch.no_grad():
+						self.model.forward_infer(x=x)
+
+			step()  # Warm-up (and optimizer states)
+			if self.cuda:
+				torch.cuda.synchronize(self.device)
+				torch.cuda.reset_peak_memory_stats(self.device)
+			start = time.time()
+			for _ in range(self.iters):
+				step()
+			if self.cuda:
+				torch.cuda.synchronize(self.device)
+			step_time   = (time.time() - start) / max(self.iters, 1)
+			peak_memory = (torch.cuda.max_memory_allocated(self.device)
+						   / 1024 ** 2 if self.cuda else None)
+		except RuntimeError as err:  # `torch.cuda.OutOfMemoryError` too
+			if "out of memory" not in str(err):
+				raise
+			return None
+		finally:
+			del x, y, optimizer
+			self.model.zero_grad(set_to_none=True)
+			self.model.train(training_)
+			gc.collect()
+			if self.cuda:
+				torch.cuda.empty_cache()
+
+		if peak_memory is not None and peak_memory > self.budget:
+			return None
+		return {
+			"peak_memory": peak_memory,
+			"time"       : step_time,
+			"throughput" : batch_size / step_time,
+		}
+
+	# MARK: Search
+
+	def find_max_batch_size(
+		self, shape: Dim3, training: bool = True
+	) -> tuple[int, Optional[dict]]:
+		"""Return the largest batch size that fits with inputs of `shape`
+		and its measurements. Return (0, None) if even 1 does not fit.
+		"""
+		return self.search(
+			lambda b: self.measure(batch_size=b, shape=shape,
+								   training=training),
+			high=self.max_batch_size,
+		)
+
+	def find_max_shape(
+		self, batch_size: int, shape: Dim3, training: bool = True
+	) -> tuple[Optional[Dim3], Optional[dict]]:
+		"""Return the largest shape (with the aspect ratio of `shape`) that
+		fits with `batch_size` and its measurements.
+		"""
+		h, w, c = shape
+		scale   = max(h, w) / self.stride
+
+		def shape_of(k: int) -> Dim3:
+			return (max(round(h / scale * k), 1) * self.stride,
+					max(round(w / scale * k), 1) * self.stride, c)
+
+		k, result = self.search(
+			lambda k: self.measure(batch_size=batch_size, shape=shape_of(k),
+								   training=training),
+			high=self.max_side // self.stride,
+		)
+		return (shape_of(k) if k else None), result
+
+	@staticmethod
+	def search(
+		measure: Callable[[int], Optional[dict]], high: int
+	) -> tuple[int, Optional[dict]]:
+		"""Find the largest `n` in [1, high] such that `measure(n)` is not
+		`None`: double `n` until it does not fit, then binary search between
+		the last two values. Assume that fitting is monotonic in `n`.
+		"""
+		best, result = 0, None
+		n = 1
+		while n <= high:
+			r = measure(n)
+			if r is None:
+				break
+			best, result = n, r
+			n *= 2
+		lo, hi = best + 1, min(n, high + 1) - 1
+		while lo <= hi:
+			mid = (lo + hi) // 2
+			r   = measure(mid)
+			if r is None:
+				hi = mid - 1
+			else:
+				best, result = mid, r
+				lo = mid + 1
+		return best, result
+
+	def run(self, shape: Dim3) -> dict:
+		"""Find, for training and for inference, the largest batch size with
+		inputs of `shape`, and the largest shape with the batch size 1.
+
+		Returns:
+			report (dict):
+				{`training`/`inference`: {`batch_size`, `shape`,
+				`batch_result`, `shape_result`}}. The results have the peak
+				memory, the step time and the throughput.
+		"""
+		report = {}
+		for phase, training in [("training", True), ("inference", False)]:
+			batch_size, batch_result = self.find_max_batch_size(
+				shape=shape, training=training
+			)
+			max_shape, shape_result = self.find_max_shape(
+				batch_size=1, shape=shape, training=training
+			)
+			report[phase] = {
+				"batch_size"  : batch_size,
+				"batch_result": batch_result,
+				"shape"       : max_shape,
+				"shape_result": shape_result,
+			}
+
+		budget = f"{self.budget:.0f}MB" if self.budget else "n/a"
+		lines  = [f"Capacity on {self.device} (budget: {budget}), "
+				  f"shape {list(shape)}:",
+				  f"{'Phase':<10} {'Search':<22} {'Peak (MB)':>10} "
+				  f"{'Step (s)':>9} {'Images/s':>9}"]
+		for phase, r in report.items():
+			for name, value, result in [
+				("batch_size", r["batch_size"], r["batch_result"]),
+				("shape (batch 1)", r["shape"], r["shape_result"]),
+			]:
+				if result is None:
+					lines.append(f"{phase:<10} {name}: does not fit")
+					continue
+				peak = (f"{result['peak_memory']:.1f}"
+						if result["peak_memory"] else "n/a")
+				lines.append(f"{phase:<10} {f'{name}={value}':<22} "
+							 f"{peak:>10} {result['time']:>9.3f} "
+							 f"{result['throughput']:>9.1f}")
+		logger.info("\n".join(lines))
+		return report
+
+	@staticmethod
+	def recommend(report: dict) -> dict:
+		"""Return the config values to set from a `run()` report:
+		`data.batch_size` and `inference.batch_size`, both measured with the
+		configured shape, so they can be applied together. The largest shapes
+		were measured with a batch size of 1 and are not recommended: they do
+		not fit with the recommended batch sizes.
+		"""
+		return {
+			"data.batch_size"     : report["training"]["batch_size"],
+			"inference.batch_size": report["inference"]["batch_size"],
+		}
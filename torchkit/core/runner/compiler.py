@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Compiled-graph execution of `BaseModel.forward_infer()` with
+shape-bucketed warm-up and eager fallback.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import Callable
+from typing import Optional
+from typing import Union
+
+import torch
+from torch import nn
+
+from torchkit.core.utils import Tensors
+
+logger = logging.getLogger()
+
+
+# MARK: - CompiledForward
+
+class EagerForward(nn.Module):
+	"""Thin module around the eager `forward_infer()` so it can be traced."""
+
+	def __init__(self, model: nn.Module, eager_fn: Callable):
+		super().__init__()
+		self.model    = model
+		self.eager_fn = eager_fn
+
+	def forward(self, x: torch.Tensor) -> Tensors:
+		return self.eager_fn(x=x)
+
+
+# noinspection PyMethodMayBeStatic
+class CompiledForward:
+	"""Compiled Forward replaces a model's `forward_infer()`. Calls whose input
+	matches one of the declared shape buckets run a compiled graph, every other
+	call falls back to the eager implementation.
+
+	Two backends are supported:
+		- `torchscript`: Trace one graph per bucket. In eval mode, the graph is
+		  frozen (weights folded as constants) and optimized for inference.
+		  In training mode, the graph is traced only, so it shares parameters
+		  with the model and gradients still flow.
+		- `inductor`: Use `torch.compile()` (PyTorch 2.0+). Only the declared
+		  buckets are dispatched to the compiled function to avoid
+		  re-compilations on unseen shapes.
+
+	Graphs are keyed by (shape, dtype, device, training), so switching between
+	`train()` and `eval()`, or moving the model, never runs a stale graph.
+
+	Attributes:
+		model (nn.Module):
+			The model.
+		eager_fn (Callable):
+			The original (eager) `forward_infer()`.
+		backend (str):
+			One of: [`torchscript`, `inductor`].
+		buckets (list):
+			The list of input shapes as [B, C, H, W] to compile and warm up.
+		freeze (bool):
+			Freeze the TorchScript graphs in eval mode.
+		warmup_iters (int):
+			Number of warm-up iterations per bucket.
+		graphs (dict):
+			The dictionary of {key: compiled callable}.
+		num_compiled_calls (int):
+			Number of calls dispatched to a compiled graph.
+		num_eager_calls (int):
+			Number of calls that fell back to eager.
+	"""
+
+	backends = ["torchscript", "inductor"]
+
+	# MARK: Magic Functions
+
+	def __init__(
+		self,
+		model       : nn.Module,
+		eager_fn    : Callable,
+		backend     : str            = "torchscript",
+		buckets     : Optional[list] = None,
+		freeze      : bool           = True,
+		warmup_iters: int            = 2,
+		*args, **kwargs
+	):
+		super().__init__()
+		if backend not in self.backends:
+			raise ValueError(f"`backend` must be one of: {self.backends}. "
+							 f"But got: {backend}.")
+		if backend == "inductor" and not hasattr(torch, "compile"):
+			logger.warning(f"`torch.compile()` is not available in PyTorch "
+						   f"{torch.__version__}. Use `torchscript` backend.")
+			backend = "torchscript"
+
+		self.model        = model
+		self.eager_fn     = eager_fn
+		self.backend      = backend
+		self.buckets      = [tuple(b) for b in (buckets or [])]
+		self.freeze       = freeze
+		self.warmup_iters = warmup_iters
+		self.graphs       = {}
+		self.inductor_fn  = None
+		self.unseen       = set()
+		self.num_compiled_calls = 0
+		self.num_eager_calls    = 0
+
+	def __call__(self, x: Tensors, *args, **kwargs) -> Tensors:
+		"""Run the compiled graph for `x`'s shape, or the eager
+		`forward_infer()` if there is none.
+		"""
+		if args or kwargs or not torch.is_tensor(x):
+			return self.eager_fn(x=x, *args, **kwargs)
+
+		graph = self.graphs.get(self.get_key(x), None)
+		if graph is None:
+			self.num_eager_calls += 1
+			key = self.get_key(x)
+			if key not in self.unseen:
+				self.unseen.add(key)
+				logger.info(f"No compiled graph for input {tuple(x.shape)}. "
+							f"Fallback to eager.")
+			return self.eager_fn(x=x)
+
+		self.num_compiled_calls += 1
+		return graph(x)
+
+	# MARK: Compile
+
+	def compile(
+		self,
+		device: Union[torch.device, str, None] = None,
+		dtype : torch.dtype                    = torch.float32
+	):
+		"""Compile and warm up a graph for each bucket in the current mode
+		(`train()` or `eval()`) of the model. In `train()` mode, the buffers
+		(e.g. BatchNorm running stats) are restored afterwards, so the random
+		inputs do not change them.
+
+		Args:
+			device (torch.device, str, optional):
+				The device of the inputs. If `None`, use the model's device.
+			dtype (torch.dtype):
+				The dtype of the inputs. Default: `torch.float32`.
+		"""
+		if device is None:
+			device = next(self.model.parameters()).device
+
+		buffers = ([(b, b.detach().clone()) for b in self.model.buffers()]
+				   if self.model.training else [])
+		try:
+			for bucket in self.buckets:
+				x     = torch.rand(bucket, device=device, dtype=dtype)
+				key   = self.get_key(x)
+				start = time.time()
+				with torch.no_grad():
+					self.graphs[key] = self.compile_graph(x=x)
+					for _ in range(self.warmup_iters):
+						self.graphs[key](x)
+				if x.is_cuda:
+					torch.cuda.synchronize(device)
+				logger.info(f"Compiled {self.backend} graph for input {bucket} "
+							f"in {(time.time() - start):.2f}s.")
+		finally:
+			# NOTE: In place, so the traced graphs keep sharing the buffers
+			with torch.no_grad():
+				for buffer, saved in buffers:
+					buffer.copy_(saved)
+
+	def compile_graph(self, x: torch.Tensor) -> Callable:
+		"""Build the compiled callable for the example input `x`."""
+		if self.backend == "inductor":
+			if self.inductor_fn is None:
+				self.inductor_fn = torch.compile(self.eager_fn, dynamic=False)
+			inductor_fn = self.inductor_fn
+			return lambda t: inductor_fn(x=t)
+
+		wrapper = EagerForward(model=self.model, eager_fn=self.eager_fn)
+		wrapper.train(self.model.training)
+		graph   = torch.jit.trace(wrapper, x, strict=False, check_trace=False)
+		if self.freeze and not self.model.training:
+			graph = torch.jit.freeze(graph.eval())
+			if hasattr(torch.jit, "optimize_for_inference"):
+				graph = torch.jit.optimize_for_inference(graph)
+		return graph
+
+	def clear(self):
+		"""Drop all compiled graphs. They must be rebuilt after the weights
+		are replaced (frozen graphs hold a copy of the weights).
+		"""
+		self.graphs      = {}
+		self.inductor_fn = None
+		self.unseen      = set()
+
+	# MARK: Utils
+
+	def get_key(self, x: torch.Tensor) -> tuple:
+		"""Return the graph key of the input `x`."""
+		return tuple(x.shape), x.dtype, x.device, self.model.training
+
+	def stats(self) -> dict:
+		"""Return the dispatch counters."""
+		return {
+			"backend"           : self.backend,
+			"num_graphs"        : len(self.graphs),
+			"num_compiled_calls": self.num_compiled_calls,
+			"num_eager_calls"   : self.num_eager_calls,
+		}
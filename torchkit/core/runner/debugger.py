@@ -7,11 +7,18 @@
 from __future__ import annotations
 
 import logging
+import os
 import threading
+from queue import Full
 from queue import Queue
 from typing import Optional
 from typing import Union
 
+import cv2
+import numpy as np
+import torch
+import torch.nn.functional as F
+
 from torchkit.core.utils import Arrays
 from torchkit.core.utils import FuncCls
 from torchkit.core.utils import Tensors
@@ -22,7 +29,19 @@ logger = logging.getLogger()
 # MARK: - Debugger
 
 class Debugger:
-    """
+    """Debugger dumps debug images during validation without blocking the
+    training loop.
+    
+    By default (`use_show_func=False`), `run()` only slices the first
+    `show_max_n` samples, downsamples them on the device to at most
+    `max_size` pixels, and starts a non-blocking copy into pinned CPU memory.
+    A background thread then waits for the copy, composes the grid with numpy
+    (one column per input: x, y, y_hat), encodes it with `cv2.imencode()` and
+    writes it to disk. When the queue is full, the dump is dropped instead of
+    stalling the step.
+    
+    With `use_show_func=True` (or `show=True`), the model's `show_results()` is
+    called in the background thread with CPU copies of the subset.
     
     Attributes:
         every_n_epochs (int):
@@ -49,6 +68,14 @@ class Debugger:
             Function to visualize the debug results. Default: `None`.
         wait_time (float):
             Pause some times before showing the next image. Default: `0.001`.
+        max_size (int):
+            The longer side of each debug image is downsampled to at most
+            `max_size` pixels. Default: `256`.
+        use_show_func (bool):
+            If `True`, dump with `show_func` instead of the numpy/OpenCV grid.
+            Default: `False`.
+        num_dropped (int):
+            Number of dumps dropped because the queue was full.
     """
     
     # MARK: Magic Functions
@@ -65,6 +92,8 @@ class Debugger:
         show_max_n     : int               = 8,
         show_func      : Optional[FuncCls] = None,
         wait_time      : float             = 0.001,
+        max_size       : int               = 256,
+        use_show_func  : bool              = False,
         *args, **kwargs
     ):
         super().__init__()
@@ -78,8 +107,11 @@ class Debugger:
         self.show_max_n      = show_max_n
         self.show_func       = show_func
         self.wait_time       = wait_time
+        self.max_size        = max_size
+        self.use_show_func   = use_show_func or show
         self.debug_queue     = None
         self.thread_debugger = None
+        self.num_dropped     = 0
         
         self.init_thread()
         
@@ -87,9 +119,9 @@ class Debugger:
     
     def init_thread(self):
         if self.run_in_parallel:
-            self.debug_queue     = Queue(maxsize=self.queue_size)
+            self.debug_queue     = Queue(maxsize=self.queue_size or 0)
             self.thread_debugger = threading.Thread(
-                target=self.show_results_parallel
+                target=self.show_results_parallel, daemon=True
             )
             
     # MARK: Run
@@ -101,22 +133,172 @@ class Debugger:
         y_hat	: Optional[Union[Tensors, Arrays]] = None,
         filepath: Optional[str] 				   = None,
     ):
-        """Run the debugger process."""
-        if self.show_func:
-            if self.thread_debugger:
-                self.debug_queue.put([x, y, y_hat, filepath])
-            else:
-                self.show_results(x=x, y=y, y_hat=y_hat, filepath=filepath)
+        """Run the debugger process. The inputs are never modified nor kept,
+        so there is no need to copy them beforehand.
+        """
+        if self.use_show_func and self.show_func is None:
+            return
+        
+        with torch.no_grad():
+            item = [self.snapshot(x), self.snapshot(y), self.snapshot(y_hat),
+                    filepath, self.record_event(x)]
+        if self.run_in_parallel:
+            self.run_routine_start()  # NOTE: No-op if already running
+            try:
+                self.debug_queue.put_nowait(item)
+            except Full:
+                self.num_dropped += 1
+        else:
+            self.dump(*item)
 
     def run_routine_start(self):
         """Perform operations when run routine starts."""
-        if self.thread_debugger:
+        if self.thread_debugger is None and self.run_in_parallel:
+            self.init_thread()
+        if self.thread_debugger and not self.thread_debugger.is_alive():
             self.thread_debugger.start()
     
     def run_routine_end(self):
         """Perform operations when run routine ends."""
-        if self.thread_debugger:
-            self.debug_queue.put([None, None, None, None])
+        if self.thread_debugger and self.thread_debugger.is_alive():
+            self.debug_queue.put([None, None, None, None, None])
+            self.thread_debugger.join()
+        self.thread_debugger = None
+        if self.num_dropped > 0:
+            logger.info(f"Debugger dropped {self.num_dropped} dumps because "
+                        f"the queue was full.")
+    
+    # MARK: Snapshot
+    
+    def snapshot(
+        self, data: Optional[Union[Tensors, Arrays]]
+    ) -> Optional[Union[Tensors, Arrays]]:
+        """Take a small, detached copy of `data`: the first `show_max_n`
+        samples downsampled to `max_size`, copied to pinned CPU memory without
+        blocking.
+        """
+        if data is None:
+            return None
+        if isinstance(data, (list, tuple)):
+            return type(data)(self.snapshot(d) for d in data)
+        if isinstance(data, dict):
+            return {k: self.snapshot(v) for k, v in data.items()}
+        if isinstance(data, np.ndarray):
+            return np.array(data[: self.show_max_n], copy=True)
+        if not torch.is_tensor(data):
+            return data
+        
+        t = data.detach()
+        if t.ndim == 4:
+            t = t[: self.show_max_n]
+            h, w = t.shape[-2:]
+            if self.max_size and max(h, w) > self.max_size \
+                and t.is_floating_point():
+                scale = self.max_size / max(h, w)
+                t     = F.interpolate(
+                    t, scale_factor=scale, mode="bilinear",
+                    align_corners=False, recompute_scale_factor=False
+                )
+        if not t.is_cuda:
+            return t.clone()
+        buffer = torch.empty(t.shape, dtype=t.dtype, pin_memory=True)
+        buffer.copy_(t, non_blocking=True)
+        return buffer
+    
+    def record_event(
+        self, data: Optional[Union[Tensors, Arrays]]
+    ) -> Optional[torch.cuda.Event]:
+        """Record a CUDA event after the non-blocking copies were enqueued."""
+        tensor = data
+        while isinstance(tensor, (list, tuple)) and len(tensor) > 0:
+            tensor = tensor[0]
+        if not torch.is_tensor(tensor) or not tensor.is_cuda:
+            return None
+        event = torch.cuda.Event()
+        event.record(torch.cuda.current_stream(tensor.device))
+        return event
+    
+    # MARK: Dump
+    
+    def dump(
+        self,
+        x       : Union[Tensors, Arrays],
+        y       : Optional[Union[Tensors, Arrays]] = None,
+        y_hat   : Optional[Union[Tensors, Arrays]] = None,
+        filepath: Optional[str]                    = None,
+        event   : Optional[torch.cuda.Event]       = None,
+    ):
+        """Write the debug image of one snapshot."""
+        if event is not None:
+            event.synchronize()
+        if self.use_show_func:
+            self.show_results(x=x, y=y, y_hat=y_hat, filepath=filepath)
+        elif filepath is not None:
+            self.write_grid(x=x, y=y, y_hat=y_hat, filepath=filepath)
+    
+    def write_grid(
+        self,
+        x       : Union[Tensors, Arrays],
+        y       : Optional[Union[Tensors, Arrays]] = None,
+        y_hat   : Optional[Union[Tensors, Arrays]] = None,
+        filepath: Optional[str]                    = None,
+    ):
+        """Compose a grid with one row per sample and one column per image
+        (x, y, y_hat), then encode it with OpenCV. The images are RGB (the
+        formatters flip BGR to RGB), so the grid is flipped back to BGR.
+        """
+        columns = []
+        for data in [x, y, y_hat]:
+            columns += [i for i in self.to_uint8_images(data) if i is not None]
+        if len(columns) == 0:
+            return
+        
+        h = max(c.shape[1] for c in columns)
+        w = max(c.shape[2] for c in columns)
+        n = min(c.shape[0] for c in columns)
+        grid = np.zeros((n * h, len(columns) * w, 3), dtype=np.uint8)
+        for j, column in enumerate(columns):
+            for i in range(n):
+                image = column[i]
+                grid[i * h: i * h + image.shape[0],
+                     j * w: j * w + image.shape[1]] = image
+        
+        grid      = cv2.cvtColor(grid, cv2.COLOR_RGB2BGR)
+        extension = os.path.splitext(filepath)[1] or ".jpg"
+        ok, buffer = cv2.imencode(
+            extension, grid, [int(cv2.IMWRITE_JPEG_QUALITY), self.image_quality]
+        )
+        if ok:
+            with open(filepath, "wb") as f:
+                f.write(buffer.tobytes())
+        else:
+            logger.warning(f"Cannot encode debug image: {filepath}.")
+    
+    def to_uint8_images(
+        self, data: Optional[Union[Tensors, Arrays]]
+    ) -> list[Optional[np.ndarray]]:
+        """Convert a 4D tensor/array (or a list of them) into a list of uint8
+        [B, H, W, 3] arrays. Items that are not images are skipped.
+        """
+        if data is None:
+            return []
+        if isinstance(data, (list, tuple)):
+            return [i for d in data for i in self.to_uint8_images(d)]
+        if isinstance(data, dict):
+            return [i for d in data.values() for i in self.to_uint8_images(d)]
+        
+        array = data.float().numpy() if torch.is_tensor(data) else data
+        if not isinstance(array, np.ndarray) or array.ndim != 4:
+            return [None]
+        if array.shape[1] in (1, 3) and array.shape[-1] not in (1, 3):
+            array = array.transpose(0, 2, 3, 1)  # [B, C, H, W] -> [B, H, W, C]
+        if array.shape[-1] == 1:
+            array = np.repeat(array, 3, axis=-1)
+        if array.shape[-1] != 3:
+            return [None]
+        if array.dtype != np.uint8:
+            array = (np.clip(array, 0.0, 1.0) * 255.0).round().astype(np.uint8)
+        return [np.ascontiguousarray(array)]
     
     # MARK: Visualize
 
@@ -138,10 +320,10 @@ class Debugger:
     def show_results_parallel(self):
         """Draw `result` in a separated thread."""
         while True:
-            (x, y, y_hat, filepath) = self.debug_queue.get()
+            (x, y, y_hat, filepath, event) = self.debug_queue.get()
             if x is None:
                 break
-            self.show_results(x=x, y=y, y_hat=y_hat, filepath=filepath)
-    
-        # Stop debugger thread
-        self.thread_debugger.join()
+            try:
+                self.dump(x=x, y=y, y_hat=y_hat, filepath=filepath, event=event)
+            except Exception as err:
+                logger.warning(f"Cannot dump debug image {filepath}: {err}.")
@@ -0,0 +1,291 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Content-aware gating: route each frame to pass-through, a light model or
+the full model, from a cheap per-frame score.
+"""
+
+from __future__ import annotations
+
+import logging
+from abc import ABCMeta
+from abc import abstractmethod
+from bisect import bisect_right
+from typing import Optional
+from typing import Union
+
+import torch
+import torch.nn.functional as F
+from torch import nn
+
+logger = logging.getLogger()
+
+__all__ = ["build_gate", "ClassifierGate", "FrameGate", "StatsGate"]
+
+
+# MARK: - FrameGate
+
+class FrameGate(metaclass=ABCMeta):
+    """Frame Gate maps a score per frame (higher = more degraded) to a route:
+    `0` (pass-through), `1` (light model) or `2` (full model), with
+    hysteresis so a video does not flicker between routes:
+        - The score must pass a threshold by `hysteresis` to change route.
+        - Moving to a heavier route is immediate (do not under-enhance).
+          Moving to a lighter route needs `min_dwell` consecutive frames
+          asking for it.
+
+    Frames are assumed to come from one stream, in order. Subclasses
+    implement `score()`.
+
+    Attributes:
+        thresholds (list[float]):
+            The scores from which a frame goes to the light model and to the
+            full model. Default: `[0.5, 0.5]` (no light route).
+        hysteresis (float):
+            The margin around the thresholds. Default: `0.0`.
+        min_dwell (int):
+            Number of consecutive frames before moving to a lighter route.
+            Default: `1`.
+        costs (list[float]):
+            The relative compute cost of each route, used to report the
+            compute saved. Default: `[0.0, 0.3, 1.0]`.
+        log_every_n (int):
+            Log the routing stats every n frames. `0` to disable.
+            Default: `1000`.
+        route (int):
+            The current route.
+        counts (list[int]):
+            Number of frames sent to each route.
+    """
+
+    route_names = ["pass-through", "light", "full"]
+
+    # MARK: Magic Functions
+
+    def __init__(
+        self,
+        thresholds : Optional[list[float]] = None,
+        hysteresis : float                 = 0.0,
+        min_dwell  : int                   = 1,
+        costs      : Optional[list[float]] = None,
+        log_every_n: int                   = 1000,
+        *args, **kwargs
+    ):
+        self.thresholds  = list(thresholds or [0.5, 0.5])
+        self.hysteresis  = hysteresis
+        self.min_dwell   = max(min_dwell, 1)
+        self.costs       = list(costs or [0.0, 0.3, 1.0])
+        self.log_every_n = log_every_n
+        assert len(self.thresholds) == 2 and \
+            self.thresholds[0] <= self.thresholds[1], \
+            f"`thresholds` must be [light, full] in increasing order. " \
+            f"But got: {self.thresholds}."
+        self.reset()
+
+    # MARK: Configure
+
+    def reset(self):
+        """Start a new stream: full route, and clear the stats."""
+        self.route     = 2
+        self.pending   = 0
+        self.num_seen  = 0
+        self.counts    = [0, 0, 0]
+        self.switches  = 0
+
+    # MARK: Score
+
+    @abstractmethod
+    def score(self, x: torch.Tensor) -> torch.Tensor:
+        """Return the score of each frame [B] of `x` [B, C, H, W]."""
+        pass
+
+    # MARK: Route
+
+    def level(self, score: float) -> int:
+        """Return the route of a score without hysteresis."""
+        return bisect_right(self.thresholds, score)
+
+    def __call__(
+        self, x: torch.Tensor, has_light: bool = True
+    ) -> torch.Tensor:
+        """Return the route of each frame [B] of `x`.
+
+        Args:
+            x (torch.Tensor):
+                The input frames [B, C, H, W].
+            has_light (bool):
+                If `False`, frames routed to the light model go to the full
+                model. Default: `True`.
+        """
+        with torch.no_grad():
+            scores = self.score(x).float().cpu().tolist()
+        routes = [self.step(s, has_light=has_light) for s in scores]
+        return torch.as_tensor(routes, dtype=torch.long)
+
+    def step(self, score: float, has_light: bool = True) -> int:
+        """Update the state with the score of the next frame and return its
+        route.
+        """
+        up     = self.level(score - self.hysteresis)
+        down   = self.level(score + self.hysteresis)
+        target = self.route
+        if up > self.route:
+            target = up
+        elif down < self.route:
+            target = down
+        if not has_light and target == 1:
+            target = 2
+
+        if target > self.route:
+            self.pending = 0
+            self.switch(target, score)
+        elif target < self.route:
+            self.pending += 1
+            if self.pending >= self.min_dwell:
+                self.pending = 0
+                self.switch(target, score)
+        else:
+            self.pending = 0
+
+        self.num_seen           += 1
+        self.counts[self.route] += 1
+        if self.log_every_n and self.num_seen % self.log_every_n == 0:
+            self.log_stats()
+        return self.route
+
+    def switch(self, route: int, score: float):
+        """Change the current route and log the decision."""
+        logger.info(f"Gate: frame {self.num_seen}: "
+                    f"{self.route_names[self.route]} -> "
+                    f"{self.route_names[route]} (score={score:.4f}).")
+        self.route     = route
+        self.switches += 1
+
+    # MARK: Stats
+
+    def stats(self) -> dict:
+        """Return the number of frames per route, the number of switches,
+        and the fraction of the full model's compute saved.
+        """
+        n    = max(self.num_seen, 1)
+        cost = sum(c * k for c, k in zip(self.costs, self.counts))
+        return {
+            "frames"       : self.num_seen,
+            "counts"       : dict(zip(self.route_names, self.counts)),
+            "switches"     : self.switches,
+            "compute_saved": 1.0 - cost / (n * self.costs[-1]),
+        }
+
+    def log_stats(self):
+        """Log the routing stats."""
+        stats  = self.stats()
+        counts = ", ".join(f"{k}: {v}" for k, v in stats["counts"].items())
+        logger.info(f"Gate: {stats['frames']} frames ({counts}), "
+                    f"{stats['switches']} switches, "
+                    f"{100.0 * stats['compute_saved']:.1f}% compute saved.")
+
+
+# MARK: - StatsGate
+
+class StatsGate(FrameGate):
+    """Stats Gate scores frames with cheap image statistics, computed on the
+    device on a downscaled grayscale copy:
+        - `laplacian`: the mean absolute Laplacian (high-frequency energy:
+          rain streaks, snow, noise).
+        - `darkness`: 1 - the mean luminance (low light).
+        - `haze`: 1 - the standard deviation of the luminance (fog and haze
+          lower the contrast).
+
+    The frames are expected in OpenCV's BGR channel order, as `Inference`
+    feeds them (`preprocess()` only converts them to tensors).
+
+    Attributes:
+        metric (str):
+            One of: [`laplacian`, `darkness`, `haze`]. Default: `laplacian`.
+        size (int):
+            The longest side of the downscaled copy. Default: `128`.
+    """
+
+    metrics = ["laplacian", "darkness", "haze"]
+
+    # MARK: Magic Functions
+
+    def __init__(self, metric: str = "laplacian", size: int = 128, **kwargs):
+        super().__init__(**kwargs)
+        assert metric in self.metrics, \
+            f"`metric` must be one of: {self.metrics}. But got: {metric}."
+        self.metric = metric
+        self.size   = size
+        self.kernel = torch.tensor(
+            [[0.0, 1.0, 0.0], [1.0, -4.0, 1.0], [0.0, 1.0, 0.0]]
+        ).view(1, 1, 3, 3)
+
+    # MARK: Score
+
+    def score(self, x: torch.Tensor) -> torch.Tensor:
+        h, w  = x.shape[-2:]
+        scale = self.size / max(h, w)
+        if scale < 1.0:
+            x = F.interpolate(x, scale_factor=scale, mode="area",
+                              recompute_scale_factor=False)
+        # NOTE: BGR luminance (Rec. 601)
+        gray = (x[:, 0:1] * 0.114 + x[:, 1:2] * 0.587 + x[:, 2:3] * 0.299
+                if x.shape[1] >= 3 else x[:, 0:1])
+
+        if self.metric == "laplacian":
+            kernel = self.kernel.to(device=gray.device, dtype=gray.dtype)
+            return F.conv2d(gray, kernel).abs().mean(dim=(1, 2, 3))
+        if self.metric == "darkness":
+            return 1.0 - gray.mean(dim=(1, 2, 3))
+        return 1.0 - gray.flatten(1).std(dim=1)
+
+
+# MARK: - ClassifierGate
+
+class ClassifierGate(FrameGate):
+    """Classifier Gate scores frames with a tiny classifier returning one
+    logit per frame (for example: rain vs. clean), mapped to [0, 1] with a
+    sigmoid.
+
+    Attributes:
+        classifier (nn.Module):
+            The classifier. It is called with the frames downscaled so their
+            longest side is `size`.
+        size (int):
+            The longest side of the classifier's input. Default: `128`.
+    """
+
+    # MARK: Magic Functions
+
+    def __init__(self, classifier: nn.Module, size: int = 128, **kwargs):
+        super().__init__(**kwargs)
+        self.classifier = classifier.eval()
+        self.size       = size
+
+    # MARK: Score
+
+    def score(self, x: torch.Tensor) -> torch.Tensor:
+        h, w  = x.shape[-2:]
+        scale = self.size / max(h, w)
+        if scale < 1.0:
+            x = F.interpolate(x, scale_factor=scale, mode="area",
+                              recompute_scale_factor=False)
+        logits = self.classifier(x)
+        return torch.sigmoid(logits.reshape(x.shape[0], -1)[:, 0])
+
+
+# MARK: - Builder
+
+def build_gate(gate: Union[FrameGate, dict, None]) -> Optional[FrameGate]:
+    """Build a gate from a config dict: {"name": "stats", ...} (the other
+    keys are the `StatsGate` arguments). A `FrameGate` is returned as is.
+    """
+    if gate is None or isinstance(gate, FrameGate):
+        return gate
+    gate = dict(gate)
+    name = gate.pop("name", "stats")
+    if name != "stats":
+        raise ValueError(f"Only `stats` gates can be built from a config. "
+                         f"Pass a `ClassifierGate` object instead. "
+                         f"But got: {name}.")
+    return StatsGate(**gate)
@@ -8,6 +8,9 @@ from __future__ import annotations
 
 import logging
 import os
+import threading
+from contextlib import nullcontext
+from queue import Queue
 from typing import Any
 from typing import Optional
 from typing import Union
@@ -15,12 +18,14 @@ from typing import Union
 import cv2
 import numpy as np
 import torch
+import torch.nn.functional as F
 import torchvision
 from pytorch_lightning.utilities import rank_zero_warn
 from tqdm import tqdm
 
 from torchkit.core.fileio import create_dirs
 from torchkit.core.image import FrameLoader
+from torchkit.core.image import guided_upsample
 from torchkit.core.image import ImageWriter
 from torchkit.core.image import reshape_image
 from torchkit.core.image import resize_image
@@ -29,6 +34,10 @@ from torchkit.core.utils import Arrays
 from torchkit.core.utils import select_device
 from torchkit.core.utils import Tensors
 from torchkit.core.utils import to_4d_array
+from .gating import build_gate
+from .gating import ClassifierGate
+from .gating import FrameGate
+from .telemetry import Telemetry
 from .utils import get_next_version
 
 logger = logging.getLogger()
@@ -48,6 +57,11 @@ class Inference:
             The output directory to save predicted images.
         model (nn.Module):
             The model to run.
+        post_model (nn.Module, list[nn.Module], optional):
+            The post-processing model, or a list of models run in cascade
+            after `model`.
+        light_model (nn.Module, optional):
+            The cheap model the gate routes lightly degraded frames to.
         data (str):
             The data source. Can be a path or pattern to image/video/directory.
         data_loader (Any):
@@ -64,6 +78,31 @@ class Inference:
             Verbosity mode. Default: `False`.
         save_image (bool):
             Save predicted images. Default: `False`.
+        pipelined (bool):
+            Run each stage of a multi-model cascade in its own worker thread
+            (and CUDA stream), so batch k+1 enters stage 1 while batch k is in
+            stage 2. Default: `False`.
+        queue_size (int):
+            The maximum number of batches waiting between two pipeline stages.
+            Default: `2`.
+        gate (FrameGate, dict, optional):
+            The gate routing each frame to pass-through, `light_model` or the
+            full cascade. A dict builds a `StatsGate`. Gating runs the
+            non-pipelined loop. Default: `None`.
+        guided_upsample (dict, optional):
+            If given, the model runs on a copy of each frame downscaled to fit
+            `shape` (a multiple of `multiple`, keeping the aspect ratio), and
+            the enhancement is transferred to the full-resolution frame with a
+            fast guided filter (`radius`, `eps`) on the device. The output
+            keeps the input resolution. It runs the non-pipelined loop.
+            Default: `None`.
+        telemetry (dict, optional):
+            If given, the `Telemetry` arguments. The wall time of each stage
+            (`decode`, `preprocess`, `forward`, `post_model`, `postprocess`,
+            `show`, `write`), the pipeline's queue depths and the frame
+            counters are logged as JSON lines and served as Prometheus text.
+            Frames the loader cannot decode are dropped and counted.
+            Default: `None`.
     """
 
     # MARK: Magic Functions
@@ -71,12 +110,17 @@ class Inference:
     def __init__(
         self,
         default_root_dir: str,
-        version         : Union[int, str, None] = None,
-        shape           : Optional[tuple]       = None,
-        batch_size      : int                   = 1,
-        device          : Union[int, str, None] = 0,
-        verbose         : bool                  = True,
-        save_image      : bool                  = False,
+        version         : Union[int, str, None]        = None,
+        shape           : Optional[tuple]              = None,
+        batch_size      : int                          = 1,
+        device          : Union[int, str, None]        = 0,
+        verbose         : bool                         = True,
+        save_image      : bool                         = False,
+        pipelined       : bool                         = False,
+        queue_size      : int                          = 2,
+        gate            : Union[FrameGate, dict, None] = None,
+        guided_upsample : Optional[dict]               = None,
+        telemetry       : Optional[dict]               = None,
         *args, **kwargs
     ):
         super().__init__()
@@ -86,13 +130,33 @@ class Inference:
         self.device           = select_device(device=device)
         self.verbose          = verbose
         self.save_image       = save_image
+        self.pipelined        = pipelined
+        self.queue_size       = queue_size
+        self.gate             = build_gate(gate)
+        self.guided_upsample  = guided_upsample
+        self.telemetry        = Telemetry(**telemetry) if telemetry else None
         self.model            = None
         self.post_model       = None
+        self.light_model      = None
         self.data             = None
         self.data_loader      = None
         self.image_writer     = None
         
         self.init_output_dir(version=version)
+    
+    # MARK: Properties
+    
+    @property
+    def stages(self) -> list:
+        """Return the list of models run in cascade: `model` followed by
+        `post_model`(s).
+        """
+        stages = [self.model]
+        if isinstance(self.post_model, (list, tuple)):
+            stages += [m for m in self.post_model if m is not None]
+        elif self.post_model is not None:
+            stages.append(self.post_model)
+        return stages
         
     # MARK: Configure
     
@@ -139,7 +203,13 @@ class Inference:
         
     # MARK: Run
     
-    def run(self, model: Any, data: str, post_model: Any = None):
+    def run(
+        self,
+        model      : Any,
+        data       : str,
+        post_model : Any = None,
+        light_model: Any = None,
+    ):
         """Main prediction loop.
         
         Args:
@@ -148,41 +218,309 @@ class Inference:
             data (str):
                 The data source. Can be a path or pattern to
                 image/video/directory.
-            post_model (nn.Module):
-                The post-processing model.
+            post_model (nn.Module, list[nn.Module], optional):
+                The post-processing model, or a list of models run in cascade
+                after `model`.
+            light_model (nn.Module, optional):
+                The cheap model the gate routes lightly degraded frames to.
+                If `None`, these frames go to the full cascade.
         """
-        self.model      = model
-        self.post_model = post_model
-        self.data       = data
+        self.model       = model
+        self.post_model  = post_model
+        self.light_model = light_model
+        self.data        = data
         
         self.run_routine_start()
         
+        if self.pipelined and len(self.stages) > 1 and self.gate is None \
+            and self.guided_upsample is None:
+            self.run_pipeline()
+            self.run_routine_end()
+            return
+        
         # NOTE: Mains loop
         pbar = tqdm(total=len(self.data_loader), desc=f"{self.model.fullname}")
-        for batch_idx, batch in enumerate(self.data_loader):
+        iterator = iter(self.data_loader)
+        while True:
+            with self.timed("decode"):
+                batch = next(iterator, None)
+            if batch is None:
+                break
             images, indexes, files, rel_paths = batch
+            images = self.drop_invalid(images)
+            if len(images) == 0:
+                pbar.update(1)
+                continue
             
-            x       = self.preprocess(images)
-            y_hat   = self.model.forward(x=x)
-            results = self.model.prepare_results(x=x, y_hat=y_hat)
-            if self.post_model:
-                # results = results[0]
-                results = self.post_model.forward(x=results)
-                results = self.model.prepare_results(x=x, y_hat=results)
-                
-            results = self.postprocess(results)
+            with self.timed("preprocess"):
+                x = self.preprocess(images)
+            results = (self.forward_guided(x) if self.guided_upsample
+                       else self.forward_routed(x))
+            with self.timed("postprocess"):
+                results = self.postprocess(results)
             
-            if self.verbose:
-                self.show_results(results=results, images=images)
-            if self.save_image:
-                self.image_writer.write_images(
-                    images=results, # image_files=rel_paths
-                )
-           
+            self.write_results(results=results, images=images)
+            self.count_batch(len(images))
             pbar.update(1)
         
         self.run_routine_end()
+    
+    def run_pipeline(self):
+        """Pipelined prediction loop. Each stage of the cascade runs in its own
+        thread (and CUDA stream), connected by bounded queues. Loading runs in
+        the calling thread and postprocessing/writing in a dedicated thread,
+        so the cascade's throughput is bounded by the slowest stage instead of
+        the sum of all stages. Intermediate results stay on the device.
+        """
+        num_stages = len(self.stages)
+        queues     = [Queue(maxsize=self.queue_size)
+                      for _ in range(num_stages + 1)]
+        errors     = []
+        workers    = [
+            threading.Thread(
+                target = self.run_stage_worker,
+                args   = (stage, "forward" if i == 0 else "post_model",
+                          queues[i], queues[i + 1], errors),
+                daemon = True
+            )
+            for i, stage in enumerate(self.stages)
+        ]
+        writer     = threading.Thread(
+            target = self.run_writer_worker,
+            args   = (queues[-1], errors),
+            daemon = True
+        )
+        if self.telemetry is not None:
+            names = ["forward"] + [f"post_model_{i}" for i in
+                                   range(1, num_stages)] + ["postprocess"]
+            for name, queue in zip(names, queues):
+                self.telemetry.add_queue(name, queue.qsize)
+        for worker in workers + [writer]:
+            worker.start()
+        
+        pbar = tqdm(total=len(self.data_loader), desc=f"{self.model.fullname}")
+        iterator = iter(self.data_loader)
+        try:
+            while not errors:
+                with self.timed("decode"):
+                    batch = next(iterator, None)
+                if batch is None:
+                    break
+                images, indexes, files, rel_paths = batch
+                images = self.drop_invalid(images)
+                if len(images) == 0:
+                    pbar.update(1)
+                    continue
+                with self.timed("preprocess"):
+                    x = self.preprocess(images)
+                queues[0].put((images, x, self.record_event()))
+                pbar.update(1)
+        finally:
+            queues[0].put(None)
+            for worker in workers + [writer]:
+                worker.join()
+        
+        if errors:
+            raise errors[0]
+    
+    def run_stage_worker(
+        self,
+        stage    : Any,
+        name     : str,
+        in_queue : Queue,
+        out_queue: Queue,
+        errors   : list
+    ):
+        """Run one stage of the pipeline until the `None` sentinel arrives.
+        
+        Args:
+            stage (nn.Module):
+                The model of this stage.
+            name (str):
+                The stage name in the telemetry.
+            in_queue (Queue):
+                The queue of (images, x, event) from the previous stage.
+            out_queue (Queue):
+                The queue to the next stage.
+            errors (list):
+                The shared list collecting the workers' exceptions.
+        """
+        stream = torch.cuda.Stream(device=self.device) \
+            if self.device.type == "cuda" else None
+        while True:
+            item = in_queue.get()
+            if item is None:
+                break
+            images, x, event = item
+            if errors:
+                self.count_dropped(len(images))
+                continue  # NOTE: Drain until the sentinel
+            try:
+                with torch.cuda.stream(stream) if stream else nullcontext():
+                    if event is not None:
+                        torch.cuda.current_stream().wait_event(event)
+                    if stream and torch.is_tensor(x):
+                        x.record_stream(stream)
+                    results = self.forward_stage(stage=stage, x=x, name=name)
+                    event   = self.record_event()
+                out_queue.put((images, results, event))
+            except Exception as err:
+                self.count_dropped(len(images))
+                errors.append(err)
+        out_queue.put(None)
+    
+    def run_writer_worker(self, in_queue: Queue, errors: list):
+        """Postprocess and write the results of the last stage until the
+        `None` sentinel arrives.
+        """
+        while True:
+            item = in_queue.get()
+            if item is None:
+                break
+            images, results, event = item
+            if errors:
+                self.count_dropped(len(images))
+                continue
+            try:
+                if event is not None:
+                    event.synchronize()
+                with self.timed("postprocess"):
+                    results = self.postprocess(results)
+                self.write_results(results=results, images=images)
+                self.count_batch(len(images))
+            except Exception as err:
+                self.count_dropped(len(images))
+                errors.append(err)
         
+    def forward_routed(self, x: torch.Tensor) -> Tensors:
+        """Run the gate if any, else the full cascade."""
+        if self.gate is not None:
+            return self.forward_gated(x)
+        return self.forward_cascade(x)
+    
+    def forward_guided(self, x: torch.Tensor) -> torch.Tensor:
+        """Run the models on a downscaled copy of `x` and transfer the
+        enhancement to `x` with a fast guided filter.
+        """
+        cfg      = self.guided_upsample
+        multiple = cfg.get("multiple", 8)
+        h, w     = x.shape[-2:]
+        scale    = (min(self.shape[0] / h, self.shape[1] / w, 1.0)
+                    if self.shape else 1.0)
+        size     = [max(round(h * scale / multiple), 1) * multiple,
+                    max(round(w * scale / multiple), 1) * multiple]
+        x_lr     = F.interpolate(x, size=size, mode="area")
+        y_lr     = self.forward_routed(x_lr)
+        if isinstance(y_lr, (list, tuple)):
+            y_lr = y_lr[0]
+        with self.timed("upsample", sync=True):
+            y_hr = guided_upsample(
+                x_lr   = x_lr,
+                y_lr   = y_lr,
+                x_hr   = x,
+                radius = cfg.get("radius", 2),
+                eps    = cfg.get("eps", 1e-3),
+            )
+        return y_hr.clamp(0.0, 1.0)
+    
+    def forward_cascade(self, x: torch.Tensor) -> Tensors:
+        """Run all models of the cascade."""
+        results = x
+        for i, stage in enumerate(self.stages):
+            name    = "forward" if i == 0 else "post_model"
+            results = self.forward_stage(stage=stage, x=results, name=name)
+        return results
+    
+    def forward_gated(self, x: torch.Tensor) -> torch.Tensor:
+        """Route each frame with the gate: pass-through (the input is
+        returned), `light_model`, or the full cascade.
+        """
+        routes = self.gate(x, has_light=self.light_model is not None)
+        if bool((routes == 2).all()):
+            return self.forward_cascade(x)
+        
+        results = x.clone()
+        for route in [1, 2]:
+            index = torch.nonzero(routes == route, as_tuple=True)[0]
+            if len(index) == 0:
+                continue
+            index = index.to(x.device)
+            if route == 1:
+                y = self.forward_stage(stage=self.light_model, x=x[index])
+            else:
+                y = self.forward_cascade(x[index])
+            results[index] = y.to(results.dtype)
+        return results
+    
+    def forward_stage(
+        self, stage: Any, x: torch.Tensor, name: str = "forward"
+    ) -> Tensors:
+        """Run one model of the cascade and prepare its results as the input
+        of the next stage. `name` is the stage name in the telemetry.
+        """
+        with self.timed(name, sync=True), torch.no_grad():
+            y_hat = stage.forward(x=x)
+            return stage.prepare_results(x=x, y_hat=y_hat)
+    
+    def write_results(self, results: np.ndarray, images: np.ndarray):
+        """Show and/or write the postprocessed results."""
+        if self.verbose:
+            with self.timed("show"):
+                self.show_results(results=results, images=images)
+        if self.save_image:
+            with self.timed("write"):
+                self.image_writer.write_images(
+                    images=results, # image_files=rel_paths
+                )
+    
+    def record_event(self) -> Optional[torch.cuda.Event]:
+        """Record a CUDA event on the current stream so that the next stage
+        can wait for the tensors to be ready without a host sync.
+        """
+        if self.device.type != "cuda":
+            return None
+        event = torch.cuda.Event()
+        event.record(torch.cuda.current_stream(self.device))
+        return event
+    
+    # MARK: Telemetry
+    
+    def timed(self, name: str, sync: bool = False):
+        """Return a context timing stage `name` in the telemetry, or a no-op
+        context if the telemetry is disabled. If `sync`, the current CUDA
+        stream is synchronized before and after.
+        """
+        if self.telemetry is None:
+            return nullcontext()
+        return self.telemetry.stage(
+            name, sync=self.synchronize if sync else None
+        )
+    
+    def synchronize(self):
+        """Wait for the work queued on the current CUDA stream."""
+        if self.device.type == "cuda":
+            torch.cuda.current_stream(self.device).synchronize()
+    
+    def drop_invalid(self, images: Arrays) -> Arrays:
+        """Drop the frames the loader could not decode (`None`)."""
+        if all(image is not None for image in images):
+            return images
+        valid = [image for image in images if image is not None]
+        self.count_dropped(len(images) - len(valid))
+        return valid
+    
+    def count_dropped(self, num_frames: int):
+        """Count frames that were not processed."""
+        if self.telemetry is not None:
+            self.telemetry.count("frames_dropped", num_frames)
+    
+    def count_batch(self, num_frames: int):
+        """Count a processed batch and log the telemetry if it is due."""
+        if self.telemetry is not None:
+            self.telemetry.count("frames", num_frames)
+            self.telemetry.count("batches")
+            self.telemetry.maybe_log()
+    
     def run_routine_start(self):
         """When run routine starts we build the `output_dir` on the fly.
         """
@@ -193,9 +531,25 @@ class Inference:
 
         self.model.to(self.device)
         self.model.eval()
-        if self.post_model:
-            self.post_model.to(self.device)
-            self.post_model.eval()
+        if getattr(self.model, "compile_cfg", None):
+            self.model.compile_model(device=self.device)
+        for stage in self.stages[1:]:
+            stage.to(self.device)
+            stage.eval()
+            if getattr(stage, "compile_cfg", None):
+                stage.compile_model(device=self.device)
+        
+        if self.telemetry is not None:
+            self.telemetry.reset()
+            self.telemetry.start_endpoint()
+        
+        if self.gate is not None:
+            self.gate.reset()
+            if isinstance(self.gate, ClassifierGate):
+                self.gate.classifier.to(self.device)
+            if self.light_model is not None:
+                self.light_model.to(self.device)
+                self.light_model.eval()
         
         if self.verbose:
             cv2.namedWindow("results", cv2.WINDOW_KEEPRATIO)
@@ -205,6 +559,12 @@ class Inference:
         """
         self.model.train()
         
+        if self.gate is not None:
+            self.gate.log_stats()
+        if self.telemetry is not None:
+            self.telemetry.log()
+            self.telemetry.stop_endpoint()
+        
         if self.verbose:
             cv2.destroyAllWindows()
 
@@ -220,7 +580,7 @@ class Inference:
         	    The input tensor as  [B, C H, W].
         """
         x = images
-        if self.shape:
+        if self.shape and not self.guided_upsample:
             x = [resize_image(image, self.shape)[0] for image in x]
         x = [torchvision.transforms.ToTensor()(image) for image in x]
         x = torch.stack(x)
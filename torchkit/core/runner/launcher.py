@@ -0,0 +1,382 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Sharded, resumable multi-process batch inference over large directories.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing as mp
+import os
+import time
+from typing import Callable
+from typing import Optional
+from typing import Union
+
+import cv2
+import torch
+from tqdm import tqdm
+
+from torchkit.core.fileio import create_dirs
+from torchkit.core.image import ImageLoader
+from torchkit.core.image import scan_image_files
+from .inference import Inference
+from .utils import get_next_version
+
+logger = logging.getLogger()
+
+
+# MARK: - ShardedInference
+
+# noinspection PyMethodMayBeStatic
+class ShardedInference:
+    """Sharded Inference splits the image files of a (large) directory across
+    `num_workers` processes. Each worker is pinned to its own CPU set, uses its
+    own intra-op thread count, builds its own model, and writes the results
+    under `output_dir` keeping the relative paths of the inputs.
+
+    Every written file is appended to the worker's manifest
+    (`output_dir/.manifest/shard_<rank>.txt`). When running again with the
+    same `version`, the files listed in the manifests are skipped, so an
+    interrupted run resumes where it stopped.
+
+    Attributes:
+        default_root_dir (str):
+            The root dir to save predicted data.
+        output_dir (str):
+            The output directory to save predicted images.
+        num_workers (int):
+            The number of worker processes (shards).
+        num_threads (int, optional):
+            The number of intra-op threads per worker. If `None`, the CPU
+            cores are divided evenly among the workers.
+        cpu_sets (list, optional):
+            The list of CPU sets (one per worker). If `None` and
+            `pin_cpus=True`, the available cores are split into contiguous
+            chunks.
+        pin_cpus (bool):
+            Pin each worker to its CPU set. Only on platforms supporting
+            `os.sched_setaffinity()`.
+        shape (tuple, optional):
+            The input and output shape of the image as [H, W, C]. If `None`,
+            use the input image shape.
+        batch_size (int):
+            The batch size of each worker.
+        device (int, str, optional):
+            The device of the workers. Can be a list with one device per
+            worker.
+        resume (bool):
+            Skip the files already listed in the manifests.
+        extension (str):
+            The output image extension. If `None`, keep the input extension.
+    """
+
+    # MARK: Magic Functions
+
+    def __init__(
+        self,
+        default_root_dir: str,
+        num_workers     : int                        = 2,
+        num_threads     : Optional[int]              = None,
+        cpu_sets        : Optional[list]             = None,
+        pin_cpus        : bool                       = True,
+        version         : Union[int, str, None]      = None,
+        shape           : Optional[tuple]            = None,
+        batch_size      : int                        = 1,
+        device          : Union[int, str, list, None] = "cpu",
+        resume          : bool                       = True,
+        extension       : Optional[str]              = None,
+        *args, **kwargs
+    ):
+        super().__init__()
+        self.default_root_dir = default_root_dir
+        self.num_workers      = num_workers
+        self.num_threads      = num_threads
+        self.cpu_sets         = cpu_sets
+        self.pin_cpus         = pin_cpus
+        self.shape            = shape
+        self.batch_size       = batch_size
+        self.device           = device
+        self.resume           = resume
+        self.extension        = extension
+
+        self.init_output_dir(version=version)
+
+    # MARK: Properties
+
+    @property
+    def manifest_dir(self) -> str:
+        """Return the directory containing the workers' manifests."""
+        return os.path.join(self.output_dir, ".manifest")
+
+    # MARK: Configure
+
+    def init_output_dir(self, version: Union[int, str, None] = None):
+        """Configure output directory base on the given version. To resume a
+        run, pass the same `version` again.
+
+        Args:
+            version (int, str, optional):
+                The experiment version. If version is not specified the logger
+                inspects the save directory for existing versions, then
+                automatically assigns the next available version. If it is a
+                string then it is used as the run-specific subdirectory name,
+                otherwise `version_${version}` is used.
+        """
+        if version is None:
+            version = get_next_version(root_dir=self.default_root_dir)
+        if isinstance(version, int):
+            version = f"version_{version}"
+        version = version.lower()
+
+        self.output_dir = os.path.join(self.default_root_dir, version)
+        logger.info(f"Output directory at: {self.output_dir}.")
+
+    def init_cpu_sets(self) -> list:
+        """Split the available CPU cores into one contiguous set per worker.
+
+        Returns:
+            cpu_sets (list):
+                The list of CPU sets. `None` for each worker if pinning is not
+                supported or disabled.
+        """
+        if self.cpu_sets is not None:
+            assert len(self.cpu_sets) == self.num_workers, \
+                f"Expect {self.num_workers} CPU sets. " \
+                f"But got: {len(self.cpu_sets)}."
+            return [list(cpus) for cpus in self.cpu_sets]
+        if not self.pin_cpus or not hasattr(os, "sched_setaffinity"):
+            return [None] * self.num_workers
+
+        cpus  = sorted(os.sched_getaffinity(0))
+        chunk = max(len(cpus) // self.num_workers, 1)
+        return [
+            cpus[(i * chunk) % len(cpus):(i * chunk) % len(cpus) + chunk]
+            for i in range(self.num_workers)
+        ]
+
+    def load_manifests(self) -> set:
+        """Load the relative paths of all already written files.
+
+        Returns:
+            done (set):
+                The set of relative paths of the written inputs.
+        """
+        done = set()
+        if not os.path.isdir(self.manifest_dir):
+            return done
+        for entry in os.scandir(self.manifest_dir):
+            if not entry.name.endswith(".txt"):
+                continue
+            with open(entry.path, "r") as f:
+                done.update(line.rstrip("\n") for line in f if line.strip())
+        return done
+
+    def init_shards(self, data: str) -> tuple[list, int]:
+        """Scan `data`, skip the files listed in the manifests and split the
+        rest into `num_workers` shards.
+
+        Args:
+            data (str):
+                The directory of images.
+
+        Returns:
+            shards (list):
+                The list of file lists, one per worker.
+            num_skipped (int):
+                The number of files skipped.
+        """
+        done  = self.load_manifests() if self.resume else set()
+        files = []
+        num_skipped = 0
+        for file in scan_image_files(root=data):
+            if os.path.relpath(file, data) in done:
+                num_skipped += 1
+            else:
+                files.append(file)
+        shards = [files[i::self.num_workers] for i in range(self.num_workers)]
+        return shards, num_skipped
+
+    # MARK: Run
+
+    def run(self, model_fn: Callable, data: str):
+        """Main prediction loop.
+
+        Args:
+            model_fn (Callable):
+                A picklable function (or `functools.partial`) returning the
+                model. It is called once in each worker so that no model
+                weights are sent between processes.
+            data (str):
+                The directory of images.
+        """
+        assert os.path.isdir(data), f"Invalid data directory: {data}."
+        create_dirs(paths=[self.output_dir, self.manifest_dir])
+
+        shards, num_skipped = self.init_shards(data=data)
+        total    = sum(len(s) for s in shards)
+        cpu_sets = self.init_cpu_sets()
+        devices  = self.device if isinstance(self.device, (list, tuple)) \
+            else [self.device] * self.num_workers
+        if num_skipped > 0:
+            logger.info(f"Resume: skip {num_skipped} already written files.")
+        if total == 0:
+            logger.info(f"Nothing to process in: {data}.")
+            return
+
+        ctx      = mp.get_context("spawn")
+        progress = ctx.Queue()
+        workers  = []
+        for rank, files in enumerate(shards):
+            if len(files) == 0:
+                continue
+            num_threads = self.num_threads
+            if num_threads is None:
+                num_threads = len(cpu_sets[rank]) if cpu_sets[rank] \
+                    else max((os.cpu_count() or 1) // self.num_workers, 1)
+            worker = ctx.Process(
+                target = run_shard,
+                kwargs = dict(
+                    rank        = rank,
+                    model_fn    = model_fn,
+                    files       = files,
+                    data        = data,
+                    output_dir  = self.output_dir,
+                    manifest    = os.path.join(
+                        self.manifest_dir, f"shard_{rank}.txt"
+                    ),
+                    cpus        = cpu_sets[rank],
+                    num_threads = num_threads,
+                    shape       = self.shape,
+                    batch_size  = self.batch_size,
+                    device      = devices[rank],
+                    extension   = self.extension,
+                    progress    = progress,
+                ),
+                daemon = True,
+            )
+            worker.start()
+            workers.append(worker)
+
+        self.monitor(workers=workers, progress=progress, total=total)
+
+    def monitor(self, workers: list, progress: mp.Queue, total: int):
+        """Aggregate the progress and throughput of all workers.
+
+        Args:
+            workers (list):
+                The worker processes.
+            progress (mp.Queue):
+                The queue the workers report to. Each message is
+                (rank, num_done), or (rank, None) when the worker finishes.
+            total (int):
+                The total number of files to process.
+        """
+        start   = time.time()
+        running = len(workers)
+        done    = 0
+        pbar    = tqdm(total=total, desc="Sharded inference")
+        while running > 0:
+            try:
+                rank, num_done = progress.get(timeout=1.0)
+            except Exception:
+                if not any(w.is_alive() for w in workers):
+                    break
+                continue
+            if num_done is None:
+                running -= 1
+                continue
+            done += num_done
+            pbar.update(num_done)
+            pbar.set_postfix(fps=f"{done / max(time.time() - start, 1e-6):.2f}")
+        pbar.close()
+
+        for worker in workers:
+            worker.join()
+        failed = [w for w in workers if w.exitcode != 0]
+        logger.info(f"Processed {done}/{total} files in "
+                    f"{time.time() - start:.2f}s with {len(workers)} workers.")
+        if len(failed) > 0:
+            logger.error(f"{len(failed)} worker(s) failed. Run again with the "
+                         f"same version to resume.")
+
+
+# MARK: - Worker
+
+def run_shard(
+    rank       : int,
+    model_fn   : Callable,
+    files      : list[str],
+    data       : str,
+    output_dir : str,
+    manifest   : str,
+    cpus       : Optional[list],
+    num_threads: int,
+    shape      : Optional[tuple],
+    batch_size : int,
+    device     : Union[int, str, None],
+    extension  : Optional[str],
+    progress   : mp.Queue,
+):
+    """Run inference on one shard of files. It is the entry point of each
+    worker process of `ShardedInference`.
+    """
+    try:
+        if cpus:
+            os.sched_setaffinity(0, cpus)
+        torch.set_num_threads(num_threads)
+        cv2.setNumThreads(1)
+
+        inference = Inference(
+            default_root_dir = os.path.dirname(output_dir),
+            version          = os.path.basename(output_dir),
+            shape            = shape,
+            batch_size       = batch_size,
+            device           = device,
+            verbose          = False,
+        )
+        model = model_fn()
+        model.to(inference.device)
+        model.eval()
+        if getattr(model, "compile_cfg", None) and shape:
+            model.compile_model(
+                buckets = [(batch_size, shape[2], shape[0], shape[1])],
+                device  = inference.device
+            )
+
+        loader = ImageLoader(data=files, batch_size=batch_size)
+        with open(manifest, "a") as f, torch.no_grad():
+            for images, indexes, batch_files, _ in loader:
+                x       = inference.preprocess(images)
+                y_hat   = model.forward(x=x)
+                results = model.prepare_results(x=x, y_hat=y_hat)
+                results = inference.postprocess(results)
+
+                for result, file in zip(results, batch_files):
+                    rel_path = os.path.relpath(file, data)
+                    write_result(
+                        image     = result,
+                        path      = os.path.join(output_dir, rel_path),
+                        extension = extension,
+                    )
+                    f.write(f"{rel_path}\n")
+                f.flush()
+                os.fsync(f.fileno())
+                progress.put((rank, len(batch_files)))
+    finally:
+        progress.put((rank, None))
+
+
+def write_result(image, path: str, extension: Optional[str] = None):
+    """Write an image atomically: first to a temp file, then rename it, so an
+    interrupted worker never leaves a truncated output behind.
+    """
+    stem, ext = os.path.splitext(path)
+    ext       = extension or ext
+    path      = f"{stem}{ext}"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp       = f"{stem}.tmp{ext}"
+    if not cv2.imwrite(tmp, image):
+        raise IOError(f"Cannot write image: {path}.")
+    os.replace(tmp, path)
@@ -10,7 +10,6 @@ import logging
 import os
 from abc import ABCMeta
 from abc import abstractmethod
-from copy import deepcopy
 from enum import Enum
 from typing import Any
 from typing import Optional
@@ -38,7 +37,14 @@ from torchkit.core.utils import Metrics
 from torchkit.core.utils import Tensors
 from torchkit.utils import checkpoints_dir
 from torchkit.utils import models_zoo_dir
+from .activation_checkpoint import checkpointed_modules
+from .activation_checkpoint import disable_activation_checkpoint
+from .activation_checkpoint import enable_activation_checkpoint
+from .activation_checkpoint import profile_activation_checkpoint
+from .compiler import CompiledForward
 from .debugger import Debugger
+from .model_io import assign_state_dict
+from .model_io import load_mmap_weights
 from .model_io import load_pretrained
 from .utils import get_next_version
 
@@ -131,12 +137,28 @@ class BaseModel(pl.LightningModule, metaclass=ABCMeta):
 			Default: `None`.
 		debug (dict, optional):
 			The debug configs. Default: `None`.
+		compile_cfg (dict, optional):
+			The compiled execution configs. See `CompiledForward`. For
+			example: `{"backend": "torchscript", "buckets": [[1, 3, 256, 256]],
+			"freeze": True, "warmup_iters": 2}`. If `buckets` is not given and
+			`shape` is defined, use a single bucket of [1, C, H, W]. Training
+			is not compiled when `checkpoint_cfg` is set. Default: `None`
+			means eager execution.
+		checkpoint_cfg (bool, list, dict, optional):
+			The activation checkpointing configs.
+			- If `True`, checkpoint all `checkpoint_modules`.
+			- If `list`, the names of the sub-modules to checkpoint.
+			- If `dict`, `{"modules": [...], "preserve_rng_state": True}`.
+			Default: `None` means no checkpointing.
+		checkpoint_modules (list[str]):
+			The sub-modules that can be checkpointed. Defined in each model.
 		epoch_step (int):
 			The current step in the epoch. It can be shared between train,
 			validation, test, and predict. Mostly used for debugging purpose.
 	"""
 	
-	model_zoo = {}
+	model_zoo          = {}
+	checkpoint_modules = []
 	
 	# MARK: Magic Functions
 	
@@ -157,6 +179,8 @@ class BaseModel(pl.LightningModule, metaclass=ABCMeta):
 		optimizers : Optional[Union[dict, list]] = None,
 		schedulers : Optional[Union[dict, list]] = None,
 		debugger   : Optional[dict]              = None,
+		compiled   : Optional[dict]              = None,
+		checkpointing: Union[bool, list, dict, None] = None,
 		*args, **kwargs
 	):
 		"""
@@ -183,6 +207,10 @@ class BaseModel(pl.LightningModule, metaclass=ABCMeta):
 			   Default: `None`.
 			debug (dict, optional):
 				The debug's configs. Default: `None`.
+			compiled (dict, optional):
+				The compiled execution's configs. Default: `None`.
+			checkpointing (bool, list, dict, optional):
+				The activation checkpointing's configs. Default: `None`.
 		"""
 		super().__init__(*args, **kwargs)
 		self.name            = name
@@ -200,6 +228,8 @@ class BaseModel(pl.LightningModule, metaclass=ABCMeta):
 		self.schedulers_cfgs = schedulers
 		self.schedulers      = None
 		self.debugger 		 = None
+		self.compile_cfg     = compiled
+		self.checkpoint_cfg  = checkpointing
 		self.epoch_step		 = 0
 		
 		self.init_num_classes()
@@ -347,6 +377,11 @@ class BaseModel(pl.LightningModule, metaclass=ABCMeta):
 			f"{(self.epoch_step + 1):06}.jpg"
 		)
 	
+	@property
+	def is_compiled(self) -> bool:
+		"""Return whether if `forward_infer()` runs compiled graphs."""
+		return isinstance(self.__dict__.get("forward_infer"), CompiledForward)
+	
 	@property
 	def with_loss(self) -> bool:
 		"""Return whether if the `loss` has been defined."""
@@ -456,6 +491,47 @@ class BaseModel(pl.LightningModule, metaclass=ABCMeta):
 			)
 		else:
 			logger.warning(f"Cannot load from pretrained: {self.pretrained}!")
+	
+	def load_mmap_weights(self, path: str, strict: bool = True) -> dict:
+		"""Load weights from a memory-mapped `.tkw` file (see
+		`ckpt_to_weights(mmap=True)`). The parameters become zero-copy views of
+		the file, so the weights are paged in lazily and shared between
+		processes.
+		
+		Args:
+			path (str):
+				The `.tkw` file.
+			strict (bool):
+				Raise an error if some keys are missing. Default: `True`.
+		
+		Returns:
+			header (dict):
+				The file's header with `name`, `config` and `dtype`.
+		"""
+		header, state_dict = load_mmap_weights(path=path)
+		assign_state_dict(module=self, state_dict=state_dict, strict=strict)
+		return header
+	
+	@classmethod
+	def load_from_mmap_weights(cls, path: str, **kwargs) -> BaseModel:
+		"""Build the model from the config stored in a `.tkw` file, then load
+		its weights lazily and zero-copy. `kwargs` override the stored config.
+		
+		Args:
+			path (str):
+				The `.tkw` file.
+		
+		Returns:
+			model (BaseModel):
+				The model.
+		"""
+		header, state_dict = load_mmap_weights(path=path)
+		config = dict(header.get("config") or {})
+		config.update(kwargs)
+		config["pretrained"] = False
+		model  = cls(**config)
+		assign_state_dict(module=model, state_dict=state_dict, strict=True)
+		return model
 			
 	def configure_optimizers(self):
 		"""Choose what optimizers and learning-rate schedulers to use in your
@@ -499,6 +575,99 @@ class BaseModel(pl.LightningModule, metaclass=ABCMeta):
 						   f"schedulers.")
 			return self.optims
 	
+	# MARK: Compile
+	
+	def compile_model(
+		self,
+		buckets: Optional[list]                 = None,
+		device : Union[torch.device, str, None] = None,
+	):
+		"""Switch `forward_infer()` to compiled execution and warm up the
+		declared input-shape buckets. Unseen shapes fall back to eager. Call
+		again after changing the mode (`train()`/`eval()`) or the weights.
+		
+		Args:
+			buckets (list, optional):
+				The list of input shapes as [B, C, H, W]. If `None`, use
+				`compile_cfg["buckets"]`, or [1, C, H, W] from `shape`.
+			device (torch.device, str, optional):
+				The device of the inputs. If `None`, use the model's device.
+		"""
+		cfg     = dict(self.compile_cfg or {})
+		buckets = buckets or cfg.pop("buckets", None)
+		if buckets is None and self.size is not None:
+			buckets = [(1, *self.size)]
+		
+		if self.is_compiled:
+			compiled = self.forward_infer
+			compiled.clear()
+			if buckets is not None:
+				compiled.buckets = [tuple(b) for b in buckets]
+		else:
+			compiled = CompiledForward(
+				model    = self,
+				eager_fn = type(self).forward_infer.__get__(self),
+				buckets  = buckets,
+				**cfg
+			)
+			# NOTE: Shadow the class method. Subclasses' `forward_train()` call
+			# `self.forward_infer()`, so training runs the graphs also.
+			self.__dict__["forward_infer"] = compiled
+		compiled.compile(device=device)
+	
+	def decompile_model(self):
+		"""Restore eager execution of `forward_infer()`."""
+		if self.is_compiled:
+			del self.__dict__["forward_infer"]
+	
+	# MARK: Activation Checkpointing
+	
+	def enable_checkpointing(self, modules: Optional[list[str]] = None):
+		"""Recompute the activations of the given sub-modules during backward
+		instead of storing them.
+		
+		Args:
+			modules (list[str], optional):
+				The sub-modules' names. If `None`, use `checkpoint_cfg`.
+		"""
+		cfg = self.checkpoint_cfg
+		if isinstance(cfg, (list, tuple)):
+			cfg = {"modules": list(cfg)}
+		elif not isinstance(cfg, dict):
+			cfg = {}
+		cfg     = dict(cfg)
+		modules = modules or cfg.pop("modules", None) or self.checkpoint_modules
+		cfg.pop("modules", None)
+		enable_activation_checkpoint(model=self, modules=modules, **cfg)
+	
+	def disable_checkpointing(self):
+		"""Store all activations again."""
+		disable_activation_checkpoint(model=self)
+	
+	def profile_checkpointing(
+		self,
+		batch_size: int                           = 1,
+		modules   : Optional[list[str]]           = None,
+		device    : Union[torch.device, str, None] = None,
+		iters     : int                           = 3,
+	) -> list[dict]:
+		"""Report the peak memory and the step time with and without
+		checkpointing each of `modules`, using random inputs of `shape`. See
+		`profile_activation_checkpoint()`.
+		"""
+		assert self.size is not None, "`shape` must be defined."
+		if device is None:
+			device = next(self.parameters()).device
+		x = torch.rand(batch_size, *self.size, device=device)
+		y = torch.rand(batch_size, *self.size, device=device)
+		return profile_activation_checkpoint(
+			model   = self,
+			x       = x,
+			y       = y,
+			modules = modules or self.checkpoint_modules,
+			iters   = iters,
+		)
+	
 	# MARK: Forward Pass
 	
 	def forward(
@@ -588,6 +757,19 @@ class BaseModel(pl.LightningModule, metaclass=ABCMeta):
 		filedir.create_dirs(paths=[self.model_dir, self.version_dir,
 								   self.weights_dir, self.debug_dir])
 		
+		# NOTE: A traced graph bypasses the checkpoint wrappers, so training
+		# stays eager when activation checkpointing is enabled
+		if self.compile_cfg and self.checkpoint_cfg:
+			logger.warning("`compile_cfg` and `checkpoint_cfg` are both set: "
+						   "training runs eager so the activations are "
+						   "checkpointed. Compile for inference only.")
+			self.decompile_model()
+		elif self.compile_cfg:
+			self.compile_model()
+		
+		if self.checkpoint_cfg and not checkpointed_modules(self):
+			self.enable_checkpointing()
+		
 		if self.debugger:
 			self.debugger.run_routine_start()
 			# self.thread_debug.start()
@@ -662,10 +844,9 @@ class BaseModel(pl.LightningModule, metaclass=ABCMeta):
 		if (self.debugger and epoch % self.debugger.every_n_epochs == 0 and
 			self.epoch_step < self.debugger.save_max_n):
 			if self.trainer.is_global_zero:
-				self.debugger.run(
-					deepcopy(x), deepcopy(y), deepcopy(y_hat),
-					self.debug_image_filepath
-				)
+				# NOTE: The debugger takes its own downsampled snapshot, so
+				# no deep copies of the full device tensors are needed.
+				self.debugger.run(x, y, y_hat, self.debug_image_filepath)
 				"""if self.thread_debug:
 					self.debug_queue.put([
 						deepcopy(x), deepcopy(y), deepcopy(y_hat),
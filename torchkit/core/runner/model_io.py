@@ -6,18 +6,22 @@
 
 from __future__ import annotations
 
+import json
 import logging
 import os
+import struct
 from collections import OrderedDict
 from pathlib import Path
 from typing import Optional
 from typing import Union
 
+import numpy as np
 import torch
 from torch import nn
 from torch.hub import load_state_dict_from_url
 
 from torchkit.core.fileio import get_latest_file
+from torchkit.core.fileio import is_mmap_weights_file
 from torchkit.core.fileio import is_torch_saved_file
 from torchkit.core.fileio import is_url
 from torchkit.utils import models_zoo_dir
@@ -71,7 +75,10 @@ def load_state_dict_from_path(
         return None
     
     state_dict = None
-    if is_torch_saved_file(path=path):
+    if is_mmap_weights_file(path=path):
+        _, state_dict = load_mmap_weights(path=path)
+        return state_dict
+    elif is_torch_saved_file(path=path):
         # Can be either the weight file or the weights file.
         state_dict = torch.load(path, map_location=map_location)
     elif is_url(path=path):
@@ -83,7 +90,7 @@ def load_state_dict_from_path(
     if "model_state_dict" in state_dict:
         state_dict = state_dict["model_state_dict"]
     if "state_dict" in state_dict:
-        state_dict = state_dict["model_state_dict"]
+        state_dict = state_dict["state_dict"]
     return state_dict
 
 
@@ -296,9 +303,16 @@ def get_global_step(ckpt: Union[str, Path]) -> int:
 # MARK: - Weights
 
 def ckpt_to_weights(
-    ckpt: str, model_dir: Optional[str] = None, file_name: Optional[str] = None
-):
-    """Convert the `.ckpt` to a `.pth` file.
+    ckpt     : str,
+    model_dir: Optional[str]         = None,
+    file_name: Optional[str]         = None,
+    mmap     : bool                  = False,
+    name     : Optional[str]         = None,
+    config   : Optional[dict]        = None,
+    dtype    : Optional[torch.dtype] = None,
+) -> str:
+    """Convert the `.ckpt` to a `.pth` file, or to a memory-mapped `.tkw`
+    weights file (see `save_mmap_weights()`).
     
     Args:
         ckpt (str):
@@ -307,12 +321,242 @@ def ckpt_to_weights(
             The dir to save the weights file.
         file_name (str, optional):
             The name of the weight file.
+        mmap (bool):
+            If `True`, export to the memory-mapped `.tkw` format.
+            Default: `False`.
+        name (str, optional):
+            The model name stored in the `.tkw` header.
+        config (dict, optional):
+            The model config stored in the `.tkw` header. It is used to build
+            the model when loading. Default: `None`.
+        dtype (torch.dtype, optional):
+            Cast floating point tensors to `dtype` in the `.tkw` file.
+            Default: `None` keeps the original dtypes.
+    
+    Returns:
+        save_path (str):
+            The path to the weights file.
     """
     state_dict = load_state_dict_from_path(ckpt)
     if model_dir is None:
         model_dir = str(Path(ckpt).parent)
+    extension = ".tkw" if mmap else ".pth"
     if file_name is None:
-        file_name = str(Path(ckpt).name)
-    file_name = f"{str(Path(ckpt).stem)}.pth"
+        file_name = str(Path(ckpt).stem)
+    file_name = f"{str(Path(file_name).stem)}{extension}"
     save_path = os.path.join(model_dir, file_name)
-    torch.save(state_dict, save_path)
+    if mmap:
+        save_mmap_weights(
+            state_dict=state_dict, path=save_path, name=name, config=config,
+            dtype=dtype
+        )
+    else:
+        torch.save(state_dict, save_path)
+    return save_path
+
+
+# MARK: - Memory-mapped Weights
+
+"""The `.tkw` layout:
+    - 8 bytes : Magic `TKWGHT01`.
+    - 8 bytes : Header length `N` (little-endian uint64).
+    - N bytes : UTF-8 JSON header: {"name", "config", "dtype", "tensors": {
+                key: {"dtype", "shape", "offset", "nbytes"}}}. Offsets are
+                relative to the start of the data section.
+    - Data    : Raw, C-contiguous tensor bytes, each aligned to `MMAP_ALIGN`.
+The data section starts at an `MMAP_ALIGN` boundary so every tensor can be
+viewed in place from a memory map.
+"""
+
+MMAP_MAGIC = b"TKWGHT01"
+MMAP_ALIGN = 64
+MMAP_DTYPES = {
+    "float64" : (np.float64, torch.float64),
+    "float32" : (np.float32, torch.float32),
+    "float16" : (np.float16, torch.float16),
+    "bfloat16": (np.int16,   torch.bfloat16),  # NOTE: Viewed as int16 bits
+    "int64"   : (np.int64,   torch.int64),
+    "int32"   : (np.int32,   torch.int32),
+    "int16"   : (np.int16,   torch.int16),
+    "int8"    : (np.int8,    torch.int8),
+    "uint8"   : (np.uint8,   torch.uint8),
+    "bool"    : (np.bool_,   torch.bool),
+}
+
+
+def save_mmap_weights(
+    state_dict: dict[str, torch.Tensor],
+    path      : str,
+    name      : Optional[str]         = None,
+    config    : Optional[dict]        = None,
+    dtype     : Optional[torch.dtype] = None,
+):
+    """Save a weights-only `state_dict` to a memory-mappable `.tkw` file.
+    
+    Args:
+        state_dict (dict):
+            The model's `state_dict`.
+        path (str):
+            The output file.
+        name (str, optional):
+            The model name.
+        config (dict, optional):
+            The model config. Must be JSON-serializable, other values are
+            stored as strings.
+        dtype (torch.dtype, optional):
+            Cast floating point tensors to `dtype`. Default: `None`.
+    """
+    tensors = OrderedDict()
+    entries = OrderedDict()
+    offset  = 0
+    for key, tensor in state_dict.items():
+        tensor = tensor.detach().cpu()
+        if dtype is not None and tensor.is_floating_point():
+            tensor = tensor.to(dtype)
+        tensor     = tensor.contiguous()
+        dtype_name = str(tensor.dtype).replace("torch.", "")
+        if dtype_name not in MMAP_DTYPES:
+            raise TypeError(f"Unsupported dtype for `{key}`: {tensor.dtype}.")
+        nbytes = tensor.numel() * tensor.element_size()
+        offset = (offset + MMAP_ALIGN - 1) // MMAP_ALIGN * MMAP_ALIGN
+        entries[key] = {
+            "dtype" : dtype_name,
+            "shape" : list(tensor.shape),
+            "offset": offset,
+            "nbytes": nbytes,
+        }
+        tensors[key] = tensor
+        offset      += nbytes
+    
+    header = json.dumps({
+        "name"   : name,
+        "config" : config,
+        "dtype"  : None if dtype is None else str(dtype).replace("torch.", ""),
+        "tensors": entries,
+    }, default=str).encode("utf-8")
+    start  = len(MMAP_MAGIC) + 8 + len(header)
+    header = header + b" " * (-start % MMAP_ALIGN)  # Pad the data section
+    
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MMAP_MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        data_start = f.tell()
+        for key, tensor in tensors.items():
+            f.seek(data_start + entries[key]["offset"])
+            if tensor.dtype is torch.bfloat16:
+                tensor = tensor.view(torch.int16)
+            f.write(tensor.numpy().tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+
+
+def read_mmap_header(path: str) -> tuple[dict, int]:
+    """Read the JSON header of a `.tkw` file.
+    
+    Returns:
+        header (dict):
+            The header.
+        data_start (int):
+            The byte offset of the data section.
+    """
+    with open(path, "rb") as f:
+        magic = f.read(len(MMAP_MAGIC))
+        if magic != MMAP_MAGIC:
+            raise ValueError(f"Not a `.tkw` weights file: {path}.")
+        length = struct.unpack("<Q", f.read(8))[0]
+        header = json.loads(f.read(length).decode("utf-8"))
+    return header, len(MMAP_MAGIC) + 8 + length
+
+
+def load_mmap_weights(path: str) -> tuple[dict, OrderedDict]:
+    """Load a `.tkw` file lazily. The tensors are zero-copy views into a
+    copy-on-write memory map: pages are only read from disk when touched and
+    are shared by all processes mapping the same file.
+    
+    Args:
+        path (str):
+            The `.tkw` file.
+    
+    Returns:
+        header (dict):
+            The header with `name`, `config` and `dtype`.
+        state_dict (OrderedDict):
+            The memory-mapped `state_dict`.
+    """
+    header, data_start = read_mmap_header(path=path)
+    buffer     = np.memmap(path, dtype=np.uint8, mode="c")
+    state_dict = OrderedDict()
+    for key, entry in header["tensors"].items():
+        np_dtype, torch_dtype = MMAP_DTYPES[entry["dtype"]]
+        start  = data_start + entry["offset"]
+        array  = buffer[start: start + entry["nbytes"]].view(np_dtype)
+        tensor = torch.from_numpy(array).reshape(entry["shape"])
+        if torch_dtype is torch.bfloat16:
+            tensor = tensor.view(torch.bfloat16)
+        state_dict[key] = tensor
+    return header, state_dict
+
+
+def assign_state_dict(
+    module: nn.Module, state_dict: dict[str, torch.Tensor], strict: bool = True
+) -> nn.Module:
+    """Assign the tensors of `state_dict` as the module's parameters and
+    buffers without copying them (unlike `nn.Module.load_state_dict()`).
+    Tensors with a mismatched dtype are copied in place instead. A mismatched
+    shape raises a `ValueError`.
+    
+    Args:
+        module (nn.Module):
+            The module.
+        state_dict (dict):
+            The `state_dict`, usually from `load_mmap_weights()`.
+        strict (bool):
+            Raise an error if some module's keys are missing. Default: `True`.
+    
+    Returns:
+        module (nn.Module):
+            The module.
+    """
+    def check_shape(key: str, tensor: torch.Tensor, target: torch.Tensor):
+        if tensor.shape != target.shape:
+            raise ValueError(f"Size mismatch for {key}: copying a tensor with "
+                             f"shape {tuple(tensor.shape)} from the "
+                             f"state_dict, the shape in the module is "
+                             f"{tuple(target.shape)}.")
+    
+    missing = []
+    for name, submodule in module.named_modules():
+        prefix = f"{name}." if name else ""
+        for key, param in list(submodule._parameters.items()):
+            if param is None:
+                continue
+            tensor = state_dict.get(f"{prefix}{key}", None)
+            if tensor is None:
+                missing.append(f"{prefix}{key}")
+                continue
+            check_shape(f"{prefix}{key}", tensor, param)
+            if tensor.dtype == param.dtype:
+                submodule._parameters[key] = nn.Parameter(
+                    tensor, requires_grad=param.requires_grad
+                )
+            else:
+                with torch.no_grad():
+                    param.copy_(tensor)
+        for key, buffer in list(submodule._buffers.items()):
+            if buffer is None:
+                continue
+            tensor = state_dict.get(f"{prefix}{key}", None)
+            if tensor is None:
+                if key not in submodule._non_persistent_buffers_set:
+                    missing.append(f"{prefix}{key}")
+                continue
+            check_shape(f"{prefix}{key}", tensor, buffer)
+            if tensor.dtype == buffer.dtype:
+                submodule._buffers[key] = tensor
+            else:
+                buffer.copy_(tensor)
+    if strict and missing:
+        raise KeyError(f"Missing keys in state_dict: {missing}.")
+    return module
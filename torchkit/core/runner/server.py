@@ -0,0 +1,603 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Multi-stream Inference Server with cross-stream dynamic batching.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+from typing import Optional
+from typing import Union
+
+import cv2
+import numpy as np
+
+from torchkit.core.fileio import create_dirs
+from torchkit.core.image import FrameLoader
+from torchkit.core.image import FrameWriter
+from .inference import Inference
+
+logger = logging.getLogger()
+
+
+# MARK: - StreamFrame
+
+@dataclass
+class StreamFrame:
+    """A single frame waiting in the server's queue.
+
+    Attributes:
+        stream_id (str):
+            The id of the stream the frame comes from.
+        index (int):
+            The frame index inside its stream.
+        image (np.ndarray):
+            The decoded frame as [H, W, C].
+        arrival (float):
+            The monotonic time the frame entered the queue.
+    """
+
+    stream_id: str
+    index    : int
+    image    : np.ndarray
+    arrival  : float
+
+
+# MARK: - InferenceServer
+
+HTTP_REASONS = {
+    200: "OK",
+    202: "Accepted",
+    400: "Bad Request",
+    404: "Not Found",
+    503: "Service Unavailable",
+}
+
+
+# noinspection PyMethodMayBeStatic
+class InferenceServer(Inference):
+    """The Inference Server ingests frames from many sources concurrently,
+    collects them into dynamic batches under a max-latency deadline, runs them
+    through ONE shared model instance, and routes the results back to
+    per-stream `FrameWriter`s.
+
+    Frames can come from `FrameLoader` sources (video files, image folders,
+    streams) and/or be pushed through a small local HTTP endpoint (TCP or unix
+    socket):
+        - `POST /streams/<stream_id>/frames`: The body is an encoded image
+          (.jpg, .png, ...). Returns the assigned frame index.
+        - `GET  /stats`: Returns the server's counters.
+        - `POST /shutdown`: Drains the queue and stops the server.
+
+    Attributes:
+        max_batch_size (int):
+            Maximum number of frames (across all streams) in one batch.
+        max_latency (float):
+            Maximum time (in seconds) the oldest frame of a batch waits before
+            the batch is dispatched, even if the batch is not full.
+        queue_size (int):
+            Maximum number of pending frames. Sources wait when the queue is
+            full.
+        host (str):
+            The host of the HTTP endpoint.
+        port (int, optional):
+            The port of the HTTP endpoint. If `None` and `unix_socket` is
+            `None`, the endpoint is disabled.
+        unix_socket (str, optional):
+            The path to a unix socket for the HTTP endpoint. Takes precedence
+            over `port`.
+        save_video (bool):
+            Append the results of each stream to a video file.
+        sources (dict):
+            The dictionary of {stream_id: data} sources to ingest.
+        writers (dict):
+            The dictionary of {stream_id: FrameWriter}.
+        stream_counts (dict):
+            The number of frames submitted per stream.
+        num_frames (int):
+            Total number of processed frames.
+        num_batches (int):
+            Total number of processed batches.
+    """
+
+    # MARK: Magic Functions
+
+    def __init__(
+        self,
+        default_root_dir: str,
+        max_batch_size  : int                   = 8,
+        max_latency     : float                 = 0.02,
+        queue_size      : int                   = 64,
+        host            : str                   = "127.0.0.1",
+        port            : Optional[int]         = None,
+        unix_socket     : Optional[str]         = None,
+        save_video      : bool                  = True,
+        *args, **kwargs
+    ):
+        kwargs["verbose"] = False  # NOTE: No GUI from worker threads
+        super().__init__(default_root_dir=default_root_dir, *args, **kwargs)
+        self.max_batch_size = max_batch_size
+        self.max_latency    = max_latency
+        self.queue_size     = queue_size
+        self.host           = host
+        self.port           = port
+        self.unix_socket    = unix_socket
+        self.save_video     = save_video
+        self.sources        = {}
+        self.writers        = {}
+        self.stream_counts  = {}
+        self.num_frames     = 0
+        self.num_batches    = 0
+        self.frame_queue    = None
+        self.stop_event     = None
+        self.model_executor = None
+        self.io_executor    = None
+        self.write_executor = None
+        self.write_futures  = []
+
+    # MARK: Properties
+
+    @property
+    def with_endpoint(self) -> bool:
+        """Return whether if the HTTP endpoint is enabled."""
+        return self.unix_socket is not None or self.port is not None
+
+    @property
+    def stats(self) -> dict:
+        """Return the server's counters."""
+        return {
+            "num_frames"   : self.num_frames,
+            "num_batches"  : self.num_batches,
+            "avg_batch"    : self.num_frames / max(self.num_batches, 1),
+            "queue_depth"  : self.frame_queue.qsize() if self.frame_queue else 0,
+            "stream_counts": dict(self.stream_counts),
+        }
+
+    # MARK: Configure
+
+    def init_sources(self, data: Union[str, list, dict, None]):
+        """Configure the `{stream_id: data}` sources.
+
+        Args:
+            data (str, list, dict, optional):
+                A single data source, a list of data sources, or a dictionary
+                of {stream_id: data}. Sources without an explicit id are named
+                after their basename.
+        """
+        if data is None:
+            sources = {}
+        elif isinstance(data, dict):
+            sources = dict(data)
+        elif isinstance(data, str):
+            sources = {self.get_stream_id(data): data}
+        elif isinstance(data, (list, tuple)):
+            sources = {}
+            for d in data:
+                stream_id = self.get_stream_id(d)
+                if stream_id in sources:
+                    stream_id = f"{stream_id}_{len(sources)}"
+                sources[stream_id] = d
+        else:
+            raise TypeError(f"Cannot parse data sources of type: {type(data)}.")
+        self.sources = sources
+
+    def init_data_writer(self):
+        """Per-stream writers are created on the first result of each stream.
+        """
+        self.writers = {}
+
+    def init_executors(self):
+        """Configure the executors. The model runs on a single worker so the
+        shared instance never executes two batches concurrently. Results are
+        written on a single worker to keep the frames' order of each stream.
+        """
+        self.model_executor = ThreadPoolExecutor(max_workers=1)
+        self.io_executor    = ThreadPoolExecutor(
+            max_workers=len(self.sources) + 2
+        )
+        self.write_executor = ThreadPoolExecutor(max_workers=1)
+        self.write_futures  = []
+
+    def validate_attributes(self):
+        """Validate all attributes' values before run loop start.
+        """
+        assert self.model is not None, "Invalid model."
+        assert self.max_batch_size >= 1, \
+            f"Invalid `max_batch_size={self.max_batch_size}`. Must be >= 1."
+        assert self.max_latency >= 0, \
+            f"Invalid `max_latency={self.max_latency}`. Must be >= 0."
+        assert len(self.sources) > 0 or self.with_endpoint, \
+            "No data sources and the HTTP endpoint is disabled."
+
+    # MARK: Run
+
+    def run(
+        self,
+        model     : Any,
+        data      : Union[str, list, dict, None] = None,
+        post_model: Any                          = None
+    ):
+        """Main serving loop. It returns when all sources are exhausted, or,
+        when the HTTP endpoint is enabled, after `POST /shutdown`.
+
+        Args:
+            model (nn.Module):
+                The model to run.
+            data (str, list, dict, optional):
+                The data sources. See `init_sources()`. Default: `None`.
+            post_model (nn.Module):
+                The post-processing model.
+        """
+        self.model      = model
+        self.post_model = post_model
+        self.data       = data
+
+        self.init_sources(data=data)
+        self.run_routine_start()
+        try:
+            asyncio.run(self.serve())
+        finally:
+            self.run_routine_end()
+
+    def run_routine_start(self):
+        """When run routine starts we build the `output_dir` on the fly.
+        """
+        create_dirs(paths=[self.output_dir])
+        self.init_data_writer()
+        self.validate_attributes()
+        self.init_executors()
+
+        self.model.to(self.device)
+        self.model.eval()
+        self.compile_model(model=self.model)
+        for stage in self.stages[1:]:
+            stage.to(self.device)
+            stage.eval()
+            self.compile_model(model=stage)
+
+    def compile_model(self, model: Any):
+        """Compile the model (if it is configured to) for every batch size the
+        dynamic batching can produce.
+        """
+        if not getattr(model, "compile_cfg", None):
+            return
+        buckets = model.compile_cfg.get("buckets", None)
+        if buckets is None and self.shape:
+            c, h, w = self.shape[2], self.shape[0], self.shape[1]
+            buckets = [(b, c, h, w) for b in range(1, self.max_batch_size + 1)]
+        model.compile_model(buckets=buckets, device=self.device)
+
+    def run_routine_end(self):
+        """When run routine ends we release the executors and writers.
+        """
+        for executor in [self.io_executor, self.model_executor,
+                         self.write_executor]:
+            if executor:
+                executor.shutdown(wait=True)
+        for writer in self.writers.values():
+            writer.close()
+        self.model.train()
+
+        stats = self.stats
+        logger.info(f"Served {stats['num_frames']} frames in "
+                    f"{stats['num_batches']} batches (average batch size: "
+                    f"{stats['avg_batch']:.2f}).")
+
+    async def serve(self):
+        """Start the ingest tasks, the batching loop and the endpoint. Then
+        wait until all sources are exhausted or a shutdown is requested.
+        """
+        self.frame_queue = asyncio.Queue(maxsize=self.queue_size)
+        self.stop_event  = asyncio.Event()
+
+        server  = await self.start_endpoint()
+        ingests = [
+            asyncio.create_task(self.ingest_stream(stream_id, data))
+            for stream_id, data in self.sources.items()
+        ]
+        batcher = asyncio.create_task(self.batch_loop())
+        try:
+            if server is not None:
+                await self.stop_event.wait()
+            else:
+                await asyncio.gather(*ingests)
+        finally:
+            if server is not None:
+                server.close()
+                await server.wait_closed()
+            for task in ingests:
+                task.cancel()
+            await asyncio.gather(*ingests, return_exceptions=True)
+            # NOTE: Drain the queue, then stop the batching loop
+            await self.frame_queue.put(None)
+            await batcher
+            await asyncio.gather(
+                *[asyncio.wrap_future(f) for f in self.write_futures]
+            )
+
+    # MARK: Ingest
+
+    async def ingest_stream(self, stream_id: str, data: str):
+        """Read all frames from a `FrameLoader` source and put them into the
+        queue. Decoding runs in the I/O executor so that slow sources never
+        block the others.
+
+        Args:
+            stream_id (str):
+                The stream id.
+            data (str):
+                The data source. Can be a path or pattern to
+                image/video/directory, or a stream link.
+        """
+        loop   = asyncio.get_running_loop()
+        loader = await loop.run_in_executor(
+            self.io_executor, FrameLoader, data, 1
+        )
+        iterator = iter(loader)
+        try:
+            while True:
+                batch = await loop.run_in_executor(
+                    self.io_executor, next, iterator, None
+                )
+                if batch is None:
+                    break
+                images, indexes, files, rel_paths = batch
+                for image in images:
+                    if image is None:
+                        continue
+                    await self.submit(stream_id=stream_id, image=image)
+        except asyncio.CancelledError:
+            raise
+        except Exception as err:
+            logger.error(f"Stream {stream_id} stopped: {err}.")
+        finally:
+            loader.close()
+
+    async def submit(self, stream_id: str, image: np.ndarray) -> int:
+        """Put a frame into the queue. Wait if the queue is full.
+
+        Args:
+            stream_id (str):
+                The stream id.
+            image (np.ndarray):
+                The frame as [H, W, C].
+
+        Returns:
+            index (int):
+                The frame index inside its stream.
+        """
+        index = self.stream_counts.get(stream_id, 0)
+        self.stream_counts[stream_id] = index + 1
+        frame = StreamFrame(
+            stream_id = stream_id,
+            index     = index,
+            image     = image,
+            arrival   = time.monotonic()
+        )
+        await self.frame_queue.put(frame)
+        return index
+
+    # MARK: Batching
+
+    async def batch_loop(self):
+        """Collect frames into dynamic batches. A batch is dispatched when it
+        reaches `max_batch_size` or when its oldest frame has waited for
+        `max_latency` seconds. Frames keep accumulating while the model runs,
+        so batches grow with the load.
+        """
+        loop = asyncio.get_running_loop()
+        stop = False
+        while not stop:
+            frame = await self.frame_queue.get()
+            if frame is None:
+                break
+
+            batch    = [frame]
+            deadline = frame.arrival + self.max_latency
+            while len(batch) < self.max_batch_size:
+                try:
+                    frame = self.frame_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        frame = await asyncio.wait_for(
+                            self.frame_queue.get(), timeout=timeout
+                        )
+                    except asyncio.TimeoutError:
+                        break
+                if frame is None:
+                    stop = True
+                    break
+                batch.append(frame)
+
+            try:
+                outputs = await loop.run_in_executor(
+                    self.model_executor, self.forward_batch, batch
+                )
+            except Exception as err:
+                logger.error(f"Cannot process batch of {len(batch)} frames: "
+                             f"{err}.")
+                continue
+
+            self.num_frames  += len(batch)
+            self.num_batches += 1
+            self.write_futures = [f for f in self.write_futures if not f.done()]
+            self.write_futures.append(
+                self.write_executor.submit(self.write_results, outputs)
+            )
+
+    def forward_batch(
+        self, batch: list[StreamFrame]
+    ) -> list[tuple[StreamFrame, np.ndarray]]:
+        """Run the shared model on a batch of frames from many streams. Frames
+        are grouped by shape when `shape` is not defined.
+
+        Args:
+            batch (list[StreamFrame]):
+                The frames.
+
+        Returns:
+            outputs (list):
+                The list of (frame, result) pairs.
+        """
+        groups = {}
+        for frame in batch:
+            key = None if self.shape else frame.image.shape
+            groups.setdefault(key, []).append(frame)
+
+        outputs = []
+        for frames in groups.values():
+            images  = [frame.image for frame in frames]
+            results = self.preprocess(images)
+            for stage in self.stages:
+                results = self.forward_stage(stage=stage, x=results)
+            results = self.postprocess(results)
+            outputs.extend(zip(frames, results))
+        return outputs
+
+    # MARK: Write
+
+    def write_results(self, outputs: list[tuple[StreamFrame, np.ndarray]]):
+        """Route the results back to the per-stream `FrameWriter`s.
+
+        Args:
+            outputs (list):
+                The list of (frame, result) pairs.
+        """
+        for frame, result in outputs:
+            writer = self.writers.get(frame.stream_id, None)
+            if writer is None:
+                writer = FrameWriter(
+                    dst        = os.path.join(self.output_dir, frame.stream_id),
+                    shape      = result.shape,
+                    save_image = self.save_image,
+                    save_video = self.save_video,
+                )
+                self.writers[frame.stream_id] = writer
+            writer.write_frame(image=result)
+
+    # MARK: Endpoint
+
+    async def start_endpoint(self) -> Optional[asyncio.AbstractServer]:
+        """Start the HTTP endpoint on the unix socket or TCP port.
+
+        Returns:
+            server (asyncio.AbstractServer, optional):
+                The server object. `None` if the endpoint is disabled.
+        """
+        if self.unix_socket is not None:
+            if os.path.exists(self.unix_socket):
+                os.remove(self.unix_socket)
+            server = await asyncio.start_unix_server(
+                self.handle_request, path=self.unix_socket
+            )
+            logger.info(f"Frame-submit endpoint at: unix:{self.unix_socket}.")
+        elif self.port is not None:
+            server = await asyncio.start_server(
+                self.handle_request, host=self.host, port=self.port
+            )
+            logger.info(f"Frame-submit endpoint at: "
+                        f"http://{self.host}:{self.port}.")
+        else:
+            return None
+        return server
+
+    async def handle_request(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        """Parse a single HTTP/1.1 request and write the JSON response.
+        """
+        try:
+            request_line = await reader.readline()
+            if not request_line:
+                return
+            method, path, _ = request_line.decode("latin-1").split(" ", 2)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                key, _, value = line.decode("latin-1").partition(":")
+                headers[key.strip().lower()] = value.strip()
+            length = int(headers.get("content-length", 0))
+            body   = await reader.readexactly(length) if length > 0 else b""
+            status, payload = await self.route_request(method, path, body)
+        except Exception as err:
+            status, payload = 400, {"error": f"{err}"}
+
+        content  = json.dumps(payload).encode("utf-8")
+        response = (
+            f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(content)}\r\n"
+            f"Connection: close\r\n\r\n"
+        ).encode("latin-1") + content
+        writer.write(response)
+        await writer.drain()
+        writer.close()
+        await writer.wait_closed()
+
+    async def route_request(
+        self, method: str, path: str, body: bytes
+    ) -> tuple[int, dict]:
+        """Dispatch a request to the corresponding action.
+
+        Args:
+            method (str):
+                The HTTP method.
+            path (str):
+                The request path.
+            body (bytes):
+                The request body.
+
+        Returns:
+            status (int):
+                The HTTP status code.
+            payload (dict):
+                The JSON payload.
+        """
+        parts = [p for p in path.split("?")[0].split("/") if p]
+
+        if method == "GET" and parts == ["stats"]:
+            return 200, self.stats
+
+        if method == "POST" and parts == ["shutdown"]:
+            self.stop_event.set()
+            return 200, {"status": "stopping"}
+
+        if (method == "POST" and len(parts) == 3 and parts[0] == "streams"
+            and parts[2] == "frames"):
+            if self.stop_event.is_set():
+                return 503, {"error": "The server is stopping."}
+            loop  = asyncio.get_running_loop()
+            image = await loop.run_in_executor(
+                self.io_executor, self.decode_image, body
+            )
+            if image is None:
+                return 400, {"error": "Cannot decode image."}
+            index = await self.submit(stream_id=parts[1], image=image)
+            return 202, {"stream": parts[1], "index": index}
+
+        return 404, {"error": f"Unknown route: {method} {path}."}
+
+    # MARK: Utils
+
+    def decode_image(self, data: bytes) -> Optional[np.ndarray]:
+        """Decode an encoded image (.jpg, .png, ...) into a BGR image."""
+        buffer = np.frombuffer(data, dtype=np.uint8)
+        return cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+
+    def get_stream_id(self, data: str) -> str:
+        """Name a stream after its data source's basename."""
+        name = os.path.basename(os.path.normpath(str(data)))
+        return os.path.splitext(name)[0] or "stream"
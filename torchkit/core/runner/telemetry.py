@@ -0,0 +1,303 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Per-stage telemetry of the inference loop: rolling latency percentiles,
+queue depths and frame counters, exported as JSON log lines and as a
+Prometheus text endpoint.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from typing import Callable
+from typing import Optional
+
+logger = logging.getLogger()
+
+__all__ = ["Telemetry"]
+
+
+# MARK: - Telemetry
+
+class Telemetry:
+    """Telemetry records the wall time of each stage of the inference loop
+    (`decode`, `preprocess`, `forward`, `post_model`, `postprocess`, `show`,
+    `write`) over a rolling window, samples the depth of registered queues,
+    and counts the processed and dropped frames. It is thread-safe, so the
+    pipeline's workers can share one instance.
+
+    The stats are exported:
+        - As a JSON log line every `log_every` seconds.
+        - On a local HTTP endpoint (if `port` is set):
+            - `GET /metrics`: Prometheus text format.
+            - `GET /stats`  : The same snapshot as the JSON log lines.
+
+    Attributes:
+        window (int):
+            Number of most recent samples per stage used for the percentiles.
+            Default: `1000`.
+        log_every (float):
+            Log a JSON line every `log_every` seconds. `0` to disable.
+            Default: `10.0`.
+        host (str):
+            The host of the metrics endpoint. Default: `127.0.0.1`.
+        port (int, optional):
+            The port of the metrics endpoint. If `None`, the endpoint is
+            disabled. Default: `None`.
+        sync (bool):
+            Wait for the device's queued work before and after timing a
+            stage, so asynchronous CUDA kernels are charged to the stage
+            that launched them and not to the next host sync. It adds a sync
+            per stage. Default: `True`.
+        prefix (str):
+            The prefix of the Prometheus metrics. Default: `torchkit_inference`.
+    """
+
+    quantiles = [0.5, 0.95, 0.99]
+
+    # MARK: Magic Functions
+
+    def __init__(
+        self,
+        window   : int           = 1000,
+        log_every: float         = 10.0,
+        host     : str           = "127.0.0.1",
+        port     : Optional[int] = None,
+        sync     : bool          = True,
+        prefix   : str           = "torchkit_inference",
+        *args, **kwargs
+    ):
+        self.window    = window
+        self.log_every = log_every
+        self.host      = host
+        self.port      = port
+        self.sync      = sync
+        self.prefix    = prefix
+        self.lock      = threading.Lock()
+        self.server    = None
+        self.reset()
+
+    # MARK: Configure
+
+    def reset(self):
+        """Clear the samples, the queues and the counters."""
+        with self.lock:
+            self.samples  = {}  # {stage: deque of seconds}
+            self.totals   = {}  # {stage: [count, sum of seconds]}
+            self.queues   = {}  # {name: callable returning the depth}
+            self.counters = {"frames": 0, "frames_dropped": 0, "batches": 0}
+            self.start    = time.monotonic()
+            self.last_log = self.start
+
+    def add_queue(self, name: str, depth: Callable[[], int]):
+        """Register a queue whose depth is sampled at each export.
+
+        Args:
+            name (str):
+                The queue name (for example, the stage it feeds).
+            depth (callable):
+                The function returning the current depth, e.g. `q.qsize`.
+        """
+        with self.lock:
+            self.queues[name] = depth
+
+    # MARK: Record
+
+    @contextmanager
+    def stage(self, name: str, sync: Optional[Callable] = None):
+        """Time the enclosed block as one sample of stage `name`.
+
+        Args:
+            name (str):
+                The stage name.
+            sync (callable, optional):
+                The function waiting for the device's queued work. Only
+                called when `sync` is enabled. Default: `None`.
+        """
+        sync = sync if self.sync else None
+        if sync is not None:
+            sync()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if sync is not None:
+                sync()
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float):
+        """Add a sample of stage `name`."""
+        with self.lock:
+            if name not in self.samples:
+                self.samples[name] = deque(maxlen=self.window)
+                self.totals[name]  = [0, 0.0]
+            self.samples[name].append(seconds)
+            self.totals[name][0] += 1
+            self.totals[name][1] += seconds
+
+    def count(self, name: str, value: int = 1):
+        """Increase the counter `name` by `value`."""
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    # MARK: Export
+
+    def percentile(self, values: list[float], q: float) -> float:
+        """Return the nearest-rank percentile `q` in [0, 1] of sorted
+        `values`.
+        """
+        if not values:
+            return 0.0
+        k = min(max(math.ceil(q * len(values)) - 1, 0), len(values) - 1)
+        return values[k]
+
+    def snapshot(self) -> dict:
+        """Return the current stats: the latency percentiles (ms) of each
+        stage over the window, the queue depths, the counters and the frame
+        rate.
+        """
+        with self.lock:
+            samples  = {k: sorted(v) for k, v in self.samples.items()}
+            totals   = {k: list(v) for k, v in self.totals.items()}
+            queues   = dict(self.queues)
+            counters = dict(self.counters)
+            elapsed  = time.monotonic() - self.start
+
+        stages = {}
+        for name, values in samples.items():
+            stats = {
+                f"p{int(q * 100)}": 1000.0 * self.percentile(values, q)
+                for q in self.quantiles
+            }
+            stats["mean"]  = 1000.0 * sum(values) / max(len(values), 1)
+            stats["count"] = totals[name][0]
+            stages[name]   = stats
+
+        return {
+            "elapsed" : elapsed,
+            "fps"     : counters["frames"] / max(elapsed, 1e-9),
+            "stages"  : stages,
+            "queues"  : {k: depth() for k, depth in queues.items()},
+            "counters": counters,
+        }
+
+    def log(self):
+        """Log the snapshot as a single JSON line."""
+        snapshot = self.snapshot()
+        logger.info(json.dumps({"telemetry": snapshot}, sort_keys=True))
+
+    def maybe_log(self):
+        """Log the snapshot if `log_every` seconds passed since the last one.
+        """
+        if not self.log_every:
+            return
+        now = time.monotonic()
+        if now - self.last_log < self.log_every:
+            return
+        self.last_log = now
+        self.log()
+
+    def to_prometheus(self) -> str:
+        """Return the stats in the Prometheus text exposition format. The
+        quantiles are over the rolling window, the sums and counts over the
+        whole run.
+        """
+        with self.lock:
+            samples  = {k: sorted(v) for k, v in self.samples.items()}
+            totals   = {k: list(v) for k, v in self.totals.items()}
+            queues   = dict(self.queues)
+            counters = dict(self.counters)
+
+        p     = self.prefix
+        lines = [
+            f"# HELP {p}_stage_seconds The wall time of each stage.",
+            f"# TYPE {p}_stage_seconds summary",
+        ]
+        for name, values in samples.items():
+            for q in self.quantiles:
+                lines.append(f'{p}_stage_seconds{{stage="{name}",'
+                             f'quantile="{q}"}} '
+                             f'{self.percentile(values, q):.6f}')
+            lines.append(f'{p}_stage_seconds_sum{{stage="{name}"}} '
+                         f'{totals[name][1]:.6f}')
+            lines.append(f'{p}_stage_seconds_count{{stage="{name}"}} '
+                         f'{totals[name][0]}')
+
+        lines += [
+            f"# HELP {p}_queue_depth The number of items waiting in a queue.",
+            f"# TYPE {p}_queue_depth gauge",
+        ]
+        for name, depth in queues.items():
+            lines.append(f'{p}_queue_depth{{queue="{name}"}} {depth()}')
+
+        for name, value in counters.items():
+            lines += [
+                f"# TYPE {p}_{name}_total counter",
+                f"{p}_{name}_total {value}",
+            ]
+        return "\n".join(lines) + "\n"
+
+    # MARK: Endpoint
+
+    def start_endpoint(self):
+        """Serve `/metrics` and `/stats` from a daemon thread, if `port` is
+        set.
+        """
+        if self.port is None or self.server is not None:
+            return
+        self.server           = ThreadingHTTPServer(
+            (self.host, self.port), TelemetryRequestHandler
+        )
+        self.server.telemetry = self
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        logger.info(f"Telemetry endpoint at: "
+                    f"http://{self.host}:{self.server.server_port}/metrics.")
+
+    def stop_endpoint(self):
+        """Stop the endpoint."""
+        if self.server is None:
+            return
+        self.server.shutdown()
+        self.server.server_close()
+        self.server = None
+
+
+# MARK: - TelemetryRequestHandler
+
+class TelemetryRequestHandler(BaseHTTPRequestHandler):
+    """Answer `GET /metrics` (Prometheus text) and `GET /stats` (JSON) with
+    the stats of `server.telemetry`.
+    """
+
+    def do_GET(self):
+        telemetry = self.server.telemetry
+        path      = self.path.split("?")[0].rstrip("/")
+        if path == "/metrics":
+            status, content_type = 200, "text/plain; version=0.0.4"
+            content = telemetry.to_prometheus()
+        elif path == "/stats":
+            status, content_type = 200, "application/json"
+            content = json.dumps(telemetry.snapshot())
+        else:
+            status, content_type = 404, "application/json"
+            content = json.dumps({"error": f"Unknown route: {self.path}."})
+
+        content = content.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format: str, *args):
+        """Do not log every scrape."""
+        pass
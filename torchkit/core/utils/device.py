@@ -8,9 +8,11 @@ from __future__ import annotations
 
 import logging
 import os
+from contextlib import contextmanager
 from typing import Optional
 
 import torch
+import torch.distributed as dist
 
 from .style_print import prints
 
@@ -78,3 +80,88 @@ def select_device(
 	
 	prints(s)  # skip a line
 	return torch.device("cuda:0" if cuda else "cpu")
+
+
+# MARK: - Distributed
+
+def init_distributed(backend: str = "nccl") -> bool:
+	"""Initialize the default process group from the environment set by
+	`torchrun` (`RANK`, `WORLD_SIZE`, `MASTER_ADDR`, `MASTER_PORT`), so the
+	datasets can be set up with barriers before the `Trainer` is created.
+	Lightning reuses an initialized process group.
+	
+	Do nothing when not launched by `torchrun`: Lightning's own `ddp`
+	launcher starts its child processes without `RANK` and sets up the
+	process group itself.
+	
+	Args:
+		backend (str):
+			The backend. Fall back to `gloo` without CUDA. Default: `nccl`.
+	
+	Returns:
+		(bool):
+			`True` if the process group is initialized with more than 1
+			process.
+	"""
+	if get_world_size() <= 1 or not dist.is_available():
+		return False
+	if not dist.is_initialized() and "RANK" not in os.environ and \
+		"TORCHELASTIC_RUN_ID" not in os.environ:
+		return False  # NOTE: Not `torchrun`, leave it to Lightning
+	if not dist.is_initialized():
+		if backend == "nccl" and not torch.cuda.is_available():
+			backend = "gloo"
+		dist.init_process_group(backend=backend, init_method="env://")
+		if torch.cuda.is_available():
+			torch.cuda.set_device(int(os.environ.get("LOCAL_RANK", 0)))
+	return True
+
+
+def get_world_size() -> int:
+	"""Return the number of processes. Before the process group is
+	initialized, read the `WORLD_SIZE` set by the launcher.
+	"""
+	if dist.is_available() and dist.is_initialized():
+		return dist.get_world_size()
+	return int(os.environ.get("WORLD_SIZE", 1))
+
+
+def get_rank() -> int:
+	"""Return the global rank of the current process. Before the process
+	group is initialized, read the `RANK` (or `LOCAL_RANK`) set by the
+	launcher.
+	"""
+	if dist.is_available() and dist.is_initialized():
+		return dist.get_rank()
+	return int(os.environ.get("RANK", os.environ.get("LOCAL_RANK", 0)))
+
+
+def is_main_process() -> bool:
+	"""Return `True` on rank 0."""
+	return get_rank() == 0
+
+
+def barrier():
+	"""Wait for all processes. Do nothing if the process group is not
+	initialized.
+	"""
+	if dist.is_available() and dist.is_initialized() and \
+		dist.get_world_size() > 1:
+		dist.barrier()
+
+
+@contextmanager
+def main_process_first():
+	"""Run the block on rank 0 first, then on the other ranks. Used around
+	the code that writes shared files (for example: the label caches), so the
+	other ranks read the files instead of writing them again.
+	
+	Examples:
+		>>> with main_process_first():
+		>>>     cache = load_or_build_cache()
+	"""
+	if not is_main_process():
+		barrier()
+	yield
+	if is_main_process():
+		barrier()
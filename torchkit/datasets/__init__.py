@@ -1,19 +1,20 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-"""
+"""Datasets are registered lazily (see `manifest.py`): importing this package
+only imports the registries. The subpackages are imported on the first access
+to one of their attributes, or when a registered name is first built.
 """
 
 from __future__ import annotations
 
-from .blur import *
+from torchkit.core.factory import lazy_getattr
 from .builder import *
-from .cifar import *
-from .cityscapes import *
-from .kodas import *
-from .lol import *
-from .mnist import *
-from .rain import *
-from .snow import *
-from .visdrone import *
-from .waymo import *
+
+__getattr__ = lazy_getattr(
+	package    = __name__,
+	submodules = [
+		".blur", ".cifar", ".cityscapes", ".kodas", ".lol", ".mnist", ".rain",
+		".snow", ".visdrone", ".waymo",
+	],
+)
@@ -6,7 +6,6 @@
 
 from __future__ import annotations
 
-import glob
 import logging
 import os
 import random
@@ -20,7 +19,6 @@ from torchkit.core.data import VisionData
 from torchkit.core.dataset import DataModule
 from torchkit.core.dataset import EnhancementDataset
 from torchkit.core.dataset import VisualDataHandler
-from torchkit.core.fileio import is_json_file
 from torchkit.core.image import show_images
 from torchkit.core.runner import Phase
 from torchkit.core.utils import Dim3
@@ -246,14 +244,15 @@ class Blur(EnhancementDataset):
         eimage_pattern = os.path.join(
             self.root, "gopro", self.split, "*", "sharp", "*.png"
         )
-        for eimage_path in glob.glob(eimage_pattern):
+        for eimage_path in self.file_index.glob(eimage_pattern):
             image_path = eimage_path.replace("sharp", "blur")
             label_path = eimage_path.replace("sharp", "customs")
             label_path = label_path.replace(".png", ".json")
             self.image_paths.append(image_path)
             self.eimage_paths.append(eimage_path)
             self.label_paths.append(label_path)
-            self.has_custom_labels = is_json_file(path=label_path)
+            self.has_custom_labels = self.file_index.isfile(label_path) \
+                and label_path.endswith(".json")
     
     def list_hide_files(self):
         """List all HIDE data.
@@ -263,14 +262,15 @@ class Blur(EnhancementDataset):
         eimage_pattern = os.path.join(
             self.root, "hide", self.split, "sharp", "*.png"
         )
-        for eimage_path in glob.glob(eimage_pattern):
+        for eimage_path in self.file_index.glob(eimage_pattern):
             image_path = eimage_path.replace("sharp", "blur")
             label_path = eimage_path.replace("sharp", "customs")
             label_path = label_path.replace(".jpg", ".json")
             self.image_paths.append(image_path)
             self.eimage_paths.append(eimage_path)
             self.label_paths.append(label_path)
-            self.has_custom_labels = is_json_file(path=label_path)
+            self.has_custom_labels = self.file_index.isfile(label_path) \
+                and label_path.endswith(".json")
     
     def list_realblur_files(self):
         """List all RealBlur data.
@@ -280,14 +280,15 @@ class Blur(EnhancementDataset):
         eimage_pattern = os.path.join(
             self.root, "realblur", self.split, "j", "*", "gt", "*.png"
         )
-        for eimage_path in glob.glob(eimage_pattern):
+        for eimage_path in self.file_index.glob(eimage_pattern):
             image_path = eimage_path.replace("gt", "blur")
             label_path = eimage_path.replace("gt", "customs")
             label_path = label_path.replace(".jpg", ".json")
             self.image_paths.append(image_path)
             self.eimage_paths.append(eimage_path)
             self.label_paths.append(label_path)
-            self.has_custom_labels = is_json_file(path=label_path)
+            self.has_custom_labels = self.file_index.isfile(label_path) \
+                and label_path.endswith(".json")
 
     # MARK: Load Data
     
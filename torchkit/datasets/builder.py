@@ -7,6 +7,12 @@
 from __future__ import annotations
 
 from torchkit.core.factory import Factory
+from .manifest import DATAMODULES_MANIFEST
+from .manifest import DATASETS_MANIFEST
 
 DATASETS    = Factory(name="dataset")
 DATAMODULES = Factory(name="datamodule")
+
+# NOTE: Lazy entries. The dataset modules are imported on the first `build()`
+DATASETS.register_manifest(DATASETS_MANIFEST)
+DATAMODULES.register_manifest(DATAMODULES_MANIFEST)
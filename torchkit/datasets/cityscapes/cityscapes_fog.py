@@ -6,7 +6,6 @@
 
 from __future__ import annotations
 
-import glob
 import logging
 import os
 import random
@@ -250,7 +249,7 @@ class CityscapesFog(EnhancementDataset):
         
         image_paths = []
         for image_pattern in image_patterns:
-            for image_path in glob.glob(image_pattern):
+            for image_path in self.file_index.glob(image_pattern):
                 image_paths.append(image_path)
         image_paths = unique(image_paths)  # Remove all duplicates files
 
@@ -275,7 +274,7 @@ class CityscapesFog(EnhancementDataset):
             self.image_paths.append(image_path)
             self.eimage_paths.append(eimage_path)
             self.label_paths.append(label_path)
-            self.has_custom_labels = os.path.isfile(label_path)
+            self.has_custom_labels = self.file_index.isfile(label_path)
                 
         # NOTE: Assertion
         assert len(self.image_paths) == len(self.eimage_paths), \
@@ -6,7 +6,6 @@
 
 from __future__ import annotations
 
-import glob
 import logging
 import os
 import random
@@ -213,7 +212,7 @@ class CityscapesLoL(EnhancementDataset):
         image_pattern = os.path.join(
             self.root, "lol", self.split, "low", "*.png"
         )
-        image_paths = glob.glob(image_pattern)
+        image_paths = self.file_index.glob(image_pattern)
 
         # NOTE: fast_dev_run, select only a subset of images
         if self.fast_dev_run:
@@ -229,7 +228,7 @@ class CityscapesLoL(EnhancementDataset):
             self.image_paths.append(image_path)
             self.eimage_paths.append(eimage_path)
             self.label_paths.append(label_path)
-            self.has_custom_labels = os.path.isfile(label_path)
+            self.has_custom_labels = self.file_index.isfile(label_path)
         
         # NOTE: Assertion
         assert len(self.image_paths) == len(self.eimage_paths), \
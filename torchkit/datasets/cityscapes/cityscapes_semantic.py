@@ -6,7 +6,6 @@
 
 from __future__ import annotations
 
-import glob
 import logging
 import os
 import random
@@ -74,6 +73,9 @@ data = {
     # Should overwrite the existing cached labels? Default: `False`.
     "caching_images": False,
     # Cache images into memory for faster training. Default: `False`.
+    "rasterize_semantic": False,
+    # Rasterize the semantic segmentation masks on-the-fly from the packed
+    # polygons instead of writing and decoding PNG files. Default: `False`.
     "write_labels": False,
     # After loading images and labels for the first time, we will convert it to
     # our custom data format and write to files. If `True`, we will overwrite
@@ -272,7 +274,7 @@ class CityscapesSemantic(SemanticDataset):
 
         image_paths = []
         for image_pattern in image_patterns:
-            for image_path in glob.glob(image_pattern):
+            for image_path in self.file_index.glob(image_pattern):
                 image_paths.append(image_path)
         self.image_paths = unique(image_paths)  # Remove all duplicates files
 
@@ -295,7 +297,8 @@ class CityscapesSemantic(SemanticDataset):
                        for path in self.semantic_paths]
         label_paths = [path.replace(".png", ".json")
                        for path in label_paths]
-        label_paths = [path for path in label_paths if os.path.isfile(path)]
+        label_paths = [path for path in label_paths
+                       if self.file_index.isfile(path)]
 
         self.has_custom_labels = (
             (len(label_paths) == len(self.image_paths)) and
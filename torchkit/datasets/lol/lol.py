@@ -6,7 +6,6 @@
 
 from __future__ import annotations
 
-import glob
 import logging
 import os
 import random
@@ -266,14 +265,14 @@ class LoL(EnhancementDataset):
         image_pattern = os.path.join(
             self.root, "deepupe", self.split, "low", "*.jpg"
         )
-        for image_path in glob.glob(image_pattern):
+        for image_path in self.file_index.glob(image_pattern):
             eimage_path = image_path.replace("low", "expertc_high")
             label_path  = image_path.replace("low", "customs")
             label_path  = label_path.replace(".jpg", ".json")
             self.image_paths.append(image_path)
             self.eimage_paths.append(eimage_path)
             self.label_paths.append(label_path)
-            self.has_custom_labels = os.path.isfile(label_path)
+            self.has_custom_labels = self.file_index.isfile(label_path)
     
     def list_dped_files(self):
         """List all DPED data.
@@ -283,14 +282,14 @@ class LoL(EnhancementDataset):
         image_pattern = os.path.join(
             self.root, "dped", self.split, "*", "low", "*.jpg"
         )
-        for image_path in glob.glob(image_pattern):
+        for image_path in self.file_index.glob(image_pattern):
             eimage_path = image_path.replace("low", "high")
             label_path  = image_path.replace("low", "customs")
             label_path  = label_path.replace(".jpg", ".json")
             self.image_paths.append(image_path)
             self.eimage_paths.append(eimage_path)
             self.label_paths.append(label_path)
-            self.has_custom_labels = os.path.isfile(label_path)
+            self.has_custom_labels = self.file_index.isfile(label_path)
     
     def list_gladnet_files(self):
         """List GladNet data.
@@ -300,14 +299,14 @@ class LoL(EnhancementDataset):
         image_pattern = os.path.join(
             self.root, "gladnet", self.split, "low", "*.png"
         )
-        for image_path in glob.glob(image_pattern):
+        for image_path in self.file_index.glob(image_pattern):
             eimage_path = image_path.replace("low", "high")
             label_path  = image_path.replace("low", "customs")
             label_path  = label_path.replace(".png", ".json")
             self.image_paths.append(image_path)
             self.eimage_paths.append(eimage_path)
             self.label_paths.append(label_path)
-            self.has_custom_labels = os.path.isfile(label_path)
+            self.has_custom_labels = self.file_index.isfile(label_path)
     
     def list_lol_files(self):
         """List all LoL image data.
@@ -317,14 +316,14 @@ class LoL(EnhancementDataset):
         image_pattern = os.path.join(
             self.root, "lol", self.split, "low", "*.png"
         )
-        for image_path in glob.glob(image_pattern):
+        for image_path in self.file_index.glob(image_pattern):
             eimage_path = image_path.replace("low", "high")
             label_path  = image_path.replace("low", "customs")
             label_path  = label_path.replace(".png", ".json")
             self.image_paths.append(image_path)
             self.eimage_paths.append(eimage_path)
             self.label_paths.append(label_path)
-            self.has_custom_labels = os.path.isfile(label_path)
+            self.has_custom_labels = self.file_index.isfile(label_path)
     
     def list_sice_files(self):
         """List all SICE data.
@@ -341,7 +340,7 @@ class LoL(EnhancementDataset):
         eimage_pattern = os.path.join(
             self.root, "sice", self.split, "high", "*.jpg"
         )
-        for eimage_path in glob.glob(eimage_pattern):
+        for eimage_path in self.file_index.glob(eimage_pattern):
             image_dir = os.path.splitext(eimage_path)[0].replace("high", "low")
             for exposure in self.exposure:
                 image_path = os.path.join(image_dir, exposure + ".jpg")
@@ -350,7 +349,7 @@ class LoL(EnhancementDataset):
                 self.image_paths.append(image_path)
                 self.eimage_paths.append(eimage_path)
                 self.label_paths.append(label_path)
-                self.has_custom_labels = os.path.isfile(label_path)
+                self.has_custom_labels = self.file_index.isfile(label_path)
 
     def list_sid_files(self):
         """List all SID data.
@@ -364,27 +363,27 @@ class LoL(EnhancementDataset):
             self.root, "sid", self.split, "sony", "high", "*.arw"
         )
         
-        for eimage_path in glob.glob(fuji_eimage_pattern):
+        for eimage_path in self.file_index.glob(fuji_eimage_pattern):
             image_prefix  = eimage_path.split("_").replace("high", "low")
             image_pattern = f"{image_prefix}*.raf"
-            for image_path in glob.glob(image_pattern):
+            for image_path in self.file_index.glob(image_pattern):
                 label_path = image_path.replace("low", "customs")
                 label_path = label_path.replace(".raf", ".json")
                 self.image_paths.append(image_path)
                 self.eimage_paths.append(eimage_path)
                 self.label_paths.append(label_path)
-                self.has_custom_labels = os.path.isfile(label_path)
+                self.has_custom_labels = self.file_index.isfile(label_path)
         
-        for eimage_path in glob.glob(sony_eimage_pattern):
+        for eimage_path in self.file_index.glob(sony_eimage_pattern):
             image_prefix  = eimage_path.split("_").replace("high", "low")
             image_pattern = f"{image_prefix}*.arw"
-            for image_path in glob.glob(image_pattern):
+            for image_path in self.file_index.glob(image_pattern):
                 label_path = image_path.replace("low", "customs")
                 label_path = label_path.replace(".arw", ".json")
                 self.image_paths.append(image_path)
                 self.eimage_paths.append(eimage_path)
                 self.label_paths.append(label_path)
-                self.has_custom_labels = os.path.isfile(label_path)
+                self.has_custom_labels = self.file_index.isfile(label_path)
 
     # MARK: Load Data
     
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Lazy registry manifest of the datasets and datamodules: {name: module
+path}. The module is only imported when the name is first requested from the
+registry.
+
+Regenerate with:
+	>>> scan_registrations("torchkit/datasets/<subpackage>", "torchkit.datasets.<subpackage>")
+"""
+
+from __future__ import annotations
+
+__all__ = [
+	"DATAMODULES_MANIFEST",
+	"DATASETS_MANIFEST",
+]
+
+
+DATAMODULES_MANIFEST = {
+	"blur"                  : "torchkit.datasets.blur.blur",
+	"cifar10"               : "torchkit.datasets.cifar.cifar10",
+	"cifar100"              : "torchkit.datasets.cifar.cifar100",
+	"cityscapes_fog"        : "torchkit.datasets.cityscapes.cityscapes_fog",
+	"CityscapesFog"         : "torchkit.datasets.cityscapes.cityscapes_fog",
+	"cityscapes_lol"        : "torchkit.datasets.cityscapes.cityscapes_lol",
+	"cityscapes_rain"       : "torchkit.datasets.cityscapes.cityscapes_rain",
+	"cityscapes"            : "torchkit.datasets.cityscapes.cityscapes_semantic",
+	"cityscapes_semantic"   : "torchkit.datasets.cityscapes.cityscapes_semantic",
+	"kodas2020_detection2d" : "torchkit.datasets.kodas.kodas2020_det2d",
+	"lol"                   : "torchkit.datasets.lol.lol",
+	"fashion_mnist"         : "torchkit.datasets.mnist.fashion_mnist",
+	"mnist"                 : "torchkit.datasets.mnist.mnist",
+	"rain"                  : "torchkit.datasets.rain.rain",
+	"snow"                  : "torchkit.datasets.snow.snow",
+	"visdrone2019_detection": "torchkit.datasets.visdrone.visdrone2019_det",
+	"waymo_detection2d"     : "torchkit.datasets.waymo.waymo_det2d",
+}
+
+DATASETS_MANIFEST = {
+	"blur"                  : "torchkit.datasets.blur.blur",
+	"cityscapes_fog"        : "torchkit.datasets.cityscapes.cityscapes_fog",
+	"cityscapes_lol"        : "torchkit.datasets.cityscapes.cityscapes_lol",
+	"cityscapes_rain"       : "torchkit.datasets.cityscapes.cityscapes_rain",
+	"cityscapes"            : "torchkit.datasets.cityscapes.cityscapes_semantic",
+	"cityscapes_semantic"   : "torchkit.datasets.cityscapes.cityscapes_semantic",
+	"kodas2020_detection2d" : "torchkit.datasets.kodas.kodas2020_det2d",
+	"lol"                   : "torchkit.datasets.lol.lol",
+	"rain"                  : "torchkit.datasets.rain.rain",
+	"snow"                  : "torchkit.datasets.snow.snow",
+	"visdrone2019_detection": "torchkit.datasets.visdrone.visdrone2019_det",
+	"waymo_detection2d"     : "torchkit.datasets.waymo.waymo_det2d",
+}
@@ -6,7 +6,6 @@
 
 from __future__ import annotations
 
-import glob
 import logging
 import os
 import random
@@ -20,7 +19,6 @@ from torchkit.core.data import VisionData
 from torchkit.core.dataset import DataModule
 from torchkit.core.dataset import EnhancementDataset
 from torchkit.core.dataset import VisualDataHandler
-from torchkit.core.fileio import is_json_file
 from torchkit.core.image import show_images
 from torchkit.core.runner import Phase
 
@@ -257,14 +255,15 @@ class Rain(EnhancementDataset):
         eimage_pattern = os.path.join(
             self.root, "rain12", self.split, "no_rain", "*.png"
         )
-        for eimage_path in glob.glob(eimage_pattern):
+        for eimage_path in self.file_index.glob(eimage_pattern):
             image_path = eimage_path.replace("no_rain", "rain")
             label_path = eimage_path.replace("no_rain", "customs")
             label_path = label_path.replace(".png", ".json")
             self.image_paths.append(image_path)
             self.eimage_paths.append(eimage_path)
             self.label_paths.append(label_path)
-            self.has_custom_labels = is_json_file(path=label_path)
+            self.has_custom_labels = self.file_index.isfile(label_path) \
+                and label_path.endswith(".json")
     
     def list_rain100_files(self):
         """List all `rain100` data.
@@ -274,14 +273,15 @@ class Rain(EnhancementDataset):
         eimage_pattern = os.path.join(
             self.root, "rain100", self.split, "no_rain", "*.png"
         )
-        for eimage_path in glob.glob(eimage_pattern):
+        for eimage_path in self.file_index.glob(eimage_pattern):
             image_path = eimage_path.replace("no_rain", "rain")
             label_path = eimage_path.replace("no_rain", "customs")
             label_path = label_path.replace(".jpg", ".json")
             self.image_paths.append(image_path)
             self.eimage_paths.append(eimage_path)
             self.label_paths.append(label_path)
-            self.has_custom_labels = is_json_file(path=label_path)
+            self.has_custom_labels = self.file_index.isfile(label_path) \
+                and label_path.endswith(".json")
     
     def list_rain100h_files(self):
         """List all `rain100h` data.
@@ -291,14 +291,15 @@ class Rain(EnhancementDataset):
         eimage_pattern = os.path.join(
             self.root, "rain100h", self.split, "no_rain", "*.png"
         )
-        for eimage_path in glob.glob(eimage_pattern):
+        for eimage_path in self.file_index.glob(eimage_pattern):
             image_path = eimage_path.replace("no_rain", "rain")
             label_path = eimage_path.replace("no_rain", "customs")
             label_path = label_path.replace(".jpg", ".json")
             self.image_paths.append(image_path)
             self.eimage_paths.append(eimage_path)
             self.label_paths.append(label_path)
-            self.has_custom_labels = is_json_file(path=label_path)
+            self.has_custom_labels = self.file_index.isfile(label_path) \
+                and label_path.endswith(".json")
     
     def list_rain100l_files(self):
         """List all `rain100l` data.
@@ -308,14 +309,14 @@ class Rain(EnhancementDataset):
         eimage_pattern = os.path.join(
             self.root, "rain100h", self.split, "no_rain", "*.png"
         )
-        for eimage_path in glob.glob(eimage_pattern):
+        for eimage_path in self.file_index.glob(eimage_pattern):
             image_path = eimage_path.replace("no_rain", "rain")
             label_path = eimage_path.replace("no_rain", "customs")
             label_path = label_path.replace(".jpg", ".json")
             self.image_paths.append(image_path)
             self.eimage_paths.append(eimage_path)
             self.label_paths.append(label_path)
-            self.has_custom_labels = os.path.isfile(label_path)
+            self.has_custom_labels = self.file_index.isfile(label_path)
     
     def list_rain800_files(self):
         """List all `rain800` data.
@@ -325,14 +326,14 @@ class Rain(EnhancementDataset):
         eimage_pattern = os.path.join(
             self.root, "rain800", self.split, "no_rain", "*.jpg"
         )
-        for eimage_path in glob.glob(eimage_pattern):
+        for eimage_path in self.file_index.glob(eimage_pattern):
             image_path = eimage_path.replace("no_rain", "rain")
             label_path = eimage_path.replace("no_rain", "customs")
             label_path = label_path.replace(".jpg", ".json")
             self.image_paths.append(image_path)
             self.eimage_paths.append(eimage_path)
             self.label_paths.append(label_path)
-            self.has_custom_labels = os.path.isfile(label_path)
+            self.has_custom_labels = self.file_index.isfile(label_path)
 
     def list_rain1200_files(self):
         """List all `rain1200` data.
@@ -344,26 +345,26 @@ class Rain(EnhancementDataset):
             eimage_pattern = os.path.join(
                 self.root, "rain1200", self.split, "no_rain", "*", "*.jpg"
             )
-            for eimage_path in glob.glob(eimage_pattern):
+            for eimage_path in self.file_index.glob(eimage_pattern):
                 image_path = eimage_path.replace("no_rain", "rain")
                 label_path = eimage_path.replace("no_rain", "customs")
                 label_path = label_path.replace(".jpg", ".json")
                 self.image_paths.append(image_path)
                 self.eimage_paths.append(eimage_path)
                 self.label_paths.append(label_path)
-                self.has_custom_labels = os.path.isfile(label_path)
+                self.has_custom_labels = self.file_index.isfile(label_path)
         else:
             eimage_pattern = os.path.join(
                 self.root, "rain1200", self.split, "no_rain", "*.jpg"
             )
-            for eimage_path in glob.glob(eimage_pattern):
+            for eimage_path in self.file_index.glob(eimage_pattern):
                 image_path = eimage_path.replace("no_rain", "rain")
                 label_path = eimage_path.replace("no_rain", "customs")
                 label_path = label_path.replace(".jpg", ".json")
                 self.image_paths.append(image_path)
                 self.eimage_paths.append(eimage_path)
                 self.label_paths.append(label_path)
-                self.has_custom_labels = os.path.isfile(label_path)
+                self.has_custom_labels = self.file_index.isfile(label_path)
     
     def list_rain1400_files(self):
         """List all `rain1400` data.
@@ -373,14 +374,14 @@ class Rain(EnhancementDataset):
         eimage_pattern = os.path.join(
             self.root, "rain1400", self.split, "no_rain", "*.jpg"
         )
-        for eimage_path in glob.glob(eimage_pattern):
+        for eimage_path in self.file_index.glob(eimage_pattern):
             image_path = eimage_path.replace("no_rain", "rain")
             label_path = eimage_path.replace("no_rain", "customs")
             label_path = label_path.replace(".jpg", ".json")
             self.image_paths.append(image_path)
             self.eimage_paths.append(eimage_path)
             self.label_paths.append(label_path)
-            self.has_custom_labels = os.path.isfile(label_path)
+            self.has_custom_labels = self.file_index.isfile(label_path)
     
     def list_rain2800_files(self):
         """List all `rain2800` data.
@@ -390,14 +391,14 @@ class Rain(EnhancementDataset):
         eimage_pattern = os.path.join(
             self.root, "rain2800", self.split, "no_rain", "*.jpg"
         )
-        for eimage_path in glob.glob(eimage_pattern):
+        for eimage_path in self.file_index.glob(eimage_pattern):
             image_path = eimage_path.replace("no_rain", "rain")
             label_path = eimage_path.replace("no_rain", "customs")
             label_path = label_path.replace(".jpg", ".json")
             self.image_paths.append(image_path)
             self.eimage_paths.append(eimage_path)
             self.label_paths.append(label_path)
-            self.has_custom_labels = os.path.isfile(label_path)
+            self.has_custom_labels = self.file_index.isfile(label_path)
 
     # MARK: Load Data
     
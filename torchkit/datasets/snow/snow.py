@@ -6,7 +6,6 @@
 
 from __future__ import annotations
 
-import glob
 import logging
 import os
 import random
@@ -21,7 +20,6 @@ from torchkit.core.data import VisionData
 from torchkit.core.dataset import DataModule
 from torchkit.core.dataset import EnhancementDataset
 from torchkit.core.dataset import VisualDataHandler
-from torchkit.core.fileio import is_json_file
 from torchkit.core.image import show_images
 from torchkit.core.runner import Phase
 from torchkit.core.utils import Dim3
@@ -301,14 +299,15 @@ class Snow(EnhancementDataset):
             self.root, "snow100k", self.split, f"{self.snow_size}", "no_snow",
             "*.jpg"
         )
-        for eimage_path in glob.glob(eimage_pattern):
+        for eimage_path in self.file_index.glob(eimage_pattern):
             image_path = eimage_path.replace("no_snow", "snow")
             label_path = eimage_path.replace("no_snow", "customs")
             label_path = label_path.replace(".jpg", ".json")
             self.image_paths.append(image_path)
             self.eimage_paths.append(eimage_path)
             self.label_paths.append(label_path)
-            self.has_custom_labels = is_json_file(path=label_path)
+            self.has_custom_labels = self.file_index.isfile(label_path) \
+                and label_path.endswith(".json")
     
     def list_srrs_files(self):
         """List all `srrs` data.
@@ -318,14 +317,15 @@ class Snow(EnhancementDataset):
         eimage_pattern = os.path.join(
             self.root, "srrs", self.split, "*", "gt", "*.jpg"
         )
-        for eimage_path in glob.glob(eimage_pattern):
+        for eimage_path in self.file_index.glob(eimage_pattern):
             image_path = eimage_path.replace("gt", "snow")
             label_path = eimage_path.replace("gt", "customs")
             label_path = label_path.replace(".jpg", ".json")
             self.image_paths.append(image_path)
             self.eimage_paths.append(eimage_path)
             self.label_paths.append(label_path)
-            self.has_custom_labels = is_json_file(path=label_path)
+            self.has_custom_labels = self.file_index.isfile(label_path) \
+                and label_path.endswith(".json")
     
     # MARK: Load Data
     
@@ -1,11 +1,17 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-"""
+"""Models are registered lazily (see `manifest.py`): importing this package
+only imports the registries. The subpackages are imported on the first access
+to one of their attributes, or when a registered name is first built.
 """
 
 from __future__ import annotations
 
-from .classifiers import *
-from .detectors import *
-from .enhancers import *
+from torchkit.core.factory import lazy_getattr
+from .builder import *
+
+__getattr__ = lazy_getattr(
+	package    = __name__,
+	submodules = [".classifiers", ".detectors", ".enhancers"],
+)
@@ -74,3 +74,20 @@ DETECTORS   = Factory(name="detectors")
 ENHANCERS   = Factory(name="enhancers")
 MODELS 	    = Factory(name="models")
 NECKS 	    = Factory(name="necks")
+
+# NOTE: Lazy entries. The model modules are imported on the first `build()`
+from .manifest import BACKBONES_MANIFEST
+from .manifest import CLASSIFIERS_MANIFEST
+from .manifest import DETECTORS_MANIFEST
+from .manifest import ENHANCERS_MANIFEST
+from .manifest import HEADS_MANIFEST
+from .manifest import LOSSES_MANIFEST
+from .manifest import MODELS_MANIFEST
+
+BACKBONES.register_manifest(BACKBONES_MANIFEST)
+CLASSIFIERS.register_manifest(CLASSIFIERS_MANIFEST)
+DETECTORS.register_manifest(DETECTORS_MANIFEST)
+ENHANCERS.register_manifest(ENHANCERS_MANIFEST)
+HEADS.register_manifest(HEADS_MANIFEST)
+LOSSES.register_manifest(LOSSES_MANIFEST)
+MODELS.register_manifest(MODELS_MANIFEST)
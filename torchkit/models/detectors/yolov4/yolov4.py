@@ -29,6 +29,7 @@ from torchkit.core.layer import Concat
 from torchkit.core.layer import ConvBnMish
 from torchkit.core.layer import CrossConv
 from torchkit.core.layer import Detect
+from torchkit.core.layer import DetectPostprocess
 from torchkit.core.layer import DWConv
 from torchkit.core.layer import Focus
 from torchkit.core.layer import SPP
@@ -109,6 +110,10 @@ class Yolov4(BaseModel):
 			  saved file.
 			- In each inherited model, `pretrained` can be a dictionary"s
 			  key to get the corresponding local file or url of the weight.
+		nms (dict, optional):
+			The post-processing configs. See `DetectPostprocess`. For example:
+			`{"conf_threshold": 0.25, "iou_threshold": 0.45,
+			"max_detections": 300}`. Default: `None`.
     """
 
     # MARK: Magic Functions
@@ -121,6 +126,7 @@ class Yolov4(BaseModel):
         num_classes: Optional[int]          = None,
         out_indexes: Indexes                = -1,
         pretrained : Union[bool, str, dict] = False,
+        nms        : Optional[dict]         = None,
         *args, **kwargs
     ):
         super().__init__(
@@ -139,6 +145,7 @@ class Yolov4(BaseModel):
         
         # NOTE: Model
         self.model, self.save = self.parse_model(self.cfg, channels=[channels])
+        self.postprocess      = DetectPostprocess(**(nms or {}))
 
         # NOTE: Load Pretrained
         if self.pretrained:
@@ -323,6 +330,30 @@ class Yolov4(BaseModel):
         else:
             return self.forward_features(x, -1)  # Single-scale inference, train
 
+    def detect(
+        self, x: torch.Tensor, augment: bool = False
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        """Forward pass and post-processing (confidence filtering and batched
+        NMS) to the final boxes.
+
+        Args:
+            x (torch.Tensor):
+                The input image of shape [B, C, H, W].
+            augment (bool):
+                Test-time augmentation. Default: `False`.
+
+        Returns:
+            detections (torch.Tensor):
+                The detections of shape [B, max_detections, 6] as
+                (x1, y1, x2, y2, score, class), padded with zeros.
+            num_detections (torch.Tensor):
+                The number of valid detections of each image of shape [B].
+        """
+        pred = self.forward_infer(x=x, augment=augment)
+        if isinstance(pred, tuple):  # (decoded, raw) of `Detect`
+            pred = pred[0]
+        return self.postprocess(pred)
+
     def forward_features(
         self, x: torch.Tensor, out_indexes: Optional[Indexes] = None
     ) -> Tensors:
@@ -7,6 +7,8 @@
 from __future__ import annotations
 
 import logging
+import time
+from typing import Any
 from typing import Optional
 from typing import Sequence
 from typing import Union
@@ -20,6 +22,7 @@ from torchkit.core.layer import ORB
 from torchkit.core.layer import SAM
 from torchkit.core.layer import SkipUpsample
 from torchkit.core.layer import Upsample
+from torchkit.core.metric import psnr_torch
 from torchkit.core.utils import Indexes
 from torchkit.core.utils import Size2T
 from torchkit.core.utils import Tensors
@@ -496,6 +499,16 @@ cfgs = {
 class MPRNet(End2EndEnhancer):
 	"""MPRNet consists of three stages.
 	
+	Set `checkpointing=True` to recompute the activations of the per-patch
+	encoders and the full-resolution ORSNet during backward.
+	
+	`stage1_img` and `stage2_img` are full restorations (supervised by
+	`MPRLoss`), so inference can stop after stage 1 or 2 and skip the
+	remaining sub-networks: set `exit_stage`, or `latency_budget` to choose
+	the deepest stage that fits the budget for each batch. Training and the
+	trainer's validation always run the 3 stages, since `MPRLoss` needs all
+	of them.
+	
 	Attributes:
         cfg (str, list, dict, optional):
 			The config to build the model's layers.
@@ -528,16 +541,30 @@ class MPRNet(End2EndEnhancer):
 			  saved file.
 			- In each inherited model, `pretrained` can be a dictionary's
 			  key to get the corresponding local file or url of the weight.
+		exit_stage (int, optional):
+			The last stage computed during inference: `1`, `2` or `3`. With
+			`latency_budget`, the deepest stage allowed. Default: `None`
+			means `3`.
+		latency_budget (float, optional):
+			The time budget (s) of one inference batch. The time of each
+			stage per megapixel is measured (moving average) and the deepest
+			stage that fits is run. A compiled graph would bake in a single
+			exit, so it cannot be combined with `compiled`. Default: `None`.
 	"""
 	
+	checkpoint_modules = ["stage1_encoder", "stage2_encoder", "stage3_orsnet"]
+	num_stages         = 3
+	
 	# MARK: Magic Functions
 	
 	def __init__(
 		self,
-		cfg        : Union[str, list, dict],
-        name       : Optional[str]          = "mprnet",
-		out_indexes: Indexes                = -1,
-        pretrained : Union[bool, str, dict] = False,
+		cfg           : Union[str, list, dict],
+		name          : Optional[str]          = "mprnet",
+		out_indexes   : Indexes                = -1,
+		pretrained    : Union[bool, str, dict] = False,
+		exit_stage    : Optional[int]          = None,
+		latency_budget: Optional[float]        = None,
 		*args, **kwargs
 	):
 		super().__init__(
@@ -548,7 +575,17 @@ class MPRNet(End2EndEnhancer):
 		if isinstance(cfg, str) and cfg in cfgs:
 			cfg = cfgs[cfg]
 		assert isinstance(cfg, dict)
-		self.cfg = cfg
+		assert exit_stage in [None, 1, 2, 3], \
+			(f"`exit_stage` must be one of: [None, 1, 2, 3]. "
+			 f"But got: {exit_stage}.")
+		if latency_budget is not None and self.compile_cfg:
+			raise ValueError("`latency_budget` cannot be used with `compiled`: "
+							 "a compiled graph runs a single exit stage.")
+		self.cfg            = cfg
+		self.exit_stage     = exit_stage
+		self.latency_budget = latency_budget
+		self.stage_times    = [None] * self.num_stages  # s per megapixel
+		self.last_exit      = self.num_stages
 		
 		in_channels       = cfg["in_channels"]
 		out_channels      = cfg["out_channels"]
@@ -656,17 +693,31 @@ class MPRNet(End2EndEnhancer):
 		metrics = metrics if len(metrics) else None
 		return y_hat, metrics
 	
-	def forward_infer(self, x: torch.Tensor) -> Tensors:
+	def forward_infer(
+		self, x: torch.Tensor, exit_stage: Optional[int] = None
+	) -> Tensors:
 		"""Forward pass.
 
 		Args:
 			x (torch.Tensor):
 				The input images.
+			exit_stage (int, optional):
+				Stop after this stage. Ignored without `early_exit`. If
+				`None`, use `select_exit_stage()`. Default: `None`.
 
 		Returns:
 			y_hat (Tensors):
-				The list of 3 tensors at three stages.
+				The list of tensors of the computed stages, from the last one
+				to stage 1 (3 tensors without early exit).
 		"""
+		early_exit = self.early_exit
+		if not early_exit:
+			exit_stage = self.num_stages
+		elif exit_stage is None:
+			exit_stage = self.select_exit_stage(x)
+		timed = self.latency_budget is not None and early_exit
+		ticks = [self.clock(x)] if timed else []
+		
 		# NOTE: Original-resolution Image for Stage 3
 		x3_img = x
 		h      = x3_img.size()[2]
@@ -715,6 +766,11 @@ class MPRNet(End2EndEnhancer):
 
 		## Output image at Stage 1
 		stage1_img = torch.cat([stage1_img_top, stage1_img_bot], 2)
+		if timed:
+			ticks.append(self.clock(x))
+		if exit_stage == 1:
+			self.update_stage_times(x, ticks)
+			return [stage1_img]
 		
 		##-------------------------------------------
 		##-------------- Stage 2 --------------------
@@ -739,6 +795,11 @@ class MPRNet(End2EndEnhancer):
 
 		## Apply SAM
 		x3_samfeats, stage2_img = self.sam23(res2[0], x3_img)
+		if timed:
+			ticks.append(self.clock(x))
+		if exit_stage == 2:
+			self.update_stage_times(x, ticks)
+			return [stage2_img, stage1_img]
 
 		##-------------------------------------------
 		##-------------- Stage 3 --------------------
@@ -750,8 +811,146 @@ class MPRNet(End2EndEnhancer):
 		x3_cat     = self.concat23(torch.cat([x3, x3_samfeats], 1))
 		x3_cat     = self.stage3_orsnet(x3_cat, feat2, res2)
 		stage3_img = self.tail(x3_cat)
+		stage3_img = stage3_img + x3_img
+		if timed:
+			ticks.append(self.clock(x))
+		self.update_stage_times(x, ticks)
 
-		return [stage3_img + x3_img, stage2_img, stage1_img]
+		return [stage3_img, stage2_img, stage1_img]
+	
+	# MARK: Early Exit
+	
+	@property
+	def early_exit(self) -> bool:
+		"""Return `True` if the forward pass may stop before stage 3: not in
+		training mode, nor in the trainer's validation (or sanity check).
+		"""
+		if self.training:
+			return False
+		trainer = getattr(self, "trainer", None)
+		return trainer is None or not (trainer.validating or
+									   trainer.sanity_checking)
+	
+	def compile_model(self, *args, **kwargs):
+		"""Switch `forward_infer()` to compiled execution. Not allowed with
+		`latency_budget`: the graph would run a single exit stage.
+		"""
+		if self.latency_budget is not None:
+			raise ValueError("`latency_budget` cannot be used with compiled "
+							 "execution: a compiled graph runs a single exit "
+							 "stage.")
+		super().compile_model(*args, **kwargs)
+	
+	def select_exit_stage(self, x: torch.Tensor) -> int:
+		"""Return the deepest stage (up to `exit_stage`) whose predicted time
+		for `x` fits in `latency_budget`. Stages that have not been timed yet
+		are run (and timed). At least stage 1 is run.
+		"""
+		max_stage = self.exit_stage or self.num_stages
+		if self.latency_budget is None:
+			return max_stage
+		
+		megapixels = x.shape[0] * x.shape[2] * x.shape[3] / 1e6
+		stage      = 1
+		total      = 0.0
+		for i in range(max_stage):
+			if self.stage_times[i] is None:
+				stage = max_stage
+				break
+			total += self.stage_times[i] * megapixels
+			if total > self.latency_budget:
+				break
+			stage = i + 1
+		
+		if stage != self.last_exit:
+			logger.info(f"{self.name}: exit after stage {stage} "
+						f"(predicted {total * 1000:.1f}ms, budget "
+						f"{self.latency_budget * 1000:.1f}ms).")
+			self.last_exit = stage
+		return stage
+	
+	def clock(self, x: torch.Tensor) -> float:
+		"""Return the time after the queued work on `x`'s device is done."""
+		if x.is_cuda:
+			torch.cuda.synchronize(x.device)
+		return time.perf_counter()
+	
+	def update_stage_times(
+		self, x: torch.Tensor, ticks: list[float], momentum: float = 0.1
+	):
+		"""Update the moving average of the time per megapixel of the stages
+		timed by `ticks` (one tick before stage 1 and one after each stage).
+		"""
+		if len(ticks) < 2:
+			return
+		megapixels = x.shape[0] * x.shape[2] * x.shape[3] / 1e6
+		for i, (t0, t1) in enumerate(zip(ticks[:-1], ticks[1:])):
+			t = (t1 - t0) / megapixels
+			self.stage_times[i] = (t if self.stage_times[i] is None else
+								   (1 - momentum) * self.stage_times[i]
+								   + momentum * t)
+	
+	@torch.no_grad()
+	def profile_exit_stages(
+		self,
+		data_loader: Any,
+		device     : Union[torch.device, str] = "cuda:0",
+		max_batches: Optional[int]            = None,
+	) -> list[dict]:
+		"""Measure the quality (PSNR against the ground truth) and the latency
+		of exiting after each stage, on batches of (x, y, ...).
+		
+		Args:
+			data_loader (Any):
+				The data loader, for example: the Rain test split's.
+			device (torch.device, str):
+				The device to run on. Default: `cuda:0`.
+			max_batches (int, optional):
+				Stop after this number of batches. Default: `None`.
+		
+		Returns:
+			report (list[dict]):
+				One row per exit stage with keys: `stage`, `psnr` (dB) and
+				`latency` (ms per batch).
+		"""
+		training = self.training
+		self.to(device)
+		self.eval()
+		psnrs = [[] for _ in range(self.num_stages)]
+		times = [[] for _ in range(self.num_stages)]
+		for i, batch in enumerate(data_loader):
+			if max_batches is not None and i >= max_batches:
+				break
+			x = batch[0].to(device)
+			y = batch[1].to(device)
+			for stage in range(1, self.num_stages + 1):
+				start = self.clock(x)
+				y_hat = self.forward_infer(x=x, exit_stage=stage)[0]
+				times[stage - 1].append(self.clock(x) - start)
+				score = psnr_torch(y_hat=y_hat, y=y)
+				if score is not None:
+					psnrs[stage - 1].append(float(score))
+		self.train(training)
+		
+		report = []
+		for stage in range(1, self.num_stages + 1):
+			p = psnrs[stage - 1]
+			t = times[stage - 1][1:] or times[stage - 1]  # Skip warm-up
+			report.append({
+				"stage"  : stage,
+				"psnr"   : sum(p) / len(p) if p else None,
+				"latency": 1000.0 * sum(t) / len(t) if t else None,
+			})
+		
+		lines = [f"{'Exit stage':>10} {'PSNR (dB)':>10} {'Latency (ms)':>13}"]
+		for row in report:
+			psnr_    = f"{row['psnr']:.2f}" if row["psnr"] is not None \
+				else "n/a"
+			latency_ = f"{row['latency']:.1f}" if row["latency"] is not None \
+				else "n/a"
+			lines.append(f"{row['stage']:>10} {psnr_:>10} {latency_:>13}")
+		logger.info(f"{self.name} early exit report:\n" + "\n".join(lines))
+		return report
 	
 	# MARK: Training
 	
@@ -580,8 +580,13 @@ class RetinexNet(BaseModel):
 	Notes:
 		- When training the DecomNet: epoch=75, using Adam(lr=0.00001) gives
 		  best results.
+		- Set `checkpointing=True` to recompute the activations of DecomNet
+		  and EnhanceNet during backward. Only the sub-networks in training
+		  mode of the current `phase` are checkpointed.
 	"""
 	
+	checkpoint_modules = ["decomnet", "enhancenet"]
+	
 	# MARK: Magic Functions
 	
 	def __init__(
@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Lazy registry manifest of the models: {name: module path}. The module
+is only imported when the name is first requested from the registry.
+
+Regenerate with:
+	>>> scan_registrations("torchkit/models/<subpackage>", "torchkit.models.<subpackage>")
+"""
+
+from __future__ import annotations
+
+__all__ = [
+	"BACKBONES_MANIFEST",
+	"CLASSIFIERS_MANIFEST",
+	"DETECTORS_MANIFEST",
+	"ENHANCERS_MANIFEST",
+	"HEADS_MANIFEST",
+	"LOSSES_MANIFEST",
+	"MODELS_MANIFEST",
+]
+
+
+BACKBONES_MANIFEST = {
+	"alexnet"           : "torchkit.models.classifiers.alexnet",
+	"densenet"          : "torchkit.models.classifiers.densenet",
+	"densenet121"       : "torchkit.models.classifiers.densenet",
+	"densenet161"       : "torchkit.models.classifiers.densenet",
+	"densenet169"       : "torchkit.models.classifiers.densenet",
+	"densenet201"       : "torchkit.models.classifiers.densenet",
+	"lenet"             : "torchkit.models.classifiers.lenet",
+	"lenet5"            : "torchkit.models.classifiers.lenet",
+	"mnasnet"           : "torchkit.models.classifiers.mnasnet",
+	"mnasnet_x0.5"      : "torchkit.models.classifiers.mnasnet",
+	"mnasnet_x0.75"     : "torchkit.models.classifiers.mnasnet",
+	"mnasnet_x1.0"      : "torchkit.models.classifiers.mnasnet",
+	"mnasnet_x1.3"      : "torchkit.models.classifiers.mnasnet",
+	"resnet"            : "torchkit.models.classifiers.resnet",
+	"resnet18"          : "torchkit.models.classifiers.resnet",
+	"resnet34"          : "torchkit.models.classifiers.resnet",
+	"resnet50"          : "torchkit.models.classifiers.resnet",
+	"resnet101"         : "torchkit.models.classifiers.resnet",
+	"resnet152"         : "torchkit.models.classifiers.resnet",
+	"resnext50_32x4d"   : "torchkit.models.classifiers.resnet",
+	"resnext101_32x8d"  : "torchkit.models.classifiers.resnet",
+	"wide_resnet50_2"   : "torchkit.models.classifiers.resnet",
+	"wide_resnet101_2"  : "torchkit.models.classifiers.resnet",
+	"shufflenet_v2"     : "torchkit.models.classifiers.shufflenet_v2",
+	"shufflenet_v2_x0_5": "torchkit.models.classifiers.shufflenet_v2",
+	"shufflenet_v2_x1_0": "torchkit.models.classifiers.shufflenet_v2",
+	"shufflenet_v2_x1_5": "torchkit.models.classifiers.shufflenet_v2",
+	"shufflenet_v2_x2_0": "torchkit.models.classifiers.shufflenet_v2",
+	"squeezenet"        : "torchkit.models.classifiers.squeezenet",
+	"squeezenet1_0"     : "torchkit.models.classifiers.squeezenet",
+	"squeezenet1_1"     : "torchkit.models.classifiers.squeezenet",
+	"vgg"               : "torchkit.models.classifiers.vgg",
+	"vgg11"             : "torchkit.models.classifiers.vgg",
+	"vgg11_bn"          : "torchkit.models.classifiers.vgg",
+	"vgg13"             : "torchkit.models.classifiers.vgg",
+	"vgg13_bn"          : "torchkit.models.classifiers.vgg",
+	"vgg16"             : "torchkit.models.classifiers.vgg",
+	"vgg16_bn"          : "torchkit.models.classifiers.vgg",
+	"vgg19"             : "torchkit.models.classifiers.vgg",
+	"vgg19_bn"          : "torchkit.models.classifiers.vgg",
+	"mbllen"            : "torchkit.models.enhancers.mbllen",
+}
+
+CLASSIFIERS_MANIFEST = {
+	"alexnet"           : "torchkit.models.classifiers.alexnet",
+	"densenet"          : "torchkit.models.classifiers.densenet",
+	"densenet121"       : "torchkit.models.classifiers.densenet",
+	"densenet161"       : "torchkit.models.classifiers.densenet",
+	"densenet169"       : "torchkit.models.classifiers.densenet",
+	"densenet201"       : "torchkit.models.classifiers.densenet",
+	"lenet"             : "torchkit.models.classifiers.lenet",
+	"lenet5"            : "torchkit.models.classifiers.lenet",
+	"mnasnet"           : "torchkit.models.classifiers.mnasnet",
+	"mnasnet_x0.5"      : "torchkit.models.classifiers.mnasnet",
+	"mnasnet_x0.75"     : "torchkit.models.classifiers.mnasnet",
+	"mnasnet_x1.0"      : "torchkit.models.classifiers.mnasnet",
+	"mnasnet_x1.3"      : "torchkit.models.classifiers.mnasnet",
+	"resnet"            : "torchkit.models.classifiers.resnet",
+	"resnet18"          : "torchkit.models.classifiers.resnet",
+	"resnet34"          : "torchkit.models.classifiers.resnet",
+	"resnet50"          : "torchkit.models.classifiers.resnet",
+	"resnet101"         : "torchkit.models.classifiers.resnet",
+	"resnet152"         : "torchkit.models.classifiers.resnet",
+	"resnext50_32x4d"   : "torchkit.models.classifiers.resnet",
+	"resnext101_32x8d"  : "torchkit.models.classifiers.resnet",
+	"wide_resnet50_2"   : "torchkit.models.classifiers.resnet",
+	"wide_resnet101_2"  : "torchkit.models.classifiers.resnet",
+	"shufflenet_v2"     : "torchkit.models.classifiers.shufflenet_v2",
+	"shufflenet_v2_x0_5": "torchkit.models.classifiers.shufflenet_v2",
+	"ShuffleNetV2_x1_0" : "torchkit.models.classifiers.shufflenet_v2",
+	"shufflenet_v2_x1_5": "torchkit.models.classifiers.shufflenet_v2",
+	"shufflenet_v2_x2_0": "torchkit.models.classifiers.shufflenet_v2",
+	"squeezenet"        : "torchkit.models.classifiers.squeezenet",
+	"squeezenet1_0"     : "torchkit.models.classifiers.squeezenet",
+	"squeezenet1_1"     : "torchkit.models.classifiers.squeezenet",
+	"vgg"               : "torchkit.models.classifiers.vgg",
+	"vgg11"             : "torchkit.models.classifiers.vgg",
+	"vgg11_bn"          : "torchkit.models.classifiers.vgg",
+	"vgg13"             : "torchkit.models.classifiers.vgg",
+	"vgg13_bn"          : "torchkit.models.classifiers.vgg",
+	"vgg16"             : "torchkit.models.classifiers.vgg",
+	"vgg16_bn"          : "torchkit.models.classifiers.vgg",
+	"vgg19"             : "torchkit.models.classifiers.vgg",
+	"vgg19_bn"          : "torchkit.models.classifiers.vgg",
+}
+
+DETECTORS_MANIFEST = {
+	"yolov4"    : "torchkit.models.detectors.yolov4.yolov4",
+	"yolov4_csp": "torchkit.models.detectors.yolov4.yolov4",
+	"yolov4_p5" : "torchkit.models.detectors.yolov4.yolov4",
+	"yolov4_p6" : "torchkit.models.detectors.yolov4.yolov4",
+	"yolov4_p7" : "torchkit.models.detectors.yolov4.yolov4",
+}
+
+ENHANCERS_MANIFEST = {
+	"mbllen"      : "torchkit.models.enhancers.mbllen",
+	"mprnet"      : "torchkit.models.enhancers.mprnet",
+	"mprnet_blur" : "torchkit.models.enhancers.mprnet",
+	"mprnet_rain" : "torchkit.models.enhancers.mprnet",
+	"mprnet_snow" : "torchkit.models.enhancers.mprnet",
+	"retinexnet"  : "torchkit.models.enhancers.retinexnet",
+	"retinex_unet": "torchkit.models.enhancers.retinexnet",
+}
+
+HEADS_MANIFEST = {
+	"cls_head"                             : "torchkit.models.heads.dense_heads.cls_head",
+	"linear_cls_head"                      : "torchkit.models.heads.dense_heads.linear_head",
+	"linear_classification_head"           : "torchkit.models.heads.dense_heads.linear_head",
+	"LinearClsHead"                        : "torchkit.models.heads.dense_heads.linear_head",
+	"multilabel_cls_head"                  : "torchkit.models.heads.dense_heads.multilabel_head",
+	"multilabel_classification_head"       : "torchkit.models.heads.dense_heads.multilabel_head",
+	"MultiLabelClsHead"                    : "torchkit.models.heads.dense_heads.multilabel_head",
+	"multilabel_linear_cls_head"           : "torchkit.models.heads.dense_heads.multilabel_linear_head",
+	"multilabel_linear_classification_head": "torchkit.models.heads.dense_heads.multilabel_linear_head",
+	"MultiLabelLinearClsHead"              : "torchkit.models.heads.dense_heads.multilabel_linear_head",
+	"stacked_linear_cls_head"              : "torchkit.models.heads.dense_heads.stacked_head",
+	"StackedLinearClsHead"                 : "torchkit.models.heads.dense_heads.stacked_head",
+	"vision_transformer_cls_head"          : "torchkit.models.heads.dense_heads.vision_transformer_head",
+	"VisionTransformerClsHead"             : "torchkit.models.heads.dense_heads.vision_transformer_head",
+}
+
+LOSSES_MANIFEST = {
+	"context_loss"  : "torchkit.models.losses.mbllen_loss",
+	"region_loss"   : "torchkit.models.losses.mbllen_loss",
+	"structure_loss": "torchkit.models.losses.mbllen_loss",
+	"mbllen_loss"   : "torchkit.models.losses.mbllen_loss",
+	"mpr_loss"      : "torchkit.models.losses.mpr_loss",
+	"decom_loss"    : "torchkit.models.losses.retinex_loss",
+	"enhance_loss"  : "torchkit.models.losses.retinex_loss",
+	"retinex_loss"  : "torchkit.models.losses.retinex_loss",
+}
+
+MODELS_MANIFEST = {
+	"alexnet"           : "torchkit.models.classifiers.alexnet",
+	"densenet"          : "torchkit.models.classifiers.densenet",
+	"densenet121"       : "torchkit.models.classifiers.densenet",
+	"densenet161"       : "torchkit.models.classifiers.densenet",
+	"densenet169"       : "torchkit.models.classifiers.densenet",
+	"densenet201"       : "torchkit.models.classifiers.densenet",
+	"lenet"             : "torchkit.models.classifiers.lenet",
+	"lenet5"            : "torchkit.models.classifiers.lenet",
+	"mnasnet"           : "torchkit.models.classifiers.mnasnet",
+	"mnasnet_x0.5"      : "torchkit.models.classifiers.mnasnet",
+	"mnasnet_x0.75"     : "torchkit.models.classifiers.mnasnet",
+	"mnasnet_x1.0"      : "torchkit.models.classifiers.mnasnet",
+	"mnasnet_x1.3"      : "torchkit.models.classifiers.mnasnet",
+	"resnet"            : "torchkit.models.classifiers.resnet",
+	"resnet18"          : "torchkit.models.classifiers.resnet",
+	"resnet34"          : "torchkit.models.classifiers.resnet",
+	"resnet50"          : "torchkit.models.classifiers.resnet",
+	"resnet101"         : "torchkit.models.classifiers.resnet",
+	"resnet152"         : "torchkit.models.classifiers.resnet",
+	"resnext50_32x4d"   : "torchkit.models.classifiers.resnet",
+	"resnext101_32x8d"  : "torchkit.models.classifiers.resnet",
+	"wide_resnet50_2"   : "torchkit.models.classifiers.resnet",
+	"wide_resnet101_2"  : "torchkit.models.classifiers.resnet",
+	"shufflenet_v2"     : "torchkit.models.classifiers.shufflenet_v2",
+	"shufflenet_v2_x0_5": "torchkit.models.classifiers.shufflenet_v2",
+	"ShuffleNetV2_x1_0" : "torchkit.models.classifiers.shufflenet_v2",
+	"shufflenet_v2_x1_5": "torchkit.models.classifiers.shufflenet_v2",
+	"shufflenet_v2_x2_0": "torchkit.models.classifiers.shufflenet_v2",
+	"squeezenet"        : "torchkit.models.classifiers.squeezenet",
+	"squeezenet1_0"     : "torchkit.models.classifiers.squeezenet",
+	"squeezenet1_1"     : "torchkit.models.classifiers.squeezenet",
+	"vgg"               : "torchkit.models.classifiers.vgg",
+	"vgg11"             : "torchkit.models.classifiers.vgg",
+	"vgg11_bn"          : "torchkit.models.classifiers.vgg",
+	"vgg13"             : "torchkit.models.classifiers.vgg",
+	"vgg13_bn"          : "torchkit.models.classifiers.vgg",
+	"vgg16"             : "torchkit.models.classifiers.vgg",
+	"vgg16_bn"          : "torchkit.models.classifiers.vgg",
+	"vgg19"             : "torchkit.models.classifiers.vgg",
+	"vgg19_bn"          : "torchkit.models.classifiers.vgg",
+	"yolov4"            : "torchkit.models.detectors.yolov4.yolov4",
+	"yolov4_csp"        : "torchkit.models.detectors.yolov4.yolov4",
+	"yolov4_p5"         : "torchkit.models.detectors.yolov4.yolov4",
+	"yolov4_p6"         : "torchkit.models.detectors.yolov4.yolov4",
+	"yolov4_p7"         : "torchkit.models.detectors.yolov4.yolov4",
+	"mbllen"            : "torchkit.models.enhancers.mbllen",
+	"mprnet"            : "torchkit.models.enhancers.mprnet",
+	"mprnet_blur"       : "torchkit.models.enhancers.mprnet",
+	"mprnet_rain"       : "torchkit.models.enhancers.mprnet",
+	"mprnet_snow"       : "torchkit.models.enhancers.mprnet",
+	"retinexnet"        : "torchkit.models.enhancers.retinexnet",
+	"retinex_unet"      : "torchkit.models.enhancers.retinexnet",
+}